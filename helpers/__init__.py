@@ -1 +1,6 @@
 from .helpers import *
+from .sources import *
+from .tiles import *
+from .loader import *
+from .route_cache import *
+from .memory import *
@@ -1 +1,6 @@
 from .algorithms import *
+from .compiled import *
+from .all_pairs import *
+from .paths import *
+from .time_dependent import *
+from .multi_target import *
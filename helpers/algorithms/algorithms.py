@@ -8,6 +8,9 @@ Los algoritmos implementados son:
 - DFS (Depth-First Search)
 - DFS con límite
 - DFS con profundización iterativa
+- Bellman-Ford (SPFA, ver all_pairs.py)
+- Floyd-Warshall (vectorizado, ver all_pairs.py)
+- Dijkstra / A* dependiente de la hora de salida (ver time_dependent.py)
 
 Cada función recibe un grafo, un nodo de origen y un nodo de destino, y opcionalmente
 un booleano para indicar si se debe graficar el grafo resultante.
@@ -25,6 +28,9 @@ El resultqdo devuelto por cada algortimo tiene el siguiente formato:
 - DFS: (Número de iteraciones, tiempo de ejecución)
 - DFS con límite: (True si encontró el camino, False si no, número de iteraciones)
 - DFS con profundización iterativa: (Número de iteraciones)
+- Bellman-Ford: (Número de iteraciones, tiempo de ejecución)
+- Floyd-Warshall: (Número de iteraciones, tiempo de ejecución)
+- Dependiente del tiempo: (Número de iteraciones, tiempo de ejecución)
 
 Todas las funciones de búsqueda dependen de los siguientes atributos de los nodos:
 - visited: Indica si el nodo ha sido visitado.
@@ -42,6 +48,8 @@ import heapq  # Import the heapq module for priority queue
 from helpers import *  # Import all the functions from the helpers module
 from collections import deque  # Import the deque class for FIFO queue
 from helpers import time_function  # Import the time_function decorator
+from .all_pairs import shortest_path_query  # Import the all-pairs / per-query engines
+from .time_dependent import time_dependent_query  # Import the time-dependent engine
 
 
 @time_function
@@ -288,7 +296,8 @@ def dfs_with_limit(graph, orig, dest, limit, plot=False):
                                           (edge2[0], edge2[1], 0))  # Optional: style edges leading from active nodes
             step += 1
 
-    plot_graph(graph)  # Plot the graph if the limit is reached and the destination is not found
+    if plot:
+        plot_graph(graph)  # Plot the graph if the limit is reached and the destination is not found
     return False, step  # Return a flag indicating the path was not found and the number of iterations
 
 
@@ -370,3 +379,151 @@ def iterative_deepening_dfs(graph, orig, dest, plot=False):
         plot_graph(graph)  # Plot the graph if the destination is not found
 
     return step
+
+
+def _apply_compiled_result(graph, orig, dest, distances, path):
+    """
+    Escribe en el grafo el resultado de un motor que trabaja sobre el grafo compilado.
+
+    Los motores de all_pairs.py no modifican el grafo, pero la interfaz (plot_graph y
+    reconstruct_path) lee los atributos "visited", "distance", "previous" y "size" de
+    los nodos y el estilo de los arcos, por lo que aquí se llenan a partir de las
+    distancias desde el origen y del camino encontrado.
+
+    :param graph: El grafo que se va a actualizar.
+    :param orig: Nodo de origen.
+    :param dest: Nodo de destino.
+    :param distances: Arreglo con la distancia desde el origen a cada nodo (en posiciones).
+    :param path: Lista de nodos del camino.
+    :return:
+    """
+    for node, distance in zip(graph.nodes, distances):  # Compiled positions follow graph.nodes order
+        graph.nodes[node]["visited"] = distance != float("inf")
+        graph.nodes[node]["distance"] = float(distance)
+        graph.nodes[node]["previous"] = None
+        graph.nodes[node]["size"] = 0
+
+    # Edges leaving a reached node were relaxed by the engine
+    for edge in graph.edges:
+        if graph.nodes[edge[0]]["visited"]:
+            style_visited_edge(graph, edge)
+        else:
+            style_unvisited_edge(graph, edge)
+
+    for prev, curr in zip(path, path[1:]):  # Link the path so reconstruct_path can walk it
+        graph.nodes[curr]["previous"] = prev
+
+    graph.nodes[orig]["size"] = 50
+    graph.nodes[dest]["size"] = 50
+
+
+def _run_compiled_engine(graph, orig, dest, engine, plot):
+    """
+    Ejecuta un motor de all_pairs.py y deja el resultado en el grafo.
+
+    :param graph: Grafo que contiene nodos y aristas.
+    :param orig: Nodo de origen.
+    :param dest: Nodo de destino.
+    :param engine: "floyd_warshall" o "bellman_ford".
+    :param plot: Si es True, grafica el grafo una vez que se encuentra el destino.
+    :return: Número de iteraciones, o None si no hay camino.
+    """
+    distances, path, step = shortest_path_query(graph, orig, dest, engine)
+    nodes = list(graph.nodes)
+    _apply_compiled_result(graph, orig, dest, distances, [nodes[i] for i in path])
+    if not path:  # The destination is not reachable
+        return None
+    if plot:
+        plot_graph(graph)  # Plot the graph if requested
+    return step
+
+
+@time_function
+def bellman_ford(graph, orig, dest, plot=False):
+    """
+    Realiza el algoritmo de Bellman-Ford (con cola, SPFA) desde el nodo de origen
+    hasta el nodo de destino.
+
+    A diferencia de Dijkstra, Bellman-Ford admite pesos negativos. En grafos pequeños
+    (ver ALL_PAIRS_MAX_NODES) se construye una sola vez la tabla de todos los pares,
+    y las siguientes consultas sobre el mismo grafo sólo recorren el camino; en grafos
+    grandes se ejecuta SPFA únicamente desde el nodo de origen.
+
+    :param graph: Grafo que contiene nodos y aristas.
+    :param orig: Nodo de origen.
+    :param dest: Nodo de destino.
+    :param plot: Si es True, grafica el grafo una vez que se encuentra el destino.
+    :return: Número de iteraciones que tomó encontrar el camino.
+    """
+    return _run_compiled_engine(graph, orig, dest, "bellman_ford", plot)
+
+
+@time_function
+def floyd_warshall(graph, orig, dest, plot=False):
+    """
+    Realiza el algoritmo de Floyd-Warshall y responde la consulta del nodo de origen
+    al nodo de destino.
+
+    Floyd-Warshall calcula las distancias entre todos los pares de nodos, por lo que la
+    tabla se construye una sola vez por grafo y cualquier otra selección de origen y
+    destino se responde en O(longitud del camino). Si el grafo es demasiado grande para
+    una tabla de n x n (ver ALL_PAIRS_MAX_NODES), se usa SPFA desde el nodo de origen.
+
+    :param graph: Grafo que contiene nodos y aristas.
+    :param orig: Nodo de origen.
+    :param dest: Nodo de destino.
+    :param plot: Si es True, grafica el grafo una vez que se encuentra el destino.
+    :return: Número de iteraciones que tomó encontrar el camino.
+    """
+    return _run_compiled_engine(graph, orig, dest, "floyd_warshall", plot)
+
+
+@time_function
+def time_dependent_astar(graph, orig, dest, departure=8 * 60 * 60, plot=False):
+    """
+    Busca la ruta más rápida para una hora de salida, con A* dependiente del tiempo.
+
+    El costo de cada arco es su tiempo de recorrido a la hora en que se llega a él,
+    según los perfiles de velocidad del grafo (ver time_dependent.py). El atributo
+    "distance" de los nodos queda con el tiempo en segundos desde la salida.
+
+    :param graph: Grafo que contiene nodos y aristas.
+    :param orig: Nodo de origen.
+    :param dest: Nodo de destino.
+    :param departure: Hora de salida en segundos desde la medianoche (por defecto, 8:00).
+    :param plot: Si es True, grafica el grafo una vez que se encuentra el destino.
+    :return: Número de iteraciones que tomó encontrar el camino, o None si no hay camino.
+    """
+    times, path, step = time_dependent_query(graph, orig, dest, departure)
+    nodes = list(graph.nodes)
+    _apply_compiled_result(graph, orig, dest, times, [nodes[i] for i in path])
+    if not path:  # The destination is not reachable
+        return None
+    if plot:
+        plot_graph(graph)  # Plot the graph if requested
+    return step
+
+
+# Algorithms by name, used to run them without the interface (route cache, comparisons, ...)
+ALGORITHMS = {
+    "dijkstra": dijkstra,
+    "bfs": bfs,
+    "dfs": dfs,
+    "dls": dfs_with_limit,
+    "iddfs": iterative_deepening_dfs,
+    "bellman_ford": bellman_ford,
+    "floyd_warshall": floyd_warshall,
+    "time_dependent": time_dependent_astar,
+}
+
+# Names of the algorithms in the interface
+ALGORITHM_LABELS = {
+    "dijkstra": "Dijkstra",
+    "bfs": "BFS",
+    "dfs": "DFS",
+    "dls": "DLS",
+    "iddfs": "IDDFS",
+    "bellman_ford": "Bellman-Ford",
+    "floyd_warshall": "Floyd-Warshall",
+    "time_dependent": "Time-Dependent",
+}
@@ -0,0 +1,288 @@
+"""
+Este módulo contiene los motores de caminos más cortos para todos los pares
+de nodos y para grafos con pesos negativos.
+
+Los motores implementados son:
+- Floyd-Warshall vectorizado con NumPy: para cada nodo intermedio k, la
+  relajación de toda la matriz se hace con una sola operación de mínimo.
+- Bellman-Ford con cola (SPFA): sólo vuelve a relajar los nodos cuya distancia
+  cambió, y termina en cuanto la cola se vacía (terminación temprana).
+
+Ambos motores producen una `AllPairsTable` con la matriz de distancias y la
+matriz de siguiente salto (next-hop), con la cual cualquier consulta de
+origen/destino se responde en O(longitud del camino), sin volver a ejecutar
+el algoritmo.
+
+Una tabla de todos los pares ocupa O(n²) memoria, por lo que sólo se construye
+si el grafo tiene a lo más `ALL_PAIRS_MAX_NODES[motor]` nodos. En grafos más grandes,
+`all_pairs_table` devuelve None y se debe usar un motor por consulta (por
+ejemplo, `spfa` desde el nodo de origen); `query_engine` indica cuál de los dos
+responde las consultas de un grafo.
+"""
+
+from collections import deque  # Import the deque class for the SPFA queue
+
+import numpy as np  # Import NumPy for the vectorized relaxations
+
+from .compiled import compile_graph, path_from_previous  # Import the graph compiler
+
+# Largest graph (in nodes) for which each engine builds an all-pairs table.
+# Floyd-Warshall takes about 3 s for 1000 nodes; the Bellman-Ford table runs SPFA once per node.
+ALL_PAIRS_MAX_NODES = {"floyd_warshall": 1000, "bellman_ford": 250}
+ALL_PAIRS_CACHE_KEY = "_all_pairs"  # Key used to cache the tables in graph.graph
+
+
+class NegativeCycleError(ValueError):
+    """Se lanza cuando el grafo contiene un ciclo de peso negativo."""
+
+
+class AllPairsTable:
+    """
+    Tabla de distancias y siguiente salto para todos los pares de nodos.
+
+    - dist[i, j]: distancia más corta del nodo i al nodo j (inf si no hay camino).
+    - next_hop[i, j]: posición del nodo que sigue a i en el camino hacia j (-1 si no hay camino).
+    - steps: número de iteraciones que tomó construir la tabla.
+    """
+
+    def __init__(self, compiled, dist, next_hop, steps):
+        self.compiled = compiled
+        self.dist = dist
+        self.next_hop = next_hop
+        self.steps = steps
+
+    def distance(self, orig, dest):
+        """
+        Devuelve la distancia más corta entre dos nodos.
+
+        :param orig: Nodo de origen (identificador original).
+        :param dest: Nodo de destino (identificador original).
+        :return: La distancia, o inf si no hay camino.
+        """
+        index = self.compiled.index
+        return float(self.dist[index[orig], index[dest]])
+
+    def path_indices(self, i, j):
+        """
+        Reconstruye el camino entre dos posiciones siguiendo la matriz de siguiente salto.
+
+        :param i: Posición del nodo de origen.
+        :param j: Posición del nodo de destino.
+        :return: Lista de posiciones del camino, o una lista vacía si no hay camino.
+        """
+        if self.next_hop[i, j] < 0:
+            return []
+        path = [i]
+        while i != j:
+            i = int(self.next_hop[i, j])
+            path.append(i)
+        return path
+
+    def path(self, orig, dest):
+        """
+        Reconstruye el camino entre dos nodos en O(longitud del camino).
+
+        :param orig: Nodo de origen (identificador original).
+        :param dest: Nodo de destino (identificador original).
+        :return: Lista de nodos del camino, o una lista vacía si no hay camino.
+        """
+        index, nodes = self.compiled.index, self.compiled.nodes
+        return [nodes[i] for i in self.path_indices(index[orig], index[dest])]
+
+
+def floyd_warshall_table(compiled):
+    """
+    Calcula la tabla de todos los pares con Floyd-Warshall vectorizado.
+
+    Para cada nodo intermedio k se calcula, de una sola vez,
+    dist[:, k] + dist[k, :] y se toma el mínimo con la matriz actual;
+    los pares que mejoraron copian el siguiente salto hacia k.
+
+    :param compiled: El grafo compilado.
+    :return: Una AllPairsTable.
+    :raises NegativeCycleError: Si el grafo contiene un ciclo negativo.
+    """
+    n = compiled.num_nodes
+    dist = np.full((n, n), np.inf)
+    next_hop = np.full((n, n), -1, dtype=np.int32)
+
+    # Direct edges; parallel edges keep the smallest weight
+    np.minimum.at(dist, (compiled.sources, compiled.indices), compiled.weights)
+    has_edge = np.isfinite(dist)
+    next_hop[has_edge] = np.nonzero(has_edge)[1]
+    diagonal = np.arange(n)
+    dist[diagonal, diagonal] = np.minimum(dist[diagonal, diagonal], 0)
+    next_hop[diagonal, diagonal] = diagonal
+
+    alt = np.empty_like(dist)  # Reused buffer for the candidate distances
+    improved = np.empty((n, n), dtype=bool)
+    for k in range(n):
+        np.add(dist[:, k, None], dist[None, k, :], out=alt)
+        np.less(alt, dist, out=improved)
+        np.copyto(dist, alt, where=improved)
+        np.copyto(next_hop, np.broadcast_to(next_hop[:, k, None], (n, n)), where=improved)
+
+    if np.any(dist[diagonal, diagonal] < 0):
+        raise NegativeCycleError("The graph contains a negative-weight cycle.")
+    return AllPairsTable(compiled, dist, next_hop, n)
+
+
+def spfa(compiled, source):
+    """
+    Bellman-Ford con cola (Shortest Path Faster Algorithm) desde un nodo de origen.
+
+    A diferencia de Bellman-Ford clásico, que relaja todos los arcos n - 1 veces,
+    aquí sólo se relajan los arcos de los nodos cuya distancia cambió, y el
+    algoritmo termina en cuanto no quedan nodos en la cola.
+
+    Si un nodo entra a la cola n veces, existe un ciclo negativo alcanzable.
+
+    :param compiled: El grafo compilado.
+    :param source: Posición del nodo de origen.
+    :return: Tupla (distancias, predecesores, iteraciones) con arreglos de NumPy.
+    :raises NegativeCycleError: Si hay un ciclo negativo alcanzable desde el origen.
+    """
+    n = compiled.num_nodes
+    indptr, indices, weights = compiled.indptr, compiled.indices, compiled.weights
+    dist = np.full(n, np.inf)
+    previous = np.full(n, -1, dtype=np.int32)
+    in_queue = np.zeros(n, dtype=bool)
+    enqueued = np.zeros(n, dtype=np.int32)
+
+    dist[source] = 0
+    queue = deque([source])
+    in_queue[source] = True
+    step = 0
+
+    while queue:  # Continue while some distance changed since its last relaxation
+        node = queue.popleft()
+        in_queue[node] = False
+        start, end = indptr[node], indptr[node + 1]
+        # Relax every outgoing edge of the node at once
+        neighbors = indices[start:end]
+        candidate = dist[node] + weights[start:end]
+        better = candidate < dist[neighbors]
+        for neighbor, value in zip(neighbors[better], candidate[better]):
+            if value < dist[neighbor]:  # Parallel edges may repeat a neighbor
+                dist[neighbor] = value
+                previous[neighbor] = node
+                if not in_queue[neighbor]:
+                    enqueued[neighbor] += 1
+                    if enqueued[neighbor] >= n:
+                        raise NegativeCycleError("The graph contains a negative-weight cycle.")
+                    in_queue[neighbor] = True
+                    queue.append(neighbor)
+        step += 1
+
+    return dist, previous, step
+
+
+def _next_hop_from_previous(source, previous):
+    """
+    Convierte el árbol de predecesores de un origen en la fila de siguiente salto.
+
+    El siguiente salto de un nodo es el primer nodo después del origen en su
+    camino. Se propaga por saltos de puntero (pointer jumping), por lo que el
+    número de pasadas es logarítmico en la profundidad del árbol.
+
+    :param source: Posición del nodo de origen.
+    :param previous: Arreglo de predecesores devuelto por `spfa`.
+    :return: Arreglo con el siguiente salto de cada nodo (-1 si no es alcanzable).
+    """
+    n = len(previous)
+    hop = np.where(previous == source, np.arange(n, dtype=np.int32), -1).astype(np.int32)
+    hop[source] = source
+    ancestor = previous.copy()
+    pending = (hop < 0) & (ancestor >= 0)
+    while np.any(pending):
+        resolved = pending & (hop[ancestor] >= 0)
+        hop[resolved] = hop[ancestor[resolved]]
+        pending &= ~resolved
+        ancestor[pending] = ancestor[ancestor[pending]]  # Jump two levels up the tree
+        pending &= ancestor >= 0
+    return hop
+
+
+def bellman_ford_table(compiled):
+    """
+    Calcula la tabla de todos los pares ejecutando SPFA desde cada nodo.
+
+    Es más lento que Floyd-Warshall en grafos densos, pero en redes de calles
+    (grafos dispersos) cada ejecución suele terminar mucho antes de n pasadas.
+
+    :param compiled: El grafo compilado.
+    :return: Una AllPairsTable.
+    :raises NegativeCycleError: Si el grafo contiene un ciclo negativo.
+    """
+    n = compiled.num_nodes
+    dist = np.empty((n, n))
+    next_hop = np.empty((n, n), dtype=np.int32)
+    steps = 0
+    for source in range(n):
+        dist[source], previous, step = spfa(compiled, source)
+        next_hop[source] = _next_hop_from_previous(source, previous)
+        steps += step
+    return AllPairsTable(compiled, dist, next_hop, steps)
+
+
+ALL_PAIRS_ENGINES = {
+    "floyd_warshall": floyd_warshall_table,
+    "bellman_ford": bellman_ford_table,
+}
+
+
+def all_pairs_table(graph, engine="floyd_warshall", max_nodes=None):
+    """
+    Devuelve la tabla de todos los pares del grafo, calculándola sólo la primera vez.
+
+    La tabla se guarda en graph.graph, por lo que las siguientes consultas sobre
+    el mismo grafo (otro origen o destino en la interfaz) sólo recorren el camino.
+
+    :param graph: El grafo de NetworkX.
+    :param engine: "floyd_warshall" o "bellman_ford".
+    :param max_nodes: Límite de nodos; por defecto ALL_PAIRS_MAX_NODES[engine].
+    :return: La AllPairsTable, o None si el grafo es demasiado grande.
+    """
+    if max_nodes is None:
+        max_nodes = ALL_PAIRS_MAX_NODES[engine]
+    if graph.number_of_nodes() > max_nodes:
+        return None
+
+    tables = graph.graph.setdefault(ALL_PAIRS_CACHE_KEY, {})
+    if engine not in tables:
+        tables[engine] = ALL_PAIRS_ENGINES[engine](compile_graph(graph))
+    return tables[engine]
+
+
+def query_engine(graph, engine="floyd_warshall"):
+    """
+    Indica qué motor responde las consultas de `engine` sobre un grafo.
+
+    :param graph: El grafo de NetworkX.
+    :param engine: "floyd_warshall" o "bellman_ford".
+    :return: `engine` si el grafo cabe en la tabla de todos los pares (ver
+        ALL_PAIRS_MAX_NODES), o "spfa" si se ejecuta SPFA desde el nodo de origen.
+    """
+    return engine if graph.number_of_nodes() <= ALL_PAIRS_MAX_NODES[engine] else "spfa"
+
+
+def shortest_path_query(graph, orig, dest, engine="floyd_warshall"):
+    """
+    Responde una consulta de origen/destino con el motor indicado.
+
+    Si el grafo es suficientemente pequeño, se usa (o se construye) la tabla de
+    todos los pares; si no, se ejecuta SPFA sólo desde el nodo de origen (ver query_engine).
+
+    :param graph: El grafo de NetworkX.
+    :param orig: Nodo de origen.
+    :param dest: Nodo de destino.
+    :param engine: "floyd_warshall" o "bellman_ford".
+    :return: Tupla (distancias desde el origen, camino en posiciones, iteraciones).
+    """
+    compiled = compile_graph(graph)
+    i, j = compiled.index[orig], compiled.index[dest]
+    if query_engine(graph, engine) == engine:
+        table = all_pairs_table(graph, engine)
+        return table.dist[i], table.path_indices(i, j), table.steps
+    distances, previous, step = spfa(compiled, i)  # Per-query fallback for large graphs
+    return distances, path_from_previous(previous, i, j), step
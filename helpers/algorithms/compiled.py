@@ -0,0 +1,209 @@
+"""
+Este módulo convierte el grafo de OSMnx (un MultiDiGraph de NetworkX) en una
+representación compacta basada en arreglos de NumPy.
+
+Los algoritmos originales trabajan directamente sobre los diccionarios de
+atributos de NetworkX, lo cual es cómodo para graficar pero lento para
+algoritmos que recorren el grafo muchas veces (por ejemplo, Floyd-Warshall
+o Bellman-Ford). El grafo compilado guarda la misma información en formato
+CSR (Compressed Sparse Row):
+
+- nodes: Lista con los identificadores originales de los nodos.
+- index: Diccionario que convierte un identificador de nodo en su posición.
+- indptr: Los arcos que salen del nodo i están en el rango indptr[i]:indptr[i + 1].
+- sources: Nodo de origen (posición) de cada arco.
+- indices: Nodo de destino (posición) de cada arco.
+- keys: Llave del arco en el MultiDiGraph (normalmente 0).
+- weights: Peso de cada arco (tiempo en segundos, calculado en clean_graph).
+- lengths: Longitud de cada arco en metros.
+- x, y: Coordenadas de cada nodo (longitud y latitud), NaN si no existen.
+- edge_order: Posición de cada arco en el orden de graph.edges.
+- cache: Diccionario para datos derivados que se calculan una sola vez por grafo
+  (por ejemplo, los segmentos que se envían al graficador WebGL).
+
+El grafo compilado se guarda en `graph.graph` para que varias consultas sobre
+el mismo grafo no tengan que volver a compilarlo.
+"""
+
+import hashlib  # Import hashlib to fingerprint the compiled graph
+
+import numpy as np  # Import NumPy for the compact arrays
+
+COMPILED_CACHE_KEY = "_compiled"  # Key used to cache the compiled graph in graph.graph
+
+
+class CompiledGraph:
+    """
+    Representación compacta (CSR) de un grafo dirigido.
+
+    Se construye con `compile_graph` y no debe modificarse después de creada,
+    ya que se comparte entre todas las consultas sobre el mismo grafo.
+    """
+
+    def __init__(self, nodes, indptr, sources, indices, keys, weights, lengths, x, y, edge_order=None):
+        self.nodes = nodes  # Original node ids, in index order
+        self.index = {node: i for i, node in enumerate(nodes)}  # Node id -> position
+        self.indptr = indptr
+        self.sources = sources
+        self.indices = indices
+        self.keys = keys
+        self.weights = weights
+        self.lengths = lengths
+        self.x = x
+        self.y = y
+        self.edge_order = edge_order
+        self.cache = {}
+        self._fingerprint = None
+
+    @property
+    def num_nodes(self):
+        """Número de nodos del grafo."""
+        return len(self.nodes)
+
+    @property
+    def num_edges(self):
+        """Número de arcos del grafo."""
+        return len(self.indices)
+
+    def fingerprint(self):
+        """
+        Devuelve una huella (hash) del grafo que cambia si cambian sus nodos, arcos o pesos.
+
+        Se utiliza para invalidar resultados guardados (por ejemplo, en el caché de rutas)
+        cuando el grafo o sus pesos cambian.
+
+        :return: Cadena hexadecimal.
+        """
+        if self._fingerprint is None:
+            digest = hashlib.blake2b(digest_size=16)
+            digest.update(repr(self.nodes).encode())
+            for array in (self.indptr, self.indices, self.keys, self.weights, self.lengths):
+                digest.update(np.ascontiguousarray(array).tobytes())
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    def out_edges(self, i):
+        """
+        Devuelve el rango de arcos que salen del nodo en la posición `i`.
+
+        :param i: Posición del nodo.
+        :return: Objeto range con las posiciones de los arcos.
+        """
+        return range(self.indptr[i], self.indptr[i + 1])
+
+    def edge_id(self, edge_index):
+        """
+        Convierte la posición de un arco en la tupla (u, v, key) del grafo original.
+
+        :param edge_index: Posición del arco en los arreglos compilados.
+        :return: Tupla (nodo_inicial, nodo_final, llave).
+        """
+        return (self.nodes[self.sources[edge_index]],
+                self.nodes[self.indices[edge_index]],
+                int(self.keys[edge_index]))
+
+    def find_edge(self, i, j):
+        """
+        Busca el arco de menor peso que va del nodo `i` al nodo `j` (posiciones).
+
+        :param i: Posición del nodo inicial.
+        :param j: Posición del nodo final.
+        :return: Posición del arco, o -1 si no existe.
+        """
+        start, end = self.indptr[i], self.indptr[i + 1]
+        candidates = np.flatnonzero(self.indices[start:end] == j)
+        if len(candidates) == 0:
+            return -1
+        return int(start + candidates[np.argmin(self.weights[start + candidates])])
+
+
+def compile_graph(graph, weight="weight", cache=True):
+    """
+    Compila el grafo de NetworkX en un `CompiledGraph`.
+
+    Los arcos se ordenan por nodo de origen para formar la estructura CSR.
+    Si un arco no tiene el atributo de peso, se utiliza su longitud; si tampoco
+    tiene longitud, se asume peso 1 (por ejemplo, en grafos cargados de CSV).
+
+    :param graph: El grafo que se va a compilar.
+    :param weight: Nombre del atributo de los arcos que se usa como peso.
+    :param cache: Si es True, se reutiliza (y guarda) el grafo compilado en graph.graph.
+    :return: El grafo compilado.
+    """
+    if cache:
+        cached = graph.graph.get(COMPILED_CACHE_KEY)
+        if cached is not None and cached[0] == weight:
+            return cached[1]
+
+    nodes = list(graph.nodes)
+    index = {node: i for i, node in enumerate(nodes)}
+    num_nodes = len(nodes)
+    num_edges = graph.number_of_edges()
+
+    sources = np.empty(num_edges, dtype=np.int32)
+    indices = np.empty(num_edges, dtype=np.int32)
+    keys = np.zeros(num_edges, dtype=np.int32)
+    weights = np.empty(num_edges, dtype=np.float64)
+    lengths = np.empty(num_edges, dtype=np.float64)
+
+    # Read every edge once; MultiDiGraphs yield (u, v, key, data), DiGraphs yield (u, v, data)
+    multigraph = graph.is_multigraph()
+    edges = graph.edges(keys=True, data=True) if multigraph else graph.edges(data=True)
+    for e, edge in enumerate(edges):
+        data = edge[-1]
+        sources[e] = index[edge[0]]
+        indices[e] = index[edge[1]]
+        if multigraph:
+            keys[e] = edge[2]
+        length = data.get("length", 1.0)
+        lengths[e] = length
+        weights[e] = data.get(weight, length)
+
+    # Sort the edges by source node to build the CSR layout
+    order = np.argsort(sources, kind="stable")
+    sources, indices, keys = sources[order], indices[order], keys[order]
+    weights, lengths = weights[order], lengths[order]
+    indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=num_nodes), out=indptr[1:])
+
+    # Node coordinates (x is longitude and y is latitude in OSMnx graphs)
+    x = np.array([graph.nodes[node].get("x", np.nan) for node in nodes], dtype=np.float64)
+    y = np.array([graph.nodes[node].get("y", np.nan) for node in nodes], dtype=np.float64)
+
+    compiled = CompiledGraph(nodes, indptr, sources, indices, keys, weights, lengths, x, y, edge_order=order)
+    if cache:
+        graph.graph[COMPILED_CACHE_KEY] = (weight, compiled)
+    return compiled
+
+
+def invalidate_compiled(graph):
+    """
+    Elimina de graph.graph el grafo compilado y cualquier tabla derivada de él.
+
+    Se debe llamar cada vez que cambian los nodos, los arcos o los pesos del grafo.
+    Por convención, todas las llaves de graph.graph que empiezan con "_" son cachés.
+
+    :param graph: El grafo cuyo caché se va a eliminar.
+    :return:
+    """
+    for key in [key for key in graph.graph if key.startswith("_")]:
+        del graph.graph[key]
+
+
+def path_from_previous(previous, orig, dest):
+    """
+    Reconstruye un camino a partir de un arreglo de predecesores en O(longitud del camino).
+
+    :param previous: Arreglo con la posición del predecesor de cada nodo (-1 si no tiene).
+    :param orig: Posición del nodo de origen.
+    :param dest: Posición del nodo de destino.
+    :return: Lista de posiciones del camino, o una lista vacía si no hay camino.
+    """
+    path = [dest]
+    while path[-1] != orig:
+        prev = int(previous[path[-1]])
+        if prev < 0:
+            return []
+        path.append(prev)
+    path.reverse()
+    return path
@@ -0,0 +1,221 @@
+"""
+Este módulo busca varios destinos (o varios orígenes) en una sola pasada.
+
+Para saber cuál de varios candidatos (hospitales, almacenes, etc.) está más cerca
+de un nodo, antes había que ejecutar `dijkstra` una vez por candidato, y cada
+ejecución reiniciaba los atributos de todo el grafo. Aquí se usa el grafo
+compilado y un solo Dijkstra:
+
+- nearest_targets: Dijkstra desde un origen que termina en cuanto se procesaron
+  los k destinos más cercanos (o todos). Con reverse=True la búsqueda se hace
+  sobre el grafo invertido, es decir, del conjunto de nodos hacia un destino
+  (muchos a uno).
+- voronoi_partition: Dijkstra con varios orígenes a la vez (uno por instalación)
+  que asigna cada nodo a la instalación más cercana en una sola pasada (partición
+  de Voronoi sobre la red). Con reverse=True (por defecto) la distancia es la del
+  nodo hacia la instalación, que es la que importa para llegar a un hospital.
+
+Los resultados son arreglos compactos de NumPy, listos para graficar o exportar.
+Las distancias están en las unidades del peso (segundos, ver clean_graph).
+"""
+
+import heapq  # Import the heapq module for the priority queue
+
+import numpy as np  # Import NumPy for the compact result arrays
+
+from .compiled import compile_graph, path_from_previous  # Import the graph compiler
+from .paths import path_from_nodes  # Import the path builder
+
+
+def reverse_csr(compiled):
+    """
+    Devuelve la estructura CSR del grafo invertido (los arcos que entran a cada nodo).
+
+    Se calcula una sola vez por grafo y se guarda en el caché del grafo compilado.
+
+    :param compiled: El grafo compilado.
+    :return: Tupla (indptr, indices, weights, edges); edges es la posición de cada arco
+        invertido en el grafo compilado.
+    """
+    if "reverse_csr" not in compiled.cache:
+        order = np.argsort(compiled.indices, kind="stable")
+        indptr = np.zeros(compiled.num_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(compiled.indices, minlength=compiled.num_nodes), out=indptr[1:])
+        compiled.cache["reverse_csr"] = (indptr, compiled.sources[order], compiled.weights[order], order)
+    return compiled.cache["reverse_csr"]
+
+
+def multi_source_dijkstra(indptr, indices, weights, sources, targets=None, k=None):
+    """
+    Dijkstra desde varios orígenes a la vez sobre una estructura CSR.
+
+    Cada nodo queda asignado al origen desde el que se llegó primero. Si se indican
+    destinos, la búsqueda termina en cuanto se procesaron k de ellos (todos si k es None).
+
+    :param indptr: Los arcos que salen del nodo i están en indptr[i]:indptr[i + 1].
+    :param indices: Nodo de destino de cada arco.
+    :param weights: Peso de cada arco.
+    :param sources: Posiciones de los nodos de origen.
+    :param targets: Posiciones de los nodos de destino (opcional).
+    :param k: Número de destinos que se buscan.
+    :return: Tupla (distancias, predecesores, origen asignado (posición en sources, -1 si
+        no se alcanzó), destinos procesados en orden de distancia, iteraciones).
+    """
+    n = len(indptr) - 1
+    dist = np.full(n, np.inf)
+    previous = np.full(n, -1, dtype=np.int32)
+    owner = np.full(n, -1, dtype=np.int32)
+    settled = np.zeros(n, dtype=bool)
+
+    is_target = np.zeros(n, dtype=bool)
+    if targets is not None:
+        is_target[np.asarray(targets, dtype=np.int64)] = True
+    remaining = int(is_target.sum()) if k is None else min(k, int(is_target.sum()))
+    found = []
+
+    queue = []
+    for label, source in enumerate(sources):
+        if dist[source] > 0:  # A repeated source keeps its first label
+            dist[source] = 0
+            owner[source] = label
+            queue.append((0.0, int(source)))
+    heapq.heapify(queue)
+    step = 0
+
+    while queue and (targets is None or len(found) < remaining):
+        d, node = heapq.heappop(queue)
+        if settled[node]:  # Skip stale queue entries
+            continue
+        settled[node] = True
+        if is_target[node]:
+            found.append(node)
+        start, end = indptr[node], indptr[node + 1]
+        # Relax every outgoing edge of the node at once
+        neighbors = indices[start:end]
+        candidate = d + weights[start:end]
+        better = candidate < dist[neighbors]
+        for neighbor, value in zip(neighbors[better].tolist(), candidate[better].tolist()):
+            if value < dist[neighbor]:  # Parallel edges may repeat a neighbor
+                dist[neighbor] = value
+                previous[neighbor] = node
+                owner[neighbor] = owner[node]
+                heapq.heappush(queue, (value, neighbor))
+        step += 1
+
+    return dist, previous, owner, np.array(found, dtype=np.int32), step
+
+
+class MultiTargetResult:
+    """
+    Resultado de nearest_targets: los destinos alcanzados, del más cercano al más lejano.
+
+    - targets: Posiciones de los destinos en el grafo compilado.
+    - distances: Distancia (peso total) del origen a cada destino, o de cada destino
+      al origen si reverse es True.
+    - steps: Número de nodos procesados.
+    """
+
+    def __init__(self, compiled, root, targets, distances, previous, steps, reverse=False):
+        self.compiled = compiled
+        self.root = root  # Position of the single origin (or destination if reverse)
+        self.targets = targets
+        self.distances = distances
+        self.previous = previous
+        self.steps = steps
+        self.reverse = reverse
+
+    @property
+    def nodes(self):
+        """Lista con los identificadores originales de los destinos alcanzados."""
+        return [self.compiled.nodes[i] for i in self.targets]
+
+    def path(self, i):
+        """
+        Devuelve la ruta al i-ésimo destino más cercano (o desde él, si reverse es True).
+
+        :param i: Posición del destino en `targets`.
+        :return: El PathResult.
+        """
+        nodes = path_from_previous(self.previous, self.root, int(self.targets[i]))
+        if self.reverse:  # Walked on the reversed graph: from the root back to the target
+            nodes.reverse()
+        return path_from_nodes(self.compiled, nodes)
+
+
+def nearest_targets(graph, orig, targets, k=None, reverse=False):
+    """
+    Busca los k destinos más cercanos a un nodo con un solo Dijkstra.
+
+    :param graph: El grafo limpio (no se modifica).
+    :param orig: Nodo de origen (o de destino, si reverse es True).
+    :param targets: Nodos candidatos.
+    :param k: Número de destinos que se buscan (todos si es None).
+    :param reverse: Si es True, se mide la distancia de cada candidato hacia orig (muchos a uno).
+    :return: Un MultiTargetResult con los destinos alcanzados en orden de distancia.
+    """
+    compiled = compile_graph(graph)
+    if reverse:
+        indptr, indices, weights, _ = reverse_csr(compiled)
+    else:
+        indptr, indices, weights = compiled.indptr, compiled.indices, compiled.weights
+    root = compiled.index[orig]
+    target_indices = [compiled.index[target] for target in targets]
+    dist, previous, _, found, step = multi_source_dijkstra(indptr, indices, weights, [root], target_indices, k)
+    return MultiTargetResult(compiled, root, found, dist[found], previous, step, reverse)
+
+
+class VoronoiPartition:
+    """
+    Partición de Voronoi de la red: la instalación más cercana a cada nodo.
+
+    - facilities: Posiciones de las instalaciones en el grafo compilado.
+    - owner: Para cada nodo, la posición en `facilities` de su instalación (-1 si no
+      puede llegar a ninguna).
+    - distances: Distancia de cada nodo a su instalación.
+    """
+
+    def __init__(self, compiled, facilities, owner, distances, steps, reverse=True):
+        self.compiled = compiled
+        self.facilities = facilities
+        self.owner = owner
+        self.distances = distances
+        self.steps = steps
+        self.reverse = reverse
+
+    def sizes(self):
+        """
+        Cuenta los nodos asignados a cada instalación.
+
+        :return: Arreglo con el número de nodos de cada instalación.
+        """
+        return np.bincount(self.owner[self.owner >= 0], minlength=len(self.facilities))
+
+    def facility_of(self, node):
+        """
+        Devuelve la instalación asignada a un nodo.
+
+        :param node: El nodo.
+        :return: El nodo de la instalación, o None si no puede llegar a ninguna.
+        """
+        label = self.owner[self.compiled.index[node]]
+        return self.compiled.nodes[self.facilities[label]] if label >= 0 else None
+
+
+def voronoi_partition(graph, facilities, reverse=True):
+    """
+    Asigna cada nodo a la instalación más cercana con un solo Dijkstra de varios orígenes.
+
+    :param graph: El grafo limpio (no se modifica).
+    :param facilities: Nodos de las instalaciones.
+    :param reverse: Si es True, se mide la distancia de cada nodo hacia la instalación;
+        si es False, de la instalación hacia cada nodo.
+    :return: La VoronoiPartition.
+    """
+    compiled = compile_graph(graph)
+    if reverse:
+        indptr, indices, weights, _ = reverse_csr(compiled)
+    else:
+        indptr, indices, weights = compiled.indptr, compiled.indices, compiled.weights
+    sources = np.array([compiled.index[facility] for facility in facilities], dtype=np.int32)
+    dist, _, owner, _, step = multi_source_dijkstra(indptr, indices, weights, sources)
+    return VoronoiPartition(compiled, sources, owner, dist, step, reverse)
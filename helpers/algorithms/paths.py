@@ -0,0 +1,236 @@
+"""
+Este módulo extrae rutas del grafo compilado y exporta su geometría.
+
+Una ruta se representa con un `PathResult`, que contiene:
+- node_indices: Posiciones de los nodos de la ruta en el grafo compilado.
+- edge_indices: Posiciones de los arcos de la ruta en el grafo compilado.
+- distance: Distancia total en kilómetros (suma de "length").
+- total_time: Tiempo total en minutos (suma de "weight", el tiempo de cada arco).
+- average_speed: Velocidad promedio en km/h (distancia entre tiempo).
+
+La extracción recorre sólo los nodos de la ruta, O(longitud de la ruta), sin tocar
+el resto del grafo.
+
+La geometría de las rutas se puede exportar como GeoJSON o como WKB (Well-Known
+Binary), de forma incremental (streaming), para que otros servicios puedan usar
+las rutas sin volver a cargar el grafo.
+"""
+
+import json  # Import json to serialize the GeoJSON properties
+import struct  # Import struct to write the WKB headers
+
+import numpy as np  # Import NumPy for the path arrays
+
+from .compiled import compile_graph, path_from_previous  # Import the graph compiler
+
+WKB_LINESTRING = 2  # WKB geometry type of a LineString
+
+
+class PathResult:
+    """
+    Ruta extraída del grafo compilado, con sus métricas calculadas arco por arco.
+    """
+
+    def __init__(self, compiled, node_indices, edge_indices):
+        self.compiled = compiled
+        self.node_indices = np.asarray(node_indices, dtype=np.int32)
+        self.edge_indices = np.asarray(edge_indices, dtype=np.int64)
+        if self.found:
+            self.distance = float(compiled.lengths[self.edge_indices].sum()) / 1000  # Meters to kilometers
+            self.total_time = float(compiled.weights[self.edge_indices].sum()) / 60  # Seconds to minutes
+        else:
+            self.distance = self.total_time = float("inf")
+        if self.found and self.total_time > 0:
+            self.average_speed = self.distance / (self.total_time / 60)  # km/h
+        else:
+            self.average_speed = 0
+
+    @property
+    def found(self):
+        """True si existe la ruta."""
+        return len(self.node_indices) > 0
+
+    @property
+    def nodes(self):
+        """Lista con los identificadores originales de los nodos de la ruta."""
+        return [self.compiled.nodes[i] for i in self.node_indices]
+
+    @property
+    def has_coordinates(self):
+        """True si todos los nodos de la ruta tienen coordenadas (x, y)."""
+        x, y = self.compiled.x[self.node_indices], self.compiled.y[self.node_indices]
+        return bool(np.isfinite(x).all() and np.isfinite(y).all())
+
+    def metrics(self):
+        """
+        Devuelve las métricas de la ruta, en el mismo orden que reconstruct_path.
+
+        :return: Tupla (distancia, velocidad promedio, tiempo total).
+        """
+        return self.distance, self.average_speed, self.total_time
+
+    def iter_coordinates(self, graph=None):
+        """
+        Genera las coordenadas (x, y) de la ruta, una por una.
+
+        Si se proporciona el grafo original y sus arcos tienen el atributo "geometry"
+        (OSMnx lo agrega al simplificar el grafo), se usa la forma real de la calle;
+        si no, cada arco es un segmento recto entre sus dos nodos. Una ruta de un solo
+        nodo (origen igual a destino) se representa con ese punto repetido.
+
+        :param graph: El grafo original (opcional).
+        :return: Generador de tuplas (x, y).
+        """
+        compiled = self.compiled
+        if not self.found:
+            return
+        first = self.node_indices[0]
+        yield float(compiled.x[first]), float(compiled.y[first])
+        if len(self.edge_indices) == 0:  # A LineString needs at least two points
+            yield float(compiled.x[first]), float(compiled.y[first])
+        for e in self.edge_indices:
+            geometry = graph.edges[compiled.edge_id(e)].get("geometry") if graph is not None else None
+            if geometry is not None:
+                for x, y in list(geometry.coords)[1:]:  # The first point is the previous node
+                    yield float(x), float(y)
+            else:
+                target = compiled.indices[e]
+                yield float(compiled.x[target]), float(compiled.y[target])
+
+
+def path_from_nodes(compiled, node_indices):
+    """
+    Construye un PathResult a partir de la secuencia de nodos de la ruta.
+
+    Entre dos nodos consecutivos se usa el arco de menor peso.
+
+    :param compiled: El grafo compilado.
+    :param node_indices: Posiciones de los nodos de la ruta.
+    :return: El PathResult.
+    :raises ValueError: Si dos nodos consecutivos no están conectados.
+    """
+    edge_indices = np.empty(max(len(node_indices) - 1, 0), dtype=np.int64)
+    for k, (i, j) in enumerate(zip(node_indices, node_indices[1:])):
+        edge_indices[k] = compiled.find_edge(i, j)
+        if edge_indices[k] < 0:
+            raise ValueError(f"There is no edge from {compiled.nodes[i]!r} to {compiled.nodes[j]!r}.")
+    return PathResult(compiled, node_indices, edge_indices)
+
+
+def extract_path(compiled, previous, orig, dest):
+    """
+    Extrae la ruta de un arreglo de predecesores (como el que devuelve `spfa`).
+
+    :param compiled: El grafo compilado.
+    :param previous: Arreglo con la posición del predecesor de cada nodo (-1 si no tiene).
+    :param orig: Posición del nodo de origen.
+    :param dest: Posición del nodo de destino.
+    :return: El PathResult (con found=False si no hay ruta).
+    """
+    return path_from_nodes(compiled, path_from_previous(previous, orig, dest))
+
+
+def path_from_graph(graph, orig, dest):
+    """
+    Extrae la ruta siguiendo el atributo "previous" que dejan los algoritmos en los nodos.
+
+    Sólo se leen los nodos de la ruta, no se modifica el grafo.
+
+    :param graph: El grafo sobre el que se ejecutó el algoritmo.
+    :param orig: Nodo de origen.
+    :param dest: Nodo de destino.
+    :return: El PathResult (con found=False si no hay ruta).
+    """
+    compiled = compile_graph(graph)
+    index = compiled.index
+    path = [index[dest]]
+    curr = dest
+    while curr != orig:
+        curr = graph.nodes[curr].get("previous")
+        if curr is None:  # The destination was not reached
+            return PathResult(compiled, [], [])
+        path.append(index[curr])
+    path.reverse()
+    return path_from_nodes(compiled, path)
+
+
+def iter_geojson(paths, graph=None, chunk_size=1024):
+    """
+    Genera, por partes, una FeatureCollection de GeoJSON con una LineString por ruta.
+
+    Cada Feature incluye como propiedades el origen, el destino, la distancia (km),
+    el tiempo (minutos) y la velocidad promedio (km/h). Las coordenadas se escriben
+    en bloques de `chunk_size` puntos, por lo que nunca se arma el documento completo
+    en memoria.
+
+    Las rutas no encontradas y las que pasan por nodos sin coordenadas se omiten, ya
+    que GeoJSON no admite NaN y el documento no se puede corregir una vez enviado.
+
+    :param paths: Iterable de PathResult.
+    :param graph: El grafo original, para usar la geometría real de las calles (opcional).
+    :param chunk_size: Número de coordenadas por bloque.
+    :return: Generador de cadenas que, concatenadas, forman el documento GeoJSON.
+    """
+    yield '{"type": "FeatureCollection", "features": ['
+    for k, path in enumerate(p for p in paths if p.found and p.has_coordinates):
+        properties = {
+            "orig": path.compiled.nodes[path.node_indices[0]],
+            "dest": path.compiled.nodes[path.node_indices[-1]],
+            "distance_km": path.distance,
+            "travel_time_min": path.total_time,
+            "average_speed_kmh": path.average_speed,
+        }
+        yield (", " if k else "") + '{"type": "Feature", "properties": ' + json.dumps(properties, default=str)
+        yield ', "geometry": {"type": "LineString", "coordinates": ['
+        chunk = []
+        first = True
+        for x, y in path.iter_coordinates(graph):
+            chunk.append(f"[{x!r}, {y!r}]")
+            if len(chunk) == chunk_size:
+                yield ("" if first else ", ") + ", ".join(chunk)
+                chunk, first = [], False
+        if chunk:
+            yield ("" if first else ", ") + ", ".join(chunk)
+        yield "]}}"
+    yield "]}"
+
+
+def write_geojson(fp, paths, graph=None):
+    """
+    Escribe las rutas como GeoJSON en un archivo abierto en modo texto.
+
+    :param fp: El archivo.
+    :param paths: Iterable de PathResult.
+    :param graph: El grafo original, para usar la geometría real de las calles (opcional).
+    :return:
+    """
+    for chunk in iter_geojson(paths, graph):
+        fp.write(chunk)
+
+
+def path_to_wkb(path, graph=None):
+    """
+    Convierte la geometría de una ruta en una LineString WKB (little endian).
+
+    :param path: El PathResult.
+    :param graph: El grafo original, para usar la geometría real de las calles (opcional).
+    :return: Los bytes WKB.
+    """
+    coordinates = np.array(list(path.iter_coordinates(graph)), dtype="<f8").reshape(-1, 2)
+    return struct.pack("<BII", 1, WKB_LINESTRING, len(coordinates)) + coordinates.tobytes()
+
+
+def iter_wkb(paths, graph=None):
+    """
+    Genera la geometría WKB de cada ruta, una por una.
+
+    Igual que en iter_geojson, se omiten las rutas no encontradas y las que pasan por
+    nodos sin coordenadas.
+
+    :param paths: Iterable de PathResult.
+    :param graph: El grafo original, para usar la geometría real de las calles (opcional).
+    :return: Generador de bytes WKB.
+    """
+    for path in paths:
+        if path.found and path.has_coordinates:
+            yield path_to_wkb(path, graph)
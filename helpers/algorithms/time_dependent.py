@@ -0,0 +1,286 @@
+"""
+Este módulo calcula rutas que dependen de la hora de salida.
+
+`clean_graph` calcula un solo peso por arco (el tiempo a la velocidad máxima), pero
+el tiempo real de recorrido cambia según la hora del día. Aquí cada arco tiene un
+perfil de velocidad: un factor (entre 0 y 1) que multiplica su velocidad sin
+tráfico en cada intervalo del día, con 24 intervalos (uno por hora) o 96 (uno
+cada 15 minutos).
+
+Los perfiles se guardan de forma compacta en `SpeedProfiles`:
+- factors: Matriz (perfiles x intervalos) con los perfiles distintos, en float32.
+- edge_profile: Número de perfil de cada arco del grafo compilado.
+
+Los arcos con el mismo perfil lo comparten, por lo que la memoria extra es de uno o
+dos bytes por arco más unos cuantos perfiles. Si los arcos tienen el atributo
+"speed_profile" (una lista de factores, por ejemplo de datos de tráfico), se usa;
+si no, se asigna un perfil típico de hora pico según la velocidad máxima del arco.
+
+El tiempo de recorrido de un arco se calcula integrando la velocidad desde la hora
+de llegada al arco, de modo que si el intervalo cambia a mitad del arco, el resto
+se recorre a la nueva velocidad. Así, salir más tarde nunca hace llegar antes
+(propiedad FIFO), y Dijkstra sigue siendo correcto.
+
+`time_dependent_dijkstra` es Dijkstra (o A* con heuristic=True) sobre el grafo
+compilado, donde el costo de cada arco se evalúa a la hora en que se llega a él.
+"""
+
+import hashlib  # Import hashlib for the fingerprint of the profiles
+import heapq  # Import the heapq module for the priority queue
+import math  # Import math for the bucket arithmetic
+
+import numpy as np  # Import NumPy for the compact profile arrays
+
+from .compiled import compile_graph, path_from_previous  # Import the graph compiler
+
+DAY_SECONDS = 24 * 60 * 60  # Length of a day, in seconds
+BUCKET_SIZES = (24, 96)  # Supported profile resolutions: hourly or every 15 minutes
+MIN_SPEED_FACTOR = 0.05  # Lowest speed factor, so every edge can always be traversed
+EARTH_RADIUS = 6_371_000  # Mean Earth radius in meters, for the A* heuristic
+
+# Typical congestion of a city street by hour of the day (0 is free flow, 1 is the worst peak)
+CONGESTION_BY_HOUR = (0.0, 0.0, 0.0, 0.0, 0.0, 0.05, 0.3, 0.8, 1.0, 0.7, 0.4, 0.35,
+                      0.4, 0.45, 0.4, 0.4, 0.55, 0.85, 1.0, 0.8, 0.5, 0.3, 0.15, 0.05)
+
+# Maximum slowdown at the worst peak, by free-flow speed (km/h): main roads congest the most
+CONGESTION_DEPTH = ((30, 0.2), (50, 0.35), (float("inf"), 0.5))
+
+
+class SpeedProfiles:
+    """
+    Perfiles de velocidad de los arcos de un grafo compilado, sin repetir perfiles.
+    """
+
+    def __init__(self, factors, edge_profile):
+        self.factors = factors  # (number of profiles, buckets) speed factors, float32
+        self.edge_profile = edge_profile  # Profile of every compiled edge
+        self._fingerprint = None
+
+    @property
+    def buckets(self):
+        """Número de intervalos del día."""
+        return self.factors.shape[1]
+
+    @property
+    def bucket_seconds(self):
+        """Duración de cada intervalo, en segundos."""
+        return DAY_SECONDS / self.buckets
+
+    @property
+    def nbytes(self):
+        """Memoria que ocupan los perfiles, en bytes."""
+        return self.factors.nbytes + self.edge_profile.nbytes
+
+    def fingerprint(self):
+        """
+        Devuelve una huella (hash) de los perfiles que cambia si cambia el perfil de algún arco.
+
+        Complementa la huella del grafo compilado (que no incluye los perfiles) en el
+        caché de rutas.
+
+        :return: Cadena hexadecimal.
+        """
+        if self._fingerprint is None:
+            digest = hashlib.blake2b(digest_size=16)
+            digest.update(repr(self.factors.shape).encode())
+            for array in (self.factors, self.edge_profile):
+                digest.update(np.ascontiguousarray(array).tobytes())
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    def factor(self, edge, time):
+        """
+        Devuelve el factor de velocidad de un arco a una hora.
+
+        :param edge: Posición del arco en el grafo compilado.
+        :param time: Hora en segundos desde la medianoche (puede pasar de un día).
+        :return: El factor de velocidad.
+        """
+        return float(self.factors[self.edge_profile[edge], int(time // self.bucket_seconds) % self.buckets])
+
+    def travel_time(self, edge, free_flow, time):
+        """
+        Calcula el tiempo de recorrido de un arco si se entra a él a una hora.
+
+        :param edge: Posición del arco en el grafo compilado.
+        :param free_flow: Tiempo de recorrido sin tráfico, en segundos (el peso del arco).
+        :param time: Hora de entrada al arco, en segundos desde la medianoche.
+        :return: Tiempo de recorrido en segundos.
+        """
+        profile = self.factors[self.edge_profile[edge]]
+        size = self.bucket_seconds
+        remaining = free_flow  # Free-flow seconds still to travel
+        now = time
+        while True:
+            bucket = math.floor(now / size)
+            factor = float(profile[bucket % self.buckets])
+            span = (bucket + 1) * size - now  # Seconds until the speed changes
+            if factor * span >= remaining:
+                return now + remaining / factor - time
+            remaining -= factor * span
+            now = (bucket + 1) * size
+
+
+def build_speed_profiles(edge_factors):
+    """
+    Construye los perfiles compartidos a partir de un perfil por arco.
+
+    Los factores se redondean a milésimas antes de buscar perfiles repetidos.
+
+    :param edge_factors: Matriz (arcos x intervalos) con el factor de velocidad de cada arco.
+    :return: Los SpeedProfiles.
+    """
+    edge_factors = np.clip(np.round(np.asarray(edge_factors, dtype=np.float32), 3), MIN_SPEED_FACTOR, None)
+    if edge_factors.shape[1] not in BUCKET_SIZES:
+        raise ValueError(f"Speed profiles must have one of {BUCKET_SIZES} buckets, not {edge_factors.shape[1]}.")
+    if not len(edge_factors):
+        return SpeedProfiles(np.ones((1, edge_factors.shape[1]), dtype=np.float32), np.zeros(0, dtype=np.uint8))
+    factors, inverse = np.unique(edge_factors, axis=0, return_inverse=True)
+    edge_profile = inverse.reshape(-1).astype(np.min_scalar_type(len(factors) - 1))
+    return SpeedProfiles(factors, edge_profile)
+
+
+def _resample(profile, buckets):
+    """
+    Cambia el número de intervalos de un perfil (cada intervalo toma el valor del
+    intervalo original que contiene su inicio).
+
+    :param profile: Lista de factores.
+    :param buckets: Número de intervalos del resultado.
+    :return: Arreglo con los factores.
+    """
+    profile = np.asarray(profile, dtype=np.float32)
+    return profile[np.arange(buckets) * len(profile) // buckets]
+
+
+def default_edge_factors(compiled, buckets=24):
+    """
+    Calcula el perfil típico de hora pico de cada arco según su velocidad sin tráfico.
+
+    :param compiled: El grafo compilado.
+    :param buckets: Número de intervalos del día (24 o 96).
+    :return: Matriz (arcos x intervalos) con los factores de velocidad.
+    """
+    hours = np.arange(buckets) * 24 / buckets
+    congestion = np.interp(hours, np.arange(25), CONGESTION_BY_HOUR + CONGESTION_BY_HOUR[:1])  # Wraps at midnight
+    # Free-flow speed in km/h from the edge length (m) and weight (s)
+    speeds = np.divide(compiled.lengths * 3.6, compiled.weights, out=np.zeros_like(compiled.lengths),
+                       where=compiled.weights > 0)
+    limits = np.array([limit for limit, _ in CONGESTION_DEPTH])
+    depths = np.array([depth for _, depth in CONGESTION_DEPTH])[np.searchsorted(limits, speeds)]
+    return 1 - depths[:, None] * congestion[None, :]
+
+
+def speed_profiles(graph, buckets=24, attribute="speed_profile"):
+    """
+    Devuelve los perfiles de velocidad del grafo, calculados una sola vez por grafo.
+
+    :param graph: El grafo limpio.
+    :param buckets: Número de intervalos del día (24 o 96).
+    :param attribute: Atributo de los arcos con su perfil (una lista de factores);
+        los arcos que no lo tienen usan el perfil típico.
+    :return: Los SpeedProfiles (se guardan en el caché del grafo compilado).
+    """
+    compiled = compile_graph(graph)
+    cache_key = ("speed_profiles", buckets, attribute)
+    if cache_key not in compiled.cache:
+        edge_factors = default_edge_factors(compiled, buckets)
+        # Profiles given on the edges, read in graph.edges order and moved to the compiled order
+        given = [data.get(attribute) for _, _, data in graph.edges(data=True)]
+        for e, position in enumerate(compiled.edge_order):
+            if given[position] is not None:
+                edge_factors[e] = _resample(given[position], buckets)
+        compiled.cache[cache_key] = build_speed_profiles(edge_factors)
+    return compiled.cache[cache_key]
+
+
+def _heuristic(compiled, profiles, dest):
+    """
+    Calcula una cota inferior del tiempo que falta de cada nodo al destino (para A*):
+    la distancia en línea recta entre la mayor velocidad posible del grafo.
+
+    :param compiled: El grafo compilado.
+    :param profiles: Los SpeedProfiles.
+    :param dest: Posición del nodo de destino.
+    :return: Arreglo con la cota en segundos (0 si el nodo no tiene coordenadas).
+    """
+    speeds = np.divide(compiled.lengths, compiled.weights, out=np.zeros_like(compiled.lengths),
+                       where=compiled.weights > 0)
+    max_speed = float(speeds.max(initial=0)) * float(profiles.factors.max(initial=1))  # m/s
+    if max_speed <= 0:
+        return np.zeros(compiled.num_nodes)
+    lon, lat = np.radians(compiled.x), np.radians(compiled.y)
+    a = (np.sin((lat - lat[dest]) / 2) ** 2
+         + np.cos(lat) * np.cos(lat[dest]) * np.sin((lon - lon[dest]) / 2) ** 2)
+    meters = 2 * EARTH_RADIUS * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+    # Slightly shrink the bound so rounding never makes it larger than the real time
+    return np.nan_to_num(meters / max_speed * 0.999, nan=0.0)
+
+
+def time_dependent_dijkstra(compiled, profiles, orig, departure, dest=None, heuristic=False):
+    """
+    Dijkstra dependiente del tiempo desde un nodo de origen.
+
+    El costo de cada arco es su tiempo de recorrido a la hora en que se llega a su
+    nodo inicial. Con heuristic=True (y un destino) se usa A*.
+
+    :param compiled: El grafo compilado.
+    :param profiles: Los SpeedProfiles del grafo.
+    :param orig: Posición del nodo de origen.
+    :param departure: Hora de salida en segundos desde la medianoche.
+    :param dest: Posición del nodo de destino; si se indica, la búsqueda termina al llegar a él.
+    :param heuristic: Si es True, usa A* con la distancia en línea recta (requiere dest).
+    :return: Tupla (horas de llegada, predecesores, iteraciones) con arreglos de NumPy;
+        la hora de llegada es infinita en los nodos que no se alcanzaron.
+    """
+    n = compiled.num_nodes
+    indptr, indices, weights = compiled.indptr, compiled.indices, compiled.weights
+    arrival = np.full(n, np.inf)
+    previous = np.full(n, -1, dtype=np.int32)
+    settled = np.zeros(n, dtype=bool)
+    bound = _heuristic(compiled, profiles, dest) if heuristic and dest is not None else None
+
+    arrival[orig] = departure
+    queue = [(departure + (bound[orig] if bound is not None else 0), orig)]
+    step = 0
+
+    while queue:
+        _, node = heapq.heappop(queue)
+        if settled[node]:  # Skip stale queue entries
+            continue
+        settled[node] = True
+        if node == dest:
+            break
+        now = arrival[node]
+        for e in range(indptr[node], indptr[node + 1]):
+            neighbor = indices[e]
+            if settled[neighbor]:
+                continue
+            time = now + profiles.travel_time(e, weights[e], now)  # Cost evaluated at the arrival time
+            if time < arrival[neighbor]:
+                arrival[neighbor] = time
+                previous[neighbor] = node
+                heapq.heappush(queue, (time + (bound[neighbor] if bound is not None else 0), neighbor))
+        step += 1
+
+    return arrival, previous, step
+
+
+def time_dependent_query(graph, orig, dest, departure, buckets=24, heuristic=True):
+    """
+    Calcula la ruta más rápida entre dos nodos para una hora de salida.
+
+    :param graph: El grafo limpio.
+    :param orig: Nodo de origen.
+    :param dest: Nodo de destino.
+    :param departure: Hora de salida en segundos desde la medianoche.
+    :param buckets: Número de intervalos de los perfiles (24 o 96).
+    :param heuristic: Si es True, usa A*; si no, Dijkstra.
+    :return: Tupla (tiempos desde la salida por posición, camino en posiciones, iteraciones).
+        El tiempo de la ruta es el del destino; el camino está vacío si no hay ruta.
+    """
+    compiled = compile_graph(graph)
+    profiles = speed_profiles(graph, buckets)
+    i, j = compiled.index[orig], compiled.index[dest]
+    arrival, previous, step = time_dependent_dijkstra(compiled, profiles, i, departure, j, heuristic)
+    return arrival - departure, path_from_previous(previous, i, j), step
@@ -0,0 +1,272 @@
+"""
+Este módulo compara los algoritmos de búsqueda de forma aislada y en paralelo.
+
+Las gráficas de tiempos y distancias usaban el tiempo de una sola ejecución de cada
+pestaña, que incluye el dibujo del grafo (que tarda mucho más que la búsqueda) y
+el ruido de la máquina, y los algoritmos se ejecutaban uno después del otro. La
+función `compare_algorithms`, en cambio:
+
+- Ejecuta cada algoritmo en un proceso propio (ProcessPoolExecutor), por lo que los
+  algoritmos corren al mismo tiempo y no comparten el GIL ni los atributos del grafo.
+  Cada proceso recibe una sola vez una copia del grafo (con su grafo compilado) y
+  la usa para todas sus ejecuciones; el grafo original no se modifica.
+- Ejecuta cada algoritmo `warmup` veces sin medir (cachés de CPU, arreglos
+  compilados) y luego `repeats` veces midiendo con time.perf_counter, sin graficar.
+  Antes de cada ejecución se descarta la tabla de todos los pares, para que
+  Floyd-Warshall y Bellman-Ford midan su cálculo y no una consulta a la tabla.
+- Resume el tiempo y el número de iteraciones con la mediana y el rango
+  intercuartil, que se muestran como barras de error en las gráficas. Las
+  iteraciones no significan lo mismo en todos los motores (ver step_unit), por lo
+  que cada barra lleva su unidad.
+
+Los procesos se inician con "spawn", que vuelve a importar en cada proceso hijo el
+archivo de __main__. Con `streamlit run`, __main__ es main.py, por lo que cada
+proceso volvería a ejecutar toda la aplicación. Por eso la comparación se ejecuta
+en un proceso aparte (`python -m helpers.comparison`), cuyo __main__ es este
+módulo: el grafo y los parámetros se le pasan en un archivo temporal (pickle), y
+el resultado se lee de otro.
+"""
+
+import os  # Import os to count the available CPUs
+import sys  # Import sys to find the Python executable
+
+COMPARISON_ENGINES = ("dijkstra", "bfs", "dfs", "dls", "iddfs", "bellman_ford", "floyd_warshall",
+                      "time_dependent")  # Default engines, one per tab
+
+_worker_graph = None  # Graph of the current worker process (set by _init_worker)
+
+
+def _init_worker(graph):
+    """
+    Guarda el grafo en el proceso de trabajo; se ejecuta una vez por proceso.
+
+    :param graph: El grafo (se recibe serializado, es una copia privada del proceso).
+    :return:
+    """
+    global _worker_graph
+    _worker_graph = graph
+
+
+def _summarize(values):
+    """
+    Resume una lista de mediciones.
+
+    :param values: Las mediciones (se ignoran los None).
+    :return: Diccionario con "median", "p25", "p75", "min", "max", o None si no hay mediciones.
+    """
+    import numpy as np
+
+    values = np.array([value for value in values if value is not None], dtype=float)
+    if not values.size:
+        return None
+    p25, median, p75 = np.percentile(values, [25, 50, 75])
+    return {"median": float(median), "p25": float(p25), "p75": float(p75),
+            "min": float(values.min()), "max": float(values.max())}
+
+
+def _run_engine(engine, orig, dest, params, repeats, warmup):
+    """
+    Ejecuta un algoritmo varias veces en el proceso de trabajo y mide cada ejecución.
+
+    :param engine: Nombre del algoritmo (ver ALGORITHMS).
+    :param orig: Nodo de origen.
+    :param dest: Nodo de destino.
+    :param params: Parámetros extra del algoritmo (por ejemplo {"limit": 5} para DLS).
+    :param repeats: Número de ejecuciones medidas.
+    :param warmup: Número de ejecuciones previas que no se miden.
+    :return: Diccionario con las listas "times" y "steps", y la "distance" de la ruta (km).
+    """
+    import contextlib
+    import io
+    import time
+    from .algorithms import ALGORITHMS, ALL_PAIRS_CACHE_KEY, path_from_graph
+
+    graph = _worker_graph
+    run = ALGORITHMS[engine]
+    times, steps = [], []
+    found = True
+    with contextlib.redirect_stdout(io.StringIO()):  # time_function prints every call
+        for i in range(warmup + repeats):
+            graph.graph.pop(ALL_PAIRS_CACHE_KEY, None)  # Measure the table, not a lookup
+            start = time.perf_counter()
+            result = run(graph, orig, dest, **params)
+            elapsed = time.perf_counter() - start
+            if engine == "dls":  # DLS returns (found, steps, time)
+                found = result[0]
+            if i >= warmup:
+                times.append(elapsed)
+                steps.append(result[-2])
+
+    path = path_from_graph(graph, orig, dest) if found else None
+    distance = path.distance if path is not None and path.found else float("inf")
+    return {"times": times, "steps": steps, "distance": distance}
+
+
+def step_unit(graph, engine):
+    """
+    Describe qué cuenta el número de iteraciones de un algoritmo.
+
+    La mayoría cuenta los nodos que procesa la búsqueda, pero la tabla de
+    Bellman-Ford suma las extracciones de la cola de SPFA desde todos los orígenes, y
+    la de Floyd-Warshall cuenta los nodos intermedios k (siempre n).
+
+    :param graph: El grafo.
+    :param engine: Nombre del algoritmo (ver ALGORITHMS).
+    :return: La unidad, en texto.
+    """
+    from .algorithms import query_engine
+
+    if engine in ("bellman_ford", "floyd_warshall"):
+        if query_engine(graph, engine) == "spfa":
+            return "queue pops, SPFA from the start node"
+        if engine == "bellman_ford":
+            return "queue pops, SPFA from every node"
+        return "intermediate nodes k"
+    return "processed nodes"
+
+
+def _compare_in_pool(graph, orig, dest, engines, repeats, warmup, params, max_workers):
+    """
+    Ejecuta la comparación en un ProcessPoolExecutor; se llama desde el proceso aparte (ver main).
+
+    :param graph: El grafo, sin la tabla de todos los pares.
+    :param orig: Nodo de origen.
+    :param dest: Nodo de destino.
+    :param engines: Nombres de los algoritmos que se comparan.
+    :param repeats: Número de ejecuciones medidas de cada algoritmo.
+    :param warmup: Número de ejecuciones previas que no se miden.
+    :param params: Parámetros extra por algoritmo.
+    :param max_workers: Número de procesos.
+    :return: Diccionario nombre -> {"times", "steps", "distance"} de cada algoritmo.
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    # "spawn" instead of "fork": the same start method on every platform
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=context,
+                             initializer=_init_worker, initargs=(graph,)) as executor:
+        futures = {engine: executor.submit(_run_engine, engine, orig, dest, params.get(engine, {}), repeats, warmup)
+                   for engine in engines}
+        return {engine: future.result() for engine, future in futures.items()}
+
+
+def compare_algorithms(graph, orig, dest, engines=COMPARISON_ENGINES, repeats=5, warmup=1, params=None,
+                       max_workers=None):
+    """
+    Compara varios algoritmos ejecutándolos en paralelo, cada uno en su propio proceso.
+
+    La comparación corre en un proceso aparte (python -m helpers.comparison), de modo
+    que los procesos de trabajo nunca importan el script de Streamlit.
+
+    :param graph: El grafo limpio (no se modifica).
+    :param orig: Nodo de origen.
+    :param dest: Nodo de destino.
+    :param engines: Nombres de los algoritmos que se comparan (ver ALGORITHMS).
+    :param repeats: Número de ejecuciones medidas de cada algoritmo.
+    :param warmup: Número de ejecuciones previas de cada algoritmo que no se miden.
+    :param params: Parámetros extra por algoritmo, por ejemplo {"dls": {"limit": 5},
+        "time_dependent": {"departure": 8 * 60 * 60}}.
+    :param max_workers: Número de procesos; por defecto, uno por algoritmo hasta el número de CPUs.
+    :return: Diccionario nombre -> {"time": resumen, "steps": resumen, "step_unit": texto,
+        "distance": km, "times": mediciones}. Los resúmenes tienen la mediana, los cuartiles,
+        el mínimo y el máximo.
+    :raises RuntimeError: Si el proceso de la comparación falla.
+    """
+    import pickle
+    import subprocess
+    import tempfile
+    from .algorithms import ALL_PAIRS_CACHE_KEY
+
+    params = params or {}
+    if max_workers is None:
+        max_workers = max(1, min(len(engines), os.cpu_count() or 1))
+
+    # The copy has its own graph.graph, so the all-pairs table can be left out (it would be
+    # serialized to every worker) without touching the graph shared by the sessions
+    shared = graph.copy()
+    shared.graph.pop(ALL_PAIRS_CACHE_KEY, None)
+
+    with tempfile.TemporaryDirectory(prefix="streetmap-comparison-") as directory:
+        job_path = os.path.join(directory, "job.pickle")
+        result_path = os.path.join(directory, "result.pickle")
+        with open(job_path, "wb") as file:
+            pickle.dump((shared, orig, dest, tuple(engines), repeats, warmup, params, max_workers), file,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+
+        # The package may not be installed, so its parent directory is added to the import path
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [root, os.environ.get("PYTHONPATH")])))
+        process = subprocess.run([sys.executable, "-m", "helpers.comparison", job_path, result_path],
+                                 env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        if process.returncode != 0:
+            raise RuntimeError("The comparison process failed:\n" + process.stderr.decode(errors="replace")[-2000:])
+        with open(result_path, "rb") as file:
+            runs = pickle.load(file)
+
+    return {engine: {"time": _summarize(run["times"]), "steps": _summarize(run["steps"]),
+                     "step_unit": step_unit(graph, engine), "distance": run["distance"], "times": run["times"]}
+            for engine, run in runs.items()}
+
+
+def plot_comparison(results, metric="time", labels=None):
+    """
+    Grafica el resultado de compare_algorithms en la interfaz de Streamlit.
+
+    Para "time" y "steps" se grafica la mediana con barras de error del primer al
+    tercer cuartil; para "distance" se grafica la distancia de la ruta.
+
+    :param results: Resultado de compare_algorithms.
+    :param metric: "time", "steps" (con la unidad de cada algoritmo) o "distance".
+    :param labels: Diccionario nombre -> etiqueta de cada algoritmo (por defecto, el nombre).
+    :return:
+    """
+    import plotly.graph_objects as go  # Lazy import, Plotly is only needed for the charts
+    import streamlit as st  # Lazy import, Streamlit is only needed to render
+
+    labels = labels or {}
+    names = [labels.get(engine, engine) for engine in results]
+    if metric == "distance":
+        values = [results[engine]["distance"] for engine in results]
+        bar = go.Bar(x=names, y=[value if value != float("inf") else None for value in values])
+        title = "Distance (km)"
+    else:
+        summaries = [results[engine][metric] or {"median": None, "p25": None, "p75": None} for engine in results]
+        medians = [summary["median"] for summary in summaries]
+        bar = go.Bar(x=names, y=medians, error_y={
+            "type": "data",
+            "symmetric": False,
+            "array": [s["p75"] - s["median"] if s["median"] is not None else 0 for s in summaries],
+            "arrayminus": [s["median"] - s["p25"] if s["median"] is not None else 0 for s in summaries],
+        })
+        title = "Execution Time (s)" if metric == "time" else "Iterations"
+    figure = go.Figure(bar)
+    figure.update_layout(xaxis_title="Algorithm", yaxis_title=title)
+    if metric == "steps":
+        # The engines count different things (see step_unit), so every bar shows its unit
+        # and the axis is logarithmic: the Bellman-Ford table counts every source
+        figure.update_xaxes(tickvals=names, ticktext=[f"{name}<br>({results[engine]['step_unit']})"
+                                                      for name, engine in zip(names, results)])
+        figure.update_yaxes(type="log")
+    st.plotly_chart(figure, use_container_width=True)
+
+
+def main(argv=None):
+    """
+    Punto de entrada del proceso de la comparación (ver compare_algorithms).
+
+    :param argv: Rutas del archivo con el trabajo y del archivo donde se guarda el resultado.
+    :return:
+    """
+    import pickle
+
+    job_path, result_path = sys.argv[1:] if argv is None else argv
+    with open(job_path, "rb") as file:
+        job = pickle.load(file)
+    runs = _compare_in_pool(*job)
+    with open(result_path, "wb") as file:
+        pickle.dump(runs, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+if __name__ == "__main__":
+    main()
@@ -12,8 +12,10 @@ Las funciones en este módulo son las siguientes:
 - style_visited_edge: Estiliza un arco como visitado.
 - style_active_edge: Estiliza un arco como activo.
 - style_path_edge: Estiliza un arco como parte de la ruta.
+- graph_figure: Dibuja el grafo en una figura de Matplotlib.
 - plot_graph: Grafica el grafo.
 - reconstruct_path: Reconstruye la ruta y estiliza los arcos que la componen.
+- plot_route: Grafica una ruta dada como lista de nodos (por ejemplo, del caché de rutas).
 """
 
 import time  # Import the time module
@@ -39,14 +41,17 @@ def time_function(func):
     return wrapper
 
 
-def clean_graph(graph):
+def clean_graph(graph, lean=False):
     """
     Esta función limpia el grafo para eliminar atributos innecesarios.
 
     El grafo devuelto por OSMnx contiene muchos atributos que no son necesarios para este proyecto,
-    por lo que esta función se encarga de eliminarlos para reducir el uso de memoria y mejorar la eficiencia.
+    por lo que, si lean es True, esta función se encarga de eliminarlos para reducir el uso de memoria
+    y mejorar la eficiencia (ver memory.py). Si lean es False, sólo se estandarizan las velocidades
+    y se calculan los pesos, y se conservan todos los atributos (por ejemplo, la geometría de las
+    calles que usa ox.plot_graph).
 
-    La información que se mantiene en el grafo es la siguiente:
+    La información que se mantiene en el grafo con lean=True es la siguiente:
     - Nodos:
         - latitud
         - longitud
@@ -59,9 +64,11 @@ def clean_graph(graph):
     por lo que se toma el primer valor de la lista y se convierte a entero, y en caso
     de que no haya un valor numérico, se asigna 40 km/h por defecto para evitar errores.
     :param graph: El grafo que se va a limpiar.
+    :param lean: Si es True, se eliminan los atributos que no se usan.
     :return:
     """
     import re  # Import the regular expressions module
+    from helpers.algorithms.compiled import invalidate_compiled  # Lazy import to avoid a circular import
 
     # Iterate over the edges in the graph
     # An edge looks like this: (start_node, end_node, 0)
@@ -96,6 +103,11 @@ def clean_graph(graph):
             graph.edges[edge]["weight"] = graph.edges[edge]["length"] / (
                     max_speed * 1000 / 3600)  # Convert speed to m/s if length is in meters
 
+    if lean:
+        from helpers.memory import prune_graph  # Lazy import, only needed in lean mode
+        prune_graph(graph)  # Drop the attributes that are not used
+
+    invalidate_compiled(graph)  # The weights changed, so any compiled copy is stale
     return graph
 
 
@@ -225,6 +237,39 @@ def style_path_edge(graph, edge):
     graph.edges[edge]["linewidth"] = 1
 
 
+def graph_figure(graph):
+    """
+    Dibuja el grafo con OSMnx en una figura de Matplotlib, sin mostrarla.
+
+    Se usan los atributos size de los nodos y color, alpha y linewidth de los arcos
+    (ver plot_graph). Quien recibe la figura debe cerrarla con plt.close, ya que
+    pyplot conserva todas las figuras abiertas.
+
+    :param graph: El grafo que se va a dibujar.
+    :return: Tupla (fig, ax) de Matplotlib.
+    """
+    import osmnx as ox  # Lazy import, OSMnx is only needed to draw
+
+    # Extract the node sizes, edge colors, edge alphas, and edge linewidths from the graph
+    node_sizes = [graph.nodes[node]["size"] for node in graph.nodes]
+    edge_colors = [graph.edges[edge]["color"] for edge in graph.edges]
+    edge_alphas = [graph.edges[edge]["alpha"] for edge in graph.edges]
+    edge_linewidths = [graph.edges[edge]["linewidth"] for edge in graph.edges]
+
+    # Configure and plot the graph
+    return ox.plot_graph(
+        graph,
+        node_size=node_sizes,  # size of the nodes: if 0, then skip plotting the nodes
+        edge_color=edge_colors,  # color(s) of the edges' lines
+        edge_alpha=edge_alphas,  # opacity of the edges' lines
+        edge_linewidth=edge_linewidths,  # width of the edges' lines: if 0, then skip plotting the edges
+        node_color="white",  # color(s) of the nodes
+        bgcolor="#18080e",  # background color of plot
+        show=False,  # if True, call pyplot.show() to show the figure
+        close=False,  # the figure is closed by the caller once it is displayed
+    )
+
+
 def plot_graph(graph):
     """
     Grafica el grafo.
@@ -255,33 +300,27 @@ def plot_graph(graph):
 
     Utilizamos manualmente st.pyplot para mostrar la gráfica en la interfaz de usuario.
 
+    Si graph.graph["renderer"] es "deck", el grafo se dibuja en el navegador con WebGL
+    (ver renderers.py) en lugar de Matplotlib.
+
     :param graph: El grafo que se va a graficar.
     :return:
     """
+    # Use the WebGL renderer if it was selected for this graph
+    if graph.graph.get("renderer") == "deck":
+        from helpers.renderers import plot_graph_deck  # Lazy import, pydeck is only needed to render
+        plot_graph_deck(graph)
+        return
+
     # Lazy import necessary libraries
     import streamlit as st
-    import osmnx as ox
-
-    # Extract the node sizes, edge colors, edge alphas, and edge linewidths from the graph
-    node_sizes = [graph.nodes[node]["size"] for node in graph.nodes]
-    edge_colors = [graph.edges[edge]["color"] for edge in graph.edges]
-    edge_alphas = [graph.edges[edge]["alpha"] for edge in graph.edges]
-    edge_linewidths = [graph.edges[edge]["linewidth"] for edge in graph.edges]
+    import matplotlib.pyplot as plt
 
-    # Configure and plot the graph
-    fig, ax = ox.plot_graph(
-        graph,
-        node_size=node_sizes,  # size of the nodes: if 0, then skip plotting the nodes
-        edge_color=edge_colors,  # color(s) of the edges' lines
-        edge_alpha=edge_alphas,  # opacity of the edges' lines
-        edge_linewidth=edge_linewidths,  # width of the edges' lines: if 0, then skip plotting the edges
-        node_color="white",  # color(s) of the nodes
-        bgcolor="#18080e",  # background color of plot
-        show=False,  # if True, call pyplot.show() to show the figure
-    )
+    fig, ax = graph_figure(graph)
 
     # Display the plot in a Streamlit app
     st.pyplot(fig, use_container_width=True)
+    plt.close(fig)  # pyplot keeps every open figure, so a long-running server would leak them
 
 
 def reconstruct_path(graph, orig, dest, plot=False):
@@ -293,9 +332,13 @@ def reconstruct_path(graph, orig, dest, plot=False):
 
     El atributo "previous" de un nodo es el nodo que lo visitó en la búsqueda, por lo que
     se puede iterar desde el nodo de destino hasta el nodo de origen para reconstruir la ruta.
+    Sólo se recorren los nodos de la ruta (ver path_from_graph), por lo que si plot es False
+    no se modifica ni se recorre el resto del grafo.
 
-    La ruta se reconstruye desde el nodo de destino hasta el nodo de origen, y se estilizan
-    los arcos que la componen para resaltarla.
+    El tiempo total es la suma del atributo "weight" (el tiempo de recorrido) de cada arco
+    de la ruta, y la velocidad promedio es la distancia entre el tiempo total.
+
+    Si plot es True, se estilizan los arcos que componen la ruta para resaltarla.
 
     Los atributos que se modifican son:
     - color: blanco
@@ -314,29 +357,48 @@ def reconstruct_path(graph, orig, dest, plot=False):
     :param orig: El nodo de origen.
     :param dest: El nodo de destino.
     :param plot: Si es True, se grafica el grafo.
-    :return:
+    :return: Tupla (distancia en km, velocidad promedio en km/h, tiempo total en minutos).
     """
+    from helpers.algorithms.paths import path_from_graph  # Lazy import to avoid a circular import
 
-    # By default, set all edges to unvisited
-    for edge in graph.edges:
-        style_unvisited_edge(graph, edge)
-    dist = 0  # Total distance
-    speeds = []  # List of speeds
-    curr = dest  # Start at the destination
-    while curr != orig:  # While we haven't reached the origin
-        prev = graph.nodes[curr]["previous"]  # Get the previous node
-        dist += graph.edges[(prev, curr, 0)]["length"]  # Add the length of the edge to the total distance
-        speeds.append(graph.edges[(prev, curr, 0)]["maxspeed"])  # Add the speed to the list of speeds
-        style_path_edge(graph, (prev, curr, 0))  # Style the edge as part of the path
-        curr = prev  # Move to the previous node
-    dist /= 1000  # Convert distance to kilometers
-
-    # If plot is True, plot the graph
+    path = path_from_graph(graph, orig, dest)
+
+    # If plot is True, style the path and plot the graph
     if plot:
+        # By default, set all edges to unvisited
+        for edge in graph.edges:
+            style_unvisited_edge(graph, edge)
+        for edge_index in path.edge_indices:
+            style_path_edge(graph, path.compiled.edge_id(edge_index))  # Style the edge as part of the path
         plot_graph(graph)
 
-        try:
-            # Return the distance, average speed, and time
-            return dist, sum(speeds) / len(speeds), dist / (sum(speeds) / len(speeds)) * 60
-        except ZeroDivisionError:
-            return dist, 0, 0
+    # Return the distance, average speed, and time
+    return path.metrics()
+
+
+def plot_route(graph, orig, dest, path):
+    """
+    Grafica una ruta dada como lista de nodos, sin ejecutar ningún algoritmo.
+
+    Se usa para las rutas que vienen del caché de rutas (ver route_cache.py): todos los
+    arcos se estilizan como no visitados y sólo se resaltan los de la ruta.
+
+    :param graph: El grafo que se va a estilizar.
+    :param orig: El nodo de origen.
+    :param dest: El nodo de destino.
+    :param path: Lista de nodos de la ruta, del origen al destino.
+    :return:
+    """
+    from helpers.algorithms import compile_graph  # Lazy import to avoid a circular import
+
+    compiled = compile_graph(graph)
+    for node in graph.nodes:
+        graph.nodes[node]["size"] = 0
+    graph.nodes[orig]["size"] = 50
+    graph.nodes[dest]["size"] = 50
+    for edge in graph.edges:
+        style_unvisited_edge(graph, edge)
+    for prev, curr in zip(path, path[1:]):
+        edge_index = compiled.find_edge(compiled.index[prev], compiled.index[curr])
+        style_path_edge(graph, compiled.edge_id(edge_index))  # Style the edge as part of the path
+    plot_graph(graph)
@@ -0,0 +1,300 @@
+"""
+Este módulo carga los grafos en segundo plano.
+
+Antes, `ox.graph_from_place` y `clean_graph` se ejecutaban al inicio de main.py,
+por lo que la interfaz quedaba bloqueada mientras se descargaba y limpiaba el
+grafo. El `GraphLoader` ejecuta la carga en un hilo de fondo y la divide en
+etapas, para poder mostrar el progreso:
+
+- fetch: Descarga los datos del lugar (ver sources.py).
+- parse: Construye el grafo de NetworkX.
+- clean: Limpia el grafo (clean_graph). Se omite si la fuente ya devuelve grafos
+  limpios (source.cleaned, por ejemplo la TiledSource, que limpia cada mosaico en paralelo).
+- compile: Compila el grafo en arreglos compactos (compile_graph).
+
+La tabla de todos los pares (ver all_pairs.py) no se precalcula: se construye en la
+primera consulta de Bellman-Ford o Floyd-Warshall sobre el lugar y la comparten
+todas las sesiones.
+
+Si una sesión pide un lugar nuevo mientras otro se está cargando, la carga anterior
+se cancela: termina su etapa actual (una descarga no se puede interrumpir) y se
+descarta sin ejecutar las siguientes. Como el GraphLoader se comparte entre todas
+las sesiones, la carga sólo se cancela si ninguna otra sesión la está esperando.
+
+Con lean=True, la etapa clean elimina los atributos que no se usan (ver memory.py)
+y en graph.graph["memory_report"] se guarda la memoria antes y después.
+
+Los grafos cargados se guardan en un caché LRU, y los lugares configurados en
+`prefetch_places` se cargan con anticipación cuando no hay ninguna carga activa.
+"""
+
+import threading  # Import threading for the background workers
+from collections import OrderedDict  # Import OrderedDict for the LRU cache
+
+from .helpers import clean_graph  # Import the graph cleaner
+
+LOAD_STAGES = ("fetch", "parse", "clean", "compile")  # Stages of the load pipeline
+_PREFETCH = object()  # Session that owns the prefetch loads
+
+
+class LoadCancelled(Exception):
+    """Se lanza cuando se pide el resultado de una carga que fue cancelada."""
+
+
+class LoadJob:
+    """
+    Carga de un lugar en segundo plano.
+
+    - place: El lugar que se está cargando.
+    - stage: La etapa actual (una de LOAD_STAGES), "done" al terminar, o None si no ha iniciado.
+    - progress: Fracción de etapas terminadas, entre 0 y 1.
+    """
+
+    def __init__(self, place):
+        self.place = place
+        self.stage = None
+        self.progress = 0.0
+        self._cancel_event = threading.Event()
+        self._done_event = threading.Event()
+        self._graph = None
+        self._error = None
+        self._sessions = set()  # Sessions waiting for this load (see GraphLoader.load)
+
+    @property
+    def cancelled(self):
+        """True si la carga fue cancelada."""
+        return self._cancel_event.is_set()
+
+    def cancel(self):
+        """
+        Cancela la carga. La etapa actual termina, pero las siguientes no se ejecutan.
+
+        :return:
+        """
+        self._cancel_event.set()
+
+    def done(self):
+        """
+        Indica si la carga terminó (con éxito, con error o cancelada).
+
+        :return: True si la carga terminó.
+        """
+        return self._done_event.is_set()
+
+    def wait(self, timeout=None):
+        """
+        Espera a que la carga termine.
+
+        :param timeout: Tiempo máximo de espera en segundos (None espera indefinidamente).
+        :return: True si la carga terminó.
+        """
+        return self._done_event.wait(timeout)
+
+    def result(self, timeout=None):
+        """
+        Devuelve el grafo cargado, esperando a que la carga termine.
+
+        :param timeout: Tiempo máximo de espera en segundos (None espera indefinidamente).
+        :return: El grafo limpio y compilado.
+        :raises LoadCancelled: Si la carga fue cancelada.
+        :raises TimeoutError: Si la carga no terminó a tiempo.
+        """
+        if not self.wait(timeout):
+            raise TimeoutError(f"Loading {self.place!r} did not finish in time.")
+        if self._error is not None:
+            raise self._error
+        return self._graph
+
+    def _enter(self, stage):
+        """
+        Marca el inicio de una etapa, o detiene la carga si fue cancelada.
+
+        :param stage: El nombre de la etapa.
+        :return:
+        """
+        if self.cancelled:
+            raise LoadCancelled(f"Loading {self.place!r} was cancelled.")
+        self.progress = LOAD_STAGES.index(stage) / len(LOAD_STAGES)
+        self.stage = stage
+
+    def _finish(self, graph=None, error=None):
+        """
+        Guarda el resultado de la carga y despierta a quien la esté esperando.
+
+        :param graph: El grafo cargado.
+        :param error: La excepción, si la carga falló.
+        :return:
+        """
+        self._graph = graph
+        self._error = error
+        if error is None:
+            self.stage = "done"
+            self.progress = 1.0
+        self._done_event.set()
+
+
+class GraphLoader:
+    """
+    Carga grafos en segundo plano, con caché, cancelación y precarga.
+
+    Está pensado para compartirse entre todas las ejecuciones de la aplicación
+    (por ejemplo con st.cache_resource). Los grafos del caché se comparten, por lo
+    que quien los modifique (los algoritmos lo hacen) debe trabajar sobre una copia.
+    """
+
+    def __init__(self, source=None, cache_size=4, prefetch_places=(), lean=False):
+        if source is None:
+            from .sources import OSMSource
+            source = OSMSource()
+        self.source = source
+        self.cache_size = cache_size
+        self.lean = lean  # Drop unused attributes and measure the memory saved (see memory.py)
+        self._cache = OrderedDict()  # place -> graph, least recently used first
+        self._inflight = {}  # place -> LoadJob that is still running
+        self._current = {}  # session -> last job requested by that session with load()
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._prefetch_queue = [place for place in prefetch_places if place]
+        self._prefetch_running = bool(self._prefetch_queue)  # At most one prefetch worker at a time
+        if self._prefetch_running:
+            threading.Thread(target=self._prefetch_worker, name="graph-prefetch", daemon=True).start()
+
+    def load(self, place, session=None):
+        """
+        Pide la carga de un lugar y cancela la carga anterior de la misma sesión si era
+        de otro lugar y ninguna otra sesión la está esperando.
+
+        :param place: El lugar que se va a cargar.
+        :param session: Identificador de la sesión que pide la carga (por ejemplo, uno
+            guardado en st.session_state).
+        :return: El LoadJob de la carga (ya terminado si el lugar estaba en caché).
+        """
+        with self._lock:
+            for key in [key for key, job in self._current.items() if job.done()]:
+                del self._current[key]  # Forget the sessions whose last load finished
+            current = self._current.get(session)
+            if current is not None and current.place != place:
+                current._sessions.discard(session)
+                if not current._sessions:  # A newer place supersedes the in-flight load
+                    current.cancel()
+                    self._inflight.pop(current.place, None)
+            job = self._job_for(place)
+            if not job.done():
+                job._sessions.add(session)
+                self._current[session] = job
+            return job
+
+    def prefetch(self, place):
+        """
+        Agrega un lugar a la cola de precarga; se cargará cuando no haya cargas activas.
+
+        :param place: El lugar que se va a precargar.
+        :return:
+        """
+        with self._lock:
+            if place not in self._cache and place not in self._prefetch_queue:
+                self._prefetch_queue.append(place)
+            # The queue may be empty while the worker is still loading its last place
+            start_worker = not self._prefetch_running and bool(self._prefetch_queue)
+            self._prefetch_running = self._prefetch_running or start_worker
+            self._idle.notify_all()
+        if start_worker:
+            threading.Thread(target=self._prefetch_worker, name="graph-prefetch", daemon=True).start()
+
+    def cached(self, place):
+        """
+        Devuelve el grafo de un lugar si ya está en caché.
+
+        :param place: El lugar.
+        :return: El grafo, o None si no está en caché.
+        """
+        with self._lock:
+            return self._cache.get(place)
+
+    def _job_for(self, place):
+        """
+        Devuelve el job de un lugar: uno terminado si está en caché, el que ya está
+        en curso, o uno nuevo. Se debe llamar con el candado tomado.
+
+        :param place: El lugar.
+        :return: El LoadJob.
+        """
+        if place in self._cache:
+            self._cache.move_to_end(place)
+            job = LoadJob(place)
+            job._finish(self._cache[place])
+            return job
+        job = self._inflight.get(place)
+        if job is None or job.cancelled:
+            job = LoadJob(place)
+            self._inflight[place] = job
+            threading.Thread(target=self._run, args=(job,), name=f"graph-load-{place}", daemon=True).start()
+        return job
+
+    def _run(self, job):
+        """
+        Ejecuta todas las etapas de la carga de un lugar.
+
+        :param job: El LoadJob que se va a ejecutar.
+        :return:
+        """
+        from .algorithms import compile_graph, ALL_PAIRS_CACHE_KEY
+        from .memory import graph_memory
+
+        try:
+            job._enter("fetch")
+            raw = self.source.fetch(job.place)
+            job._enter("parse")
+            graph = self.source.parse(raw)
+            job._enter("clean")
+            cleaned = getattr(self.source, "cleaned", False)  # Sources that clean (and prune) in parallel
+            report = self.lean and not cleaned  # The attributes of a cleaned graph are already pruned
+            if report:
+                before = graph_memory(graph)
+            if not cleaned:
+                clean_graph(graph, lean=self.lean)
+            job._enter("compile")
+            compile_graph(graph)
+            # The copies made by the sessions share this dict, so the all-pairs table built by the
+            # first Bellman-Ford or Floyd-Warshall query is reused by every session
+            graph.graph.setdefault(ALL_PAIRS_CACHE_KEY, {})
+            if report:
+                graph.graph["memory_report"] = (before, graph_memory(graph))
+            if job.cancelled:
+                raise LoadCancelled(f"Loading {job.place!r} was cancelled.")
+        except Exception as e:
+            with self._lock:
+                if self._inflight.get(job.place) is job:
+                    del self._inflight[job.place]
+                self._idle.notify_all()
+            job._finish(error=e)
+            return
+
+        with self._lock:
+            self._cache[job.place] = graph
+            self._cache.move_to_end(job.place)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)  # Evict the least recently used place
+            if self._inflight.get(job.place) is job:
+                del self._inflight[job.place]
+            self._idle.notify_all()
+        job._finish(graph)
+
+    def _prefetch_worker(self):
+        """
+        Carga, uno por uno, los lugares de la cola de precarga cuando no hay cargas activas.
+
+        :return:
+        """
+        while True:
+            with self._lock:
+                while self._inflight:  # Wait until the app is idle
+                    self._idle.wait()
+                while self._prefetch_queue and self._prefetch_queue[0] in self._cache:
+                    self._prefetch_queue.pop(0)
+                if not self._prefetch_queue:
+                    self._prefetch_running = False
+                    return
+                job = self._job_for(self._prefetch_queue.pop(0))
+                job._sessions.add(_PREFETCH)  # Sessions that switch places never cancel a prefetch
+            job.wait()
@@ -0,0 +1,375 @@
+"""
+Este módulo simula varias sesiones simultáneas de la aplicación para medir su carga.
+
+Streamlit ejecuta main.py una vez por interacción de cada usuario, en un hilo del
+mismo proceso, y todas las sesiones comparten el GraphLoader (st.cache_resource).
+La función `run_load_test` reproduce ese comportamiento sin la interfaz: cada
+sesión simulada es un hilo que, igual que main.py,
+
+1. pide el grafo de un lugar al GraphLoader compartido (etapa "load"),
+2. trabaja sobre una copia del grafo (etapa "copy"),
+3. si el caché de rutas está activado, busca la ruta en él (etapa "cache_get") y,
+   si la encuentra, no ejecuta el algoritmo,
+4. ejecuta cada algoritmo sin graficar (una etapa por algoritmo),
+5. reconstruye la ruta (etapa "path"), la guarda en el caché de rutas (etapa
+   "cache_put") y, opcionalmente, arma el mapa WebGL (etapa "render") o dibuja la
+   imagen de Matplotlib como la envía st.pyplot (etapa "plot").
+
+Los algoritmos incluyen Bellman-Ford y Floyd-Warshall, cuya primera consulta sobre
+cada lugar construye la tabla de todos los pares que comparten las sesiones (ver
+all_pairs.py), por lo que su p99 muestra la construcción y su p50 las consultas.
+
+Con `pairs`, las sesiones de cada lugar eligen entre un número fijo de pares
+origen/destino, como usuarios que piden las mismas rutas; así el caché de rutas
+tiene aciertos y el reporte muestra su tasa de aciertos.
+
+La descarga de OpenStreetMap se reemplaza por la SyntheticSource (con un retraso
+configurable que simula la red), por lo que la prueba no necesita conexión.
+
+La etapa "plot" usa el backend Agg (sin ventanas) y guarda cada figura como PNG en
+memoria, que es lo que hace st.pyplot. Como pyplot no es seguro entre hilos, las
+figuras se dibujan de una en una; la espera cuenta en la latencia, igual que en el
+servidor.
+
+El reporte incluye las sesiones por segundo, la latencia p50/p99 de cada etapa, el
+uso de CPU y el crecimiento de la memoria residente (RSS), para dimensionar los
+workers y detectar regresiones en el caché y en el uso compartido del grafo.
+
+Se puede ejecutar directamente:
+
+    python -m helpers.loadtest [--sessions N] [--concurrency N] [--places N] ...
+"""
+
+import os  # Import os to read the memory of the process
+import random  # Import random to choose the places and nodes of each session
+import threading  # Import threading to run the sessions concurrently
+import time  # Import time to measure the latencies
+
+_plot_lock = threading.Lock()  # pyplot keeps global state, so figures are drawn one at a time
+
+# The five original algorithms and the two that share the all-pairs table
+LOAD_TEST_ENGINES = ("dijkstra", "bfs", "dfs", "dls", "iddfs", "bellman_ford", "floyd_warshall")
+
+
+def _rss_bytes():
+    """
+    Devuelve la memoria residente (RSS) actual del proceso.
+
+    En Linux se lee de /proc; en otros sistemas Unix se usa el máximo de ru_maxrss.
+
+    :return: Número de bytes.
+    """
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource  # Lazy import, only available on Unix
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if os.uname().sysname == "Darwin" else peak * 1024  # Bytes on macOS, kilobytes elsewhere
+
+
+def _cpu_seconds():
+    """
+    Devuelve el tiempo de CPU (usuario y sistema) que ha usado el proceso.
+
+    :return: Número de segundos.
+    """
+    return time.process_time()  # Counts every thread of the process
+
+
+class _Timings:
+    """
+    Latencias de cada etapa, compartidas por todos los hilos.
+    """
+
+    def __init__(self):
+        self.stages = {}  # stage -> list of latencies in seconds
+        self.cache_hits = 0  # Route cache lookups that found the route
+        self.cache_misses = 0
+        self._lock = threading.Lock()
+
+    def record(self, stage, seconds):
+        with self._lock:
+            self.stages.setdefault(stage, []).append(seconds)
+
+    def record_lookup(self, hit):
+        with self._lock:
+            if hit:
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+
+
+def _run_session(loader, session, place, engines, queries, render, plot, limit, rng, timings, cache=None,
+                 pairs=None):
+    """
+    Ejecuta una sesión simulada, con los mismos pasos que main.py.
+
+    :param loader: El GraphLoader compartido.
+    :param session: Identificador de la sesión (para el GraphLoader).
+    :param place: El lugar de la sesión.
+    :param engines: Nombres de los algoritmos que se ejecutan (ver ALGORITHMS).
+    :param queries: Número de pares origen/destino que consulta la sesión.
+    :param render: Si es True, arma el mapa WebGL de cada resultado.
+    :param plot: Si es True, dibuja la imagen de Matplotlib de cada resultado.
+    :param limit: Límite de profundidad de DLS.
+    :param rng: Generador de números aleatorios de la sesión.
+    :param timings: Las latencias compartidas.
+    :param cache: El RouteCache compartido, o None para no usar el caché de rutas.
+    :param pairs: Número de pares origen/destino distintos por lugar, o None para elegirlos al azar.
+    :return:
+    """
+    import numpy as np
+    from .algorithms import ALGORITHMS, compile_graph, multi_source_dijkstra, path_from_graph
+
+    start = time.perf_counter()
+    shared = loader.load(place, session=session).result()
+    timings.record("load", time.perf_counter() - start)
+
+    start = time.perf_counter()
+    graph = shared.copy()  # main.py works on its own copy of the cached graph
+    timings.record("copy", time.perf_counter() - start)
+
+    compiled = compile_graph(graph)  # Shared with the cached graph, so it is never recompiled
+    for _ in range(queries):
+        # Every session of a place that draws the same pair number gets the same pair
+        pair_rng = random.Random(f"{place}-{rng.randrange(pairs)}") if pairs else rng
+        # IDDFS never ends if the target is unreachable, so pick a target reachable from the start
+        i = pair_rng.randrange(compiled.num_nodes)
+        dist = multi_source_dijkstra(compiled.indptr, compiled.indices, compiled.weights, [i])[0]
+        orig, dest = compiled.nodes[i], compiled.nodes[pair_rng.choice(np.flatnonzero(dist < np.inf).tolist())]
+        for engine in engines:
+            params = {"limit": limit} if engine == "dls" else {}
+            if cache is not None:
+                start = time.perf_counter()
+                route = cache.get(graph, engine, orig, dest, params)
+                timings.record("cache_get", time.perf_counter() - start)
+                timings.record_lookup(route is not None)
+                if route is not None:  # main.py shows the cached route without running the algorithm
+                    continue
+
+            start = time.perf_counter()
+            ALGORITHMS[engine](graph, orig, dest, **params)
+            timings.record(engine, time.perf_counter() - start)
+
+            start = time.perf_counter()
+            path = path_from_graph(graph, orig, dest)
+            metrics = path.metrics()
+            timings.record("path", time.perf_counter() - start)
+
+            if cache is not None and path.found:
+                start = time.perf_counter()
+                cache.put(graph, engine, orig, dest, path.nodes, *metrics, params=params)
+                timings.record("cache_put", time.perf_counter() - start)
+
+            if render:
+                from .renderers import build_deck
+                start = time.perf_counter()
+                build_deck(graph).to_json()
+                timings.record("render", time.perf_counter() - start)
+
+            if plot:
+                _plot_png(graph, timings)
+
+
+def _plot_png(graph, timings):
+    """
+    Dibuja el grafo con Matplotlib y lo guarda como PNG en memoria, como st.pyplot.
+
+    :param graph: El grafo, con los estilos del último algoritmo.
+    :param timings: Las latencias compartidas.
+    :return:
+    """
+    import io
+    import matplotlib.pyplot as plt
+    from .helpers import graph_figure
+
+    start = time.perf_counter()
+    with _plot_lock:
+        fig, _ = graph_figure(graph)
+        try:
+            fig.savefig(io.BytesIO(), format="png")
+        finally:
+            plt.close(fig)  # Every figure is closed, as plot_graph does
+    timings.record("plot", time.perf_counter() - start)
+
+
+def _percentile(values, q):
+    """
+    Calcula un percentil por el método del rango más cercano.
+
+    :param values: Las mediciones.
+    :param q: El percentil (entre 0 y 100).
+    :return: El valor del percentil.
+    """
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, int(round(q / 100 * len(ordered) + 0.5)) - 1))]
+
+
+def run_load_test(sessions=20, concurrency=4, places=2, queries=1, engines=LOAD_TEST_ENGINES, size=30,
+                  delay=0.2, render=False, plot=False, lean=False, limit=5, seed=0, loader=None, route_cache=None,
+                  pairs=None):
+    """
+    Simula varias sesiones simultáneas contra la capa de cálculo de la aplicación.
+
+    :param sessions: Número total de sesiones.
+    :param concurrency: Número de sesiones que se ejecutan al mismo tiempo (hilos).
+    :param places: Número de lugares distintos que piden las sesiones.
+    :param queries: Número de pares origen/destino por sesión.
+    :param engines: Nombres de los algoritmos que ejecuta cada sesión.
+    :param size: Lado de la cuadrícula de la SyntheticSource (size x size nodos).
+    :param delay: Retraso en segundos que simula la descarga de cada lugar.
+    :param render: Si es True, cada sesión arma el mapa WebGL (requiere pydeck).
+    :param plot: Si es True, cada sesión dibuja la imagen de Matplotlib (requiere OSMnx y Matplotlib).
+    :param lean: Si es True, el GraphLoader usa el modo de memoria reducida.
+    :param limit: Límite de profundidad de DLS.
+    :param seed: Semilla para elegir los lugares y los nodos.
+    :param loader: Un GraphLoader propio (por defecto, uno con la SyntheticSource).
+    :param route_cache: Un RouteCache, o la ruta de su base de datos, que comparten las
+        sesiones; True usa una base de datos nueva en un directorio temporal, y None no
+        usa el caché de rutas.
+    :param pairs: Número de pares origen/destino distintos por lugar (None los elige al azar).
+    :return: Diccionario con "sessions", "errors", "wall_seconds", "throughput" (sesiones
+        por segundo), "cpu_seconds", "cpu_utilization" (núcleos usados en promedio),
+        "rss_start", "rss_end", "rss_per_session" (bytes), "cache_hits" y "cache_misses"
+        (búsquedas en el caché de rutas) y "stages" (p50, p99, mean y count de cada
+        etapa, en segundos).
+    """
+    import contextlib
+    import io
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor
+    from .loader import GraphLoader
+    from .sources import SyntheticSource
+
+    if plot:
+        import matplotlib
+        matplotlib.use("Agg")  # No windows, the same backend as a headless Streamlit server
+    if loader is None:
+        loader = GraphLoader(source=SyntheticSource(size=size, delay=delay), cache_size=max(places, 1), lean=lean)
+    temporary = None
+    if route_cache is True:
+        temporary = tempfile.TemporaryDirectory(prefix="streetmap-loadtest-")
+        route_cache = os.path.join(temporary.name, "routes.sqlite3")
+    if isinstance(route_cache, str):
+        from .route_cache import RouteCache
+        route_cache = RouteCache(route_cache)
+    place_names = [f"Place {i}" for i in range(places)]
+    timings = _Timings()
+    errors = []
+
+    def session(i):
+        rng = random.Random(seed * 1_000_003 + i)
+        try:
+            _run_session(loader, i, rng.choice(place_names), engines, queries, render, plot, limit, rng,
+                         timings, route_cache, pairs)
+        except Exception as e:
+            errors.append(e)
+
+    rss_start = _rss_bytes()
+    cpu_start = _cpu_seconds()
+    wall_start = time.perf_counter()
+    # time_function prints every call; sys.stdout is global, so it is replaced once for all the threads
+    with contextlib.redirect_stdout(io.StringIO()):
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="load-session") as executor:
+            list(executor.map(session, range(sessions)))
+    wall = time.perf_counter() - wall_start
+    cpu = _cpu_seconds() - cpu_start
+    rss_end = _rss_bytes()
+    if route_cache is not None:
+        route_cache.flush()  # Write the pending last_used times before the database is removed
+    if temporary is not None:
+        temporary.cleanup()
+
+    completed = sessions - len(errors)
+    return {
+        "sessions": completed,
+        "errors": [repr(e) for e in errors],
+        "wall_seconds": wall,
+        "throughput": completed / wall if wall else 0,
+        "cpu_seconds": cpu,
+        "cpu_utilization": cpu / wall if wall else 0,
+        "rss_start": rss_start,
+        "rss_end": rss_end,
+        "rss_per_session": (rss_end - rss_start) / completed if completed else 0,
+        "cache_hits": timings.cache_hits,
+        "cache_misses": timings.cache_misses,
+        "stages": {
+            stage: {"p50": _percentile(values, 50), "p99": _percentile(values, 99),
+                    "mean": sum(values) / len(values), "count": len(values)}
+            for stage, values in timings.stages.items()
+        },
+    }
+
+
+def format_load_report(result):
+    """
+    Arma un reporte en texto con el resultado de run_load_test.
+
+    :param result: Resultado de run_load_test.
+    :return: El reporte.
+    """
+    mb = 1024 * 1024
+    lines = [
+        f"sessions: {result['sessions']} ({len(result['errors'])} errors) in {result['wall_seconds']:.2f} s"
+        f" -> {result['throughput']:.2f} sessions/s",
+        f"cpu: {result['cpu_seconds']:.2f} s ({result['cpu_utilization']:.2f} cores on average)",
+        f"rss: {result['rss_start'] / mb:.1f} MB -> {result['rss_end'] / mb:.1f} MB"
+        f" ({result['rss_per_session'] / 1024:.1f} KB per session)",
+    ]
+    lookups = result["cache_hits"] + result["cache_misses"]
+    if lookups:
+        lines.append(f"route cache: {result['cache_hits']} hits / {lookups} lookups"
+                     f" ({result['cache_hits'] / lookups:.0%} hit rate)")
+    lines += [
+        "",
+        f"{'stage':<16}{'count':>8}{'p50 (ms)':>12}{'p99 (ms)':>12}{'mean (ms)':>12}",
+    ]
+    for stage, stats in result["stages"].items():
+        lines.append(f"{stage:<16}{stats['count']:>8}{stats['p50'] * 1000:>12.2f}"
+                     f"{stats['p99'] * 1000:>12.2f}{stats['mean'] * 1000:>12.2f}")
+    for error in result["errors"][:5]:
+        lines.append(f"error: {error}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """
+    Ejecuta la prueba de carga e imprime el reporte.
+
+    :param argv: Argumentos de la línea de comandos.
+    :return: Código de salida (1 si alguna sesión falló).
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Simulate concurrent sessions of the app's compute layer.")
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--places", type=int, default=2, help="Number of distinct places requested.")
+    parser.add_argument("--queries", type=int, default=1, help="Start/target pairs per session.")
+    parser.add_argument("--engines", nargs="+", default=list(LOAD_TEST_ENGINES))
+    parser.add_argument("--size", type=int, default=30, help="Side of the synthetic grid, in nodes.")
+    parser.add_argument("--delay", type=float, default=0.2, help="Simulated download time, in seconds.")
+    parser.add_argument("--render", action="store_true", help="Also build the WebGL map (needs pydeck).")
+    parser.add_argument("--plot", action="store_true",
+                        help="Also draw the Matplotlib image (needs osmnx and matplotlib).")
+    parser.add_argument("--lean", action="store_true", help="Load the graphs in lean mode.")
+    parser.add_argument("--route-cache", nargs="?", const=True, default=None, metavar="PATH",
+                        help="Share a route cache between the sessions (a temporary database if no path).")
+    parser.add_argument("--pairs", type=int, default=None,
+                        help="Distinct start/target pairs per place, so sessions repeat routes.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    result = run_load_test(sessions=args.sessions, concurrency=args.concurrency, places=args.places,
+                           queries=args.queries, engines=args.engines, size=args.size, delay=args.delay,
+                           render=args.render, plot=args.plot, lean=args.lean, seed=args.seed,
+                           route_cache=args.route_cache, pairs=args.pairs)
+    print(format_load_report(result))
+    return 1 if result["errors"] else 0
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(main())
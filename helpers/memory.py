@@ -0,0 +1,146 @@
+"""
+Este módulo reduce y mide la memoria que ocupa el grafo.
+
+Los grafos de OSMnx guardan muchos atributos que este proyecto no usa (osmid,
+name, highway, lanes, la geometría de las calles, etc.). En el modo de memoria
+reducida (clean_graph(graph, lean=True)) sólo se conservan:
+
+- Nodos: x, y (longitud y latitud).
+- Arcos: length, maxspeed, weight y speed_profile (si existe, ver time_dependent.py).
+
+Los demás atributos se eliminan. Esto reduce el grafo compartido del caché; los
+atributos de cada ejecución (visited, distance, previous, size, color, alpha y
+linewidth) se siguen agregando a la copia de cada sesión.
+
+`graph_memory` estima los bytes por nodo y por arco del grafo (atributos y
+estructura de NetworkX, más los arreglos del grafo compilado), y
+`format_memory_report` compara dos mediciones (antes y después de reducir).
+"""
+
+import sys  # Import sys to measure object sizes
+
+NODE_ATTRIBUTES = ("x", "y")  # Node attributes kept in lean mode
+EDGE_ATTRIBUTES = ("length", "maxspeed", "weight", "speed_profile")  # Edge attributes kept in lean mode
+
+
+def _replace_attributes(data, keep):
+    """
+    Deja en `data` sólo los atributos de `keep`.
+
+    Se usa clear() y update() sobre el mismo diccionario porque NetworkX comparte el
+    diccionario de cada arco entre sus dos nodos, y porque clear() sí libera la memoria
+    del diccionario (borrar llaves una por una no la libera).
+
+    :param data: Diccionario de atributos del nodo o arco.
+    :param keep: Nombres de los atributos que se conservan.
+    :return: Número de atributos eliminados.
+    """
+    kept = {key: data[key] for key in keep if key in data}
+    if len(kept) == len(data):
+        return 0
+    removed = len(data) - len(kept)
+    data.clear()
+    data.update(kept)
+    return removed
+
+
+def prune_graph(graph, node_attributes=NODE_ATTRIBUTES, edge_attributes=EDGE_ATTRIBUTES):
+    """
+    Elimina los atributos de nodos y arcos que no se usan.
+
+    :param graph: El grafo.
+    :param node_attributes: Atributos de los nodos que se conservan.
+    :param edge_attributes: Atributos de los arcos que se conservan.
+    :return: Número de atributos eliminados.
+    """
+    removed = 0
+    for _, data in graph.nodes(data=True):
+        removed += _replace_attributes(data, node_attributes)
+    for _, _, data in graph.edges(data=True):  # Also one dict per parallel edge of a multigraph
+        removed += _replace_attributes(data, edge_attributes)
+    return removed
+
+
+def _deep_size(obj):
+    """
+    Estima los bytes que ocupa un valor de atributo, incluyendo su contenido.
+
+    Las cadenas cortas y los números pequeños suelen estar compartidos en CPython,
+    por lo que la estimación es un máximo. Las geometrías de Shapely se miden por el
+    tamaño de su representación WKB, ya que su memoria real está en GEOS.
+
+    :param obj: El valor.
+    :return: Número de bytes.
+    """
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (list, tuple, set)):
+        size += sum(_deep_size(item) for item in obj)
+    elif isinstance(obj, dict):
+        size += sum(_deep_size(key) + _deep_size(value) for key, value in obj.items())
+    elif hasattr(obj, "wkb"):
+        size += len(obj.wkb)
+    return size
+
+
+def graph_memory(graph):
+    """
+    Estima la memoria del grafo, en bytes por nodo y por arco.
+
+    Se cuentan los diccionarios de atributos con sus valores, los diccionarios de
+    adyacencia de NetworkX, y por separado los arreglos del grafo compilado (si existe).
+
+    :param graph: El grafo.
+    :return: Diccionario con el número de nodos y arcos, los bytes totales y los bytes
+        por nodo y por arco.
+    """
+    num_nodes = graph.number_of_nodes()
+    num_edges = graph.number_of_edges()
+
+    node_bytes = 0
+    for node, data in graph.nodes(data=True):
+        node_bytes += _deep_size(data)
+        node_bytes += sys.getsizeof(graph._succ[node]) + sys.getsizeof(graph._pred[node])
+
+    edge_bytes = 0
+    edges = graph.edges(keys=True, data=True) if graph.is_multigraph() else graph.edges(data=True)
+    for edge in edges:
+        edge_bytes += _deep_size(edge[-1])
+    if graph.is_multigraph():  # The key dictionaries, shared by _succ and _pred
+        edge_bytes += sum(sys.getsizeof(keys) for neighbors in graph._succ.values() for keys in neighbors.values())
+
+    from .algorithms.compiled import COMPILED_CACHE_KEY
+
+    compiled = graph.graph.get(COMPILED_CACHE_KEY)
+    compiled_bytes = 0
+    if compiled is not None:
+        compiled = compiled[1]
+        compiled_bytes = sum(getattr(value, "nbytes", 0) for value in vars(compiled).values())
+        compiled_bytes += sys.getsizeof(compiled.nodes) + sys.getsizeof(compiled.index)
+
+    return {
+        "nodes": num_nodes,
+        "edges": num_edges,
+        "node_bytes": node_bytes,
+        "edge_bytes": edge_bytes,
+        "compiled_bytes": compiled_bytes,
+        "bytes_per_node": node_bytes / num_nodes if num_nodes else 0,
+        "bytes_per_edge": edge_bytes / num_edges if num_edges else 0,
+    }
+
+
+def format_memory_report(before, after):
+    """
+    Arma un reporte en texto que compara dos mediciones de graph_memory.
+
+    :param before: Medición antes de reducir el grafo.
+    :param after: Medición después de reducir el grafo.
+    :return: El reporte.
+    """
+    lines = [f"{'':<18}{'before':>12}{'after':>12}"]
+    for key in ("bytes_per_node", "bytes_per_edge", "node_bytes", "edge_bytes", "compiled_bytes"):
+        lines.append(f"{key:<18}{before[key]:>12,.0f}{after[key]:>12,.0f}")
+    total_before = before["node_bytes"] + before["edge_bytes"]
+    total_after = after["node_bytes"] + after["edge_bytes"]
+    if total_before:
+        lines.append(f"graph size reduced by {100 * (1 - total_after / total_before):.1f}%")
+    return "\n".join(lines)
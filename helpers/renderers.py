@@ -0,0 +1,213 @@
+"""
+Este módulo contiene un graficador alternativo a `plot_graph` que dibuja el grafo
+en el navegador con WebGL (pydeck / deck.gl).
+
+`plot_graph` dibuja una figura completa de Matplotlib en el servidor y la envía
+como imagen; el tiempo y el tamaño de la imagen crecen con el grafo, y no se puede
+hacer zoom. Este graficador, en cambio:
+
+- Convierte la red de calles una sola vez por grafo en un arreglo float32 de
+  segmentos (x0, y0, x1, y1), que se guarda junto al grafo compilado.
+  Si Streamlit sirve archivos estáticos (server.enableStaticServing, ver
+  .streamlit/config.toml), los segmentos se escriben en un archivo JSON en la
+  carpeta static junto a main.py, y el navegador los descarga una sola vez por
+  grafo (y los guarda en su caché); si no, se envían dentro de cada mapa.
+- En cada consulta sólo clasifica los arcos por su estilo (visitado, activo o
+  parte de la ruta) y envía esos conjuntos de arcos como capas encima de la red de
+  calles. Cada arco se envía como un par de puntos [[x0, y0], [x1, y1]] (la capa
+  lee la fila completa con el accesor "@@=-"), y la ruta, que es una cadena de
+  arcos, como una sola línea.
+
+El navegador hace el dibujo, el zoom y el desplazamiento, por lo que el servidor
+ya no genera imágenes.
+
+Para usarlo, se asigna graph.graph["renderer"] = "deck" antes de ejecutar los
+algoritmos; plot_graph lo llama automáticamente.
+"""
+
+import os  # Import os to locate the static folder
+
+# Colors (RGBA) and widths of the edge styles, matching the style_* functions in helpers.py
+UNVISITED_COLOR = [211, 98, 6, 51]  # "#d36206" with alpha 0.2
+VISITED_COLOR = [211, 98, 6, 255]  # "#d36206" with alpha 1
+ACTIVE_COLOR = [232, 169, 0, 255]  # "#e8a900"
+PATH_COLOR = [255, 255, 255, 255]  # "white"
+NODE_COLOR = [255, 255, 255, 255]  # "white"
+BACKGROUND_COLOR = [24, 8, 14, 255]  # "#18080e"
+
+COORDINATE_DECIMALS = 5  # About 1 m, the precision of the float32 segments and much smaller to send
+# Folder served by Streamlit at app/static when server.enableStaticServing is on; it must be next to
+# main.py, so it does not depend on the directory the app was started from
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static")
+
+
+def street_segments(graph):
+    """
+    Devuelve los segmentos de todas las calles, en el mismo orden que graph.edges.
+
+    Los segmentos se calculan una sola vez por grafo, con NumPy a partir del grafo
+    compilado, y se guardan en su caché (las copias del grafo comparten el grafo
+    compilado).
+
+    :param graph: El grafo.
+    :return: Tupla (arreglo float32 de forma (arcos, 4) con las coordenadas x0, y0, x1, y1
+        de cada arco, centro (longitud, latitud) del grafo).
+    """
+    from .algorithms import compile_graph
+    import numpy as np
+
+    compiled = compile_graph(graph)
+    if "deck_segments" not in compiled.cache:
+        # Put the compiled (CSR-ordered) edges back in graph.edges order
+        sources = np.empty_like(compiled.sources)
+        targets = np.empty_like(compiled.indices)
+        sources[compiled.edge_order] = compiled.sources
+        targets[compiled.edge_order] = compiled.indices
+        segments = np.column_stack([compiled.x[sources], compiled.y[sources],
+                                    compiled.x[targets], compiled.y[targets]]).astype(np.float32)
+        center = (float(np.nanmean(compiled.x)), float(np.nanmean(compiled.y))) if compiled.num_nodes else (0, 0)
+        compiled.cache["deck_segments"] = (segments, center)
+    return compiled.cache["deck_segments"]
+
+
+def segment_rows(segments, indices=None):
+    """
+    Convierte segmentos en las filas que recibe la capa: [[x0, y0], [x1, y1]].
+
+    :param segments: Arreglo de segmentos devuelto por street_segments.
+    :param indices: Posiciones (en el orden de graph.edges) de los segmentos que se
+        van a convertir; por defecto, todos.
+    :return: Lista de filas.
+    """
+    import numpy as np
+
+    if indices is not None:
+        segments = segments[np.asarray(indices, dtype=np.intp)]
+    # Round in float64, so the JSON has the short decimal form of each coordinate
+    return np.round(segments.astype(np.float64), COORDINATE_DECIMALS).reshape(-1, 2, 2).tolist()
+
+
+def path_rows(segments, indices):
+    """
+    Une los segmentos de la ruta en líneas, siguiendo la ruta desde su origen: cada
+    segmento que empieza donde terminó el anterior sólo agrega su último punto.
+
+    :param segments: Arreglo de segmentos devuelto por street_segments.
+    :param indices: Posiciones (en el orden de graph.edges) de los arcos de la ruta.
+    :return: Lista de líneas, cada una una lista de puntos [x, y].
+    """
+    rows = segment_rows(segments, indices)
+    following = {}  # Start point -> segments that start there
+    for start, end in rows:
+        following.setdefault(tuple(start), []).append(end)
+    ends = {tuple(end) for _, end in rows}
+
+    lines = []
+    # Start at the points where no segment ends (the origin), then at any point left (cycles)
+    for start in sorted(following, key=lambda point: point in ends):
+        while following.get(start):
+            line = [list(start)]
+            point = start
+            while following.get(point):
+                point = tuple(following[point].pop())
+                line.append(list(point))
+            lines.append(line)
+    return lines
+
+
+def street_layer_data(graph):
+    """
+    Devuelve los datos de la capa de calles: la URL del archivo estático si
+    Streamlit sirve archivos estáticos, o las filas de los segmentos si no.
+
+    El nombre del archivo incluye la huella del grafo, por lo que un grafo con otros
+    nodos o arcos nunca reutiliza un archivo viejo.
+
+    :param graph: El grafo.
+    :return: Cadena con la URL, o lista de filas (ver segment_rows).
+    """
+    import json
+    import streamlit as st  # Lazy import, Streamlit is only needed to render
+    from .algorithms import compile_graph
+
+    segments, _ = street_segments(graph)
+    if not st.get_option("server.enableStaticServing"):
+        return segment_rows(segments)
+
+    name = f"streets-{compile_graph(graph).fingerprint()}.json"
+    path = os.path.join(STATIC_DIR, name)
+    if not os.path.exists(path):
+        os.makedirs(STATIC_DIR, exist_ok=True)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "w") as file:
+            json.dump(segment_rows(segments), file, separators=(",", ":"))
+        os.replace(temporary, path)  # Atomic, so other processes never read a partial file
+    return f"app/static/{name}"
+
+
+def edge_state_indices(graph):
+    """
+    Clasifica los arcos según el estilo que les asignaron los algoritmos.
+
+    :param graph: El grafo.
+    :return: Diccionario con las listas de posiciones (en el orden de graph.edges)
+        de los arcos "visited", "active" y "path". Los demás arcos no están visitados.
+    """
+    states = {"visited": [], "active": [], "path": []}
+    for i, (_, _, data) in enumerate(graph.edges(data=True)):
+        color = data.get("color")
+        if color == "white":
+            states["path"].append(i)
+        elif color == "#e8a900":
+            states["active"].append(i)
+        elif color == "#d36206" and data.get("alpha") == 1:
+            states["visited"].append(i)
+    return states
+
+
+def build_deck(graph, streets=None):
+    """
+    Construye el mapa de pydeck del grafo con su estado actual.
+
+    :param graph: El grafo.
+    :param streets: Datos de la capa de calles (ver street_layer_data); por defecto,
+        las filas de todos los segmentos.
+    :return: Un pydeck.Deck.
+    """
+    import pydeck as pdk  # Lazy import, pydeck is only needed to render
+
+    segments, (longitude, latitude) = street_segments(graph)
+    states = edge_state_indices(graph)
+
+    def path_layer(layer_id, data, color, width):
+        # The accessor "-" (sent as "@@=-") reads the whole row, a list of points, so the rows need no field names
+        return pdk.Layer("PathLayer", data, id=layer_id, get_path="-", get_color=color, get_width=width,
+                         width_units="pixels")
+
+    layers = [
+        path_layer("streets", segment_rows(segments) if streets is None else streets, UNVISITED_COLOR, 0.5),
+        path_layer("visited", segment_rows(segments, states["visited"]), VISITED_COLOR, 1),
+        path_layer("active", segment_rows(segments, states["active"]), ACTIVE_COLOR, 1),
+        path_layer("path", path_rows(segments, states["path"]), PATH_COLOR, 2),
+    ]
+
+    # Highlighted nodes (origin and destination have a size greater than zero)
+    nodes = [{"p": [data["x"], data["y"]]} for _, data in graph.nodes(data=True) if data.get("size", 0) > 0]
+    layers.append(pdk.Layer("ScatterplotLayer", nodes, id="nodes", get_position="p",
+                            get_fill_color=NODE_COLOR, get_radius=4, radius_units="pixels"))
+
+    view_state = pdk.ViewState(longitude=longitude, latitude=latitude, zoom=13)
+    return pdk.Deck(layers=layers, initial_view_state=view_state, map_style=None,
+                    parameters={"clearColor": [channel / 255 for channel in BACKGROUND_COLOR]})
+
+
+def plot_graph_deck(graph):
+    """
+    Grafica el grafo en la interfaz de Streamlit con WebGL (pydeck).
+
+    :param graph: El grafo que se va a graficar.
+    :return:
+    """
+    import streamlit as st  # Lazy import, Streamlit is only needed to render
+
+    st.pydeck_chart(build_deck(graph, street_layer_data(graph)), use_container_width=True)
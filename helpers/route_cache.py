@@ -0,0 +1,262 @@
+"""
+Este módulo contiene un caché persistente de rutas, compartido entre procesos.
+
+Muchos usuarios piden las mismas rutas sobre el mismo lugar, y cada proceso de
+Streamlit las volvía a calcular. El `RouteCache` guarda en una base de datos
+SQLite local el resultado de cada consulta, indexado por:
+
+- La huella del grafo (ver CompiledGraph.fingerprint), que cambia si cambian los
+  nodos, los arcos o los pesos; así los resultados viejos dejan de encontrarse
+  automáticamente. Para los algoritmos de PROFILE_ENGINES, que usan los perfiles de
+  velocidad de los arcos (ver time_dependent.py), se le agrega la huella de los
+  perfiles, que la del grafo no incluye.
+- El algoritmo (engine) y sus parámetros (por ejemplo, el límite de DLS).
+- Los nodos de origen y de destino.
+
+Para cada ruta se guarda la secuencia de nodos (como posiciones del grafo
+compilado, en un arreglo compacto de int32) y la distancia, la velocidad promedio
+y el tiempo total que devuelve reconstruct_path.
+
+Varios procesos pueden usar la misma base de datos al mismo tiempo: se usa el modo
+WAL de SQLite (lectores y escritor concurrentes) y una espera (busy timeout) para
+las escrituras. Cuando se excede `max_entries` o `max_bytes`, se eliminan las rutas
+usadas menos recientemente (LRU).
+
+Las lecturas no escriben: la hora de último uso de las rutas encontradas se acumula
+en memoria y se escribe en lote (cada `touch_batch` lecturas, cada `touch_interval`
+segundos, o junto con la siguiente escritura), para que los lectores no se formen
+por el candado de escritura de la base de datos.
+"""
+
+import json  # Import json to serialize the engine parameters
+import os  # Import os to build the default database path
+import sqlite3  # Import sqlite3 for the persistent store
+import threading  # Import threading for the per-thread connections
+import time  # Import the time module for the LRU timestamps
+from array import array  # Import array to store the paths compactly
+
+
+CACHE_VERSION = 2  # Increase when the stored values change meaning; older databases are emptied
+PROFILE_ENGINES = ("time_dependent",)  # Engines whose routes depend on the speed profiles
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "streetmap", "routes.sqlite3")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS routes (
+    fingerprint TEXT NOT NULL,
+    engine TEXT NOT NULL,
+    params TEXT NOT NULL,
+    orig INTEGER NOT NULL,
+    dest INTEGER NOT NULL,
+    path BLOB NOT NULL,
+    distance REAL NOT NULL,
+    average_speed REAL NOT NULL,
+    total_time REAL NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (fingerprint, engine, params, orig, dest)
+);
+CREATE INDEX IF NOT EXISTS routes_last_used ON routes (last_used);
+"""
+
+
+class RouteCache:
+    """
+    Caché persistente de rutas en SQLite, seguro para varios hilos y procesos.
+
+    Cada hilo (y cada proceso, por ejemplo después de un fork) abre su propia conexión.
+    """
+
+    def __init__(self, path=None, max_entries=100_000, max_bytes=None, touch_batch=64, touch_interval=30.0):
+        if path is None:
+            path = os.environ.get("STREETMAP_ROUTE_CACHE", DEFAULT_CACHE_PATH)
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes  # Maximum total size of the stored paths, None for no limit
+        self.touch_batch = touch_batch  # Cache hits whose last_used is written in one transaction
+        self.touch_interval = touch_interval  # Maximum seconds between two last_used writes
+        self._touched = {}  # key -> time of the last hit not written yet
+        self._touched_lock = threading.Lock()
+        self._last_flush = time.time()
+        self._local = threading.local()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def _connection(self):
+        """
+        Devuelve la conexión del hilo y proceso actuales, abriéndola si no existe.
+
+        :return: Una conexión de sqlite3.
+        """
+        local = self._local
+        if getattr(local, "pid", None) != os.getpid():
+            # isolation_level=None: transactions are opened explicitly with BEGIN IMMEDIATE
+            local.connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            local.connection.execute("PRAGMA journal_mode=WAL")
+            local.connection.execute("PRAGMA synchronous=NORMAL")
+            local.connection.executescript(_SCHEMA)
+            if local.connection.execute("PRAGMA user_version").fetchone()[0] != CACHE_VERSION:
+                local.connection.execute("DELETE FROM routes")
+                local.connection.execute(f"PRAGMA user_version = {CACHE_VERSION}")
+            local.pid = os.getpid()
+        return local.connection
+
+    @staticmethod
+    def _key(graph, compiled, engine, orig, dest, params):
+        """
+        Construye la llave de una ruta.
+
+        :param graph: El grafo de NetworkX.
+        :param compiled: El grafo compilado.
+        :param engine: Nombre del algoritmo.
+        :param orig: Nodo de origen.
+        :param dest: Nodo de destino.
+        :param params: Diccionario con los parámetros del algoritmo.
+        :return: Tupla (huella, algoritmo, parámetros, origen, destino).
+        """
+        params = params or {}
+        fingerprint = compiled.fingerprint()
+        if engine in PROFILE_ENGINES:
+            from .algorithms import BUCKET_SIZES, speed_profiles
+
+            # The profiles are built once per graph, with the resolution used by the query
+            profiles = speed_profiles(graph, params.get("buckets", BUCKET_SIZES[0]))
+            fingerprint = f"{fingerprint}-{profiles.fingerprint()}"
+        return fingerprint, engine, json.dumps(params, sort_keys=True), compiled.index[orig], compiled.index[dest]
+
+    def get(self, graph, engine, orig, dest, params=None):
+        """
+        Busca una ruta en el caché.
+
+        :param graph: El grafo de NetworkX.
+        :param engine: Nombre del algoritmo.
+        :param orig: Nodo de origen.
+        :param dest: Nodo de destino.
+        :param params: Diccionario con los parámetros del algoritmo.
+        :return: Tupla (ruta, distancia, velocidad promedio, tiempo total), o None si no está.
+        """
+        from .algorithms import compile_graph
+
+        compiled = compile_graph(graph)
+        key = self._key(graph, compiled, engine, orig, dest, params)
+        connection = self._connection()
+        row = connection.execute(
+            "SELECT path, distance, average_speed, total_time FROM routes "
+            "WHERE fingerprint = ? AND engine = ? AND params = ? AND orig = ? AND dest = ?", key).fetchone()
+        if row is None:
+            return None
+        self._touch(key)
+        positions = array("i")
+        positions.frombytes(row[0])
+        return [compiled.nodes[i] for i in positions], row[1], row[2], row[3]
+
+    def put(self, graph, engine, orig, dest, path, distance, average_speed, total_time, params=None):
+        """
+        Guarda una ruta en el caché y elimina las menos usadas si se excede el límite.
+
+        :param graph: El grafo de NetworkX.
+        :param engine: Nombre del algoritmo.
+        :param orig: Nodo de origen.
+        :param dest: Nodo de destino.
+        :param path: Lista de nodos de la ruta.
+        :param distance: Distancia en kilómetros.
+        :param average_speed: Velocidad promedio.
+        :param total_time: Tiempo total en minutos.
+        :param params: Diccionario con los parámetros del algoritmo.
+        :return:
+        """
+        from .algorithms import compile_graph
+
+        compiled = compile_graph(graph)
+        key = self._key(graph, compiled, engine, orig, dest, params)
+        blob = array("i", [compiled.index[node] for node in path]).tobytes()
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")  # Take the write lock now, waiting for other processes
+        try:
+            connection.execute(
+                "INSERT OR REPLACE INTO routes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (*key, blob, distance, average_speed, total_time, len(blob), time.time()))
+            self._write_touched(connection)
+            self._evict(connection)
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def _touch(self, key):
+        """
+        Registra el uso de una ruta; la hora se escribe en lote (ver flush).
+
+        :param key: La llave de la ruta.
+        :return:
+        """
+        now = time.time()
+        with self._touched_lock:
+            self._touched[key] = now
+            due = len(self._touched) >= self.touch_batch or now - self._last_flush >= self.touch_interval
+        if due:
+            self.flush()
+
+    def _write_touched(self, connection):
+        """
+        Escribe la hora de último uso acumulada, dentro de una transacción abierta.
+
+        :param connection: La conexión, con una transacción abierta.
+        :return:
+        """
+        with self._touched_lock:
+            touched, self._touched = self._touched, {}
+            self._last_flush = time.time()
+        if touched:
+            connection.executemany(
+                "UPDATE routes SET last_used = MAX(last_used, ?) "
+                "WHERE fingerprint = ? AND engine = ? AND params = ? AND orig = ? AND dest = ?",
+                [(used, *key) for key, used in touched.items()])
+
+    def flush(self):
+        """
+        Escribe la hora de último uso de las rutas encontradas desde la última escritura.
+
+        :return:
+        """
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            self._write_touched(connection)
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def _evict(self, connection):
+        """
+        Elimina las rutas usadas menos recientemente hasta cumplir los límites.
+
+        :param connection: La conexión, con una transacción abierta.
+        :return:
+        """
+        excess = connection.execute("SELECT COUNT(*) FROM routes").fetchone()[0] - self.max_entries
+        if excess > 0:
+            connection.execute(
+                "DELETE FROM routes WHERE rowid IN "
+                "(SELECT rowid FROM routes ORDER BY last_used LIMIT ?)", (excess,))
+        if self.max_bytes is not None:
+            total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM routes").fetchone()[0]
+            while total > self.max_bytes:
+                rowid, size = connection.execute(
+                    "SELECT rowid, size FROM routes ORDER BY last_used LIMIT 1").fetchone()
+                connection.execute("DELETE FROM routes WHERE rowid = ?", (rowid,))
+                total -= size
+
+    def clear(self):
+        """
+        Elimina todas las rutas del caché.
+
+        :return:
+        """
+        with self._touched_lock:
+            self._touched = {}
+        self._connection().execute("DELETE FROM routes")
+
+    def __len__(self):
+        return self._connection().execute("SELECT COUNT(*) FROM routes").fetchone()[0]
+
@@ -0,0 +1,370 @@
+"""
+Este módulo contiene las fuentes de datos de donde se obtienen los grafos.
+
+Una fuente separa la obtención del grafo en dos pasos, para que el cargador
+(ver loader.py) pueda reportar el progreso de cada uno:
+- fetch: Descarga (u obtiene) los datos crudos del lugar.
+- parse: Construye el grafo de NetworkX a partir de los datos crudos.
+
+Las fuentes disponibles son:
+- OSMSource: Obtiene el grafo de OpenStreetMap con OSMnx.
+- SyntheticSource: Genera localmente una cuadrícula de calles con atributos
+  parecidos a los de OSMnx. Sirve como sustituto de OpenStreetMap para pruebas,
+  desarrollo sin conexión y pruebas de carga.
+- CsvSource: Lee el grafo pequeño incluido en data/ (edges_with_weights.csv y
+  nodes.csv). Tiene pocos nodos, por lo que Bellman-Ford y Floyd-Warshall responden
+  con la tabla de todos los pares (ver all_pairs.py).
+- TiledSource (ver tiles.py): Divide un lugar en mosaicos y los descarga con
+  cualquiera de las fuentes anteriores.
+
+Además de fetch y parse, las fuentes implementan place_bbox y fetch_bbox, que
+se utilizan para cargar un rectángulo de coordenadas. Si la zona no tiene calles,
+se lanza EmptyGraphError.
+
+Las librerías pesadas (OSMnx y NetworkX) se importan dentro de las funciones
+que las utilizan (lazy import).
+"""
+
+import csv  # Import csv to read the bundled graph
+import hashlib  # Import hashlib to derive deterministic values from names
+import math  # Import math to lay out the nodes of the CSV graph
+import os  # Import os to locate the bundled data files
+import random  # Import random for the synthetic street attributes
+import time  # Import the time module to simulate network latency
+
+
+class EmptyGraphError(ValueError):
+    """
+    Se lanza cuando la zona pedida no contiene calles (por ejemplo, un mosaico sobre el mar).
+    """
+
+
+class OSMSource:
+    """
+    Fuente que obtiene el grafo de calles de OpenStreetMap con OSMnx.
+
+    OSMnx descarga y construye el grafo en una sola llamada, por lo que el paso
+    de parse sólo verifica que el grafo no esté vacío.
+    """
+
+    def __init__(self, network_type="drive"):
+        self.network_type = network_type
+
+    def fetch(self, place):
+        """
+        Descarga el grafo del lugar especificado.
+
+        :param place: El lugar en formato "Ciudad, País".
+        :return: El grafo devuelto por OSMnx.
+        """
+        import osmnx as ox  # Lazy import, OSMnx is only needed when fetching
+        return ox.graph_from_place(place, network_type=self.network_type)
+
+    def place_bbox(self, place):
+        """
+        Calcula el rectángulo (north, south, east, west) que contiene a un lugar.
+
+        :param place: El lugar en formato "Ciudad, País".
+        :return: Tupla (north, south, east, west).
+        """
+        import osmnx as ox  # Lazy import, OSMnx is only needed when fetching
+        west, south, east, north = ox.geocode_to_gdf(place).total_bounds
+        return north, south, east, west
+
+    def place_polygon(self, place):
+        """
+        Obtiene la geometría (polígono) de un lugar, para recortar el grafo de sus mosaicos.
+
+        :param place: El lugar en formato "Ciudad, País".
+        :return: El polígono de Shapely del lugar.
+        """
+        import osmnx as ox  # Lazy import, OSMnx is only needed when fetching
+        return ox.geocode_to_gdf(place).geometry.iloc[0]
+
+    def fetch_bbox(self, north, south, east, west):
+        """
+        Descarga el grafo contenido en un rectángulo de coordenadas.
+
+        Se usa para los mosaicos (ver tiles.py), por lo que:
+        - No se simplifica el grafo, para que los arcos de la frontera sean iguales
+          en los dos mosaicos que la comparten; el grafo unido se simplifica después
+          (ver simplify).
+        - Se conservan los arcos que cruzan la frontera (truncate_by_edge) y todos
+          los componentes (retain_all), ya que se conectan con los mosaicos vecinos.
+
+        :param north: Latitud máxima.
+        :param south: Latitud mínima.
+        :param east: Longitud máxima.
+        :param west: Longitud mínima.
+        :return: El grafo devuelto por OSMnx.
+        """
+        import osmnx as ox  # Lazy import, OSMnx is only needed when fetching
+
+        # OSMnx raises this error when the rectangle has no streets (None in old versions without it)
+        no_data = getattr(getattr(ox, "_errors", None), "InsufficientResponseError", None) or ()
+        try:
+            return ox.graph_from_bbox(bbox=(north, south, east, west), network_type=self.network_type,
+                                      simplify=False, retain_all=True, truncate_by_edge=True)
+        except no_data as e:
+            raise EmptyGraphError("The rectangle contains no streets.") from e
+
+    def simplify(self, graph):
+        """
+        Simplifica el grafo unido a partir de mosaicos sin simplificar (ver tiles.py).
+
+        Igual que ox.graph_from_place, se unen en un solo arco las cadenas de arcos cuyos
+        nodos intermedios no son intersecciones. Los arcos ya están limpios: OSMnx suma
+        "length" y "travel_time" de los arcos que une, por lo que el peso (el tiempo de
+        recorrido, en segundos) se guarda como travel_time durante la simplificación. Si
+        los arcos unidos tenían velocidades distintas, se conserva la primera, como en
+        clean_graph.
+
+        :param graph: El grafo unido y limpio.
+        :return: El grafo simplificado.
+        """
+        import osmnx as ox  # Lazy import, OSMnx is only needed for OpenStreetMap graphs
+
+        for _, _, data in graph.edges(data=True):
+            if "weight" in data:
+                data["travel_time"] = data.pop("weight")  # Summed by OSMnx when edges are merged
+        graph = ox.simplify_graph(graph)
+        for _, _, data in graph.edges(data=True):
+            if "travel_time" in data:
+                data["weight"] = data.pop("travel_time")
+            if isinstance(data.get("maxspeed"), list):  # Merged edges with different speeds
+                data["maxspeed"] = data["maxspeed"][0]
+        return graph
+
+    def parse(self, raw):
+        """
+        Verifica el grafo descargado.
+
+        :param raw: El grafo devuelto por fetch.
+        :return: El mismo grafo.
+        """
+        if raw.number_of_nodes() == 0:
+            raise EmptyGraphError("The downloaded graph has no nodes.")
+        return raw
+
+
+def _graph_from_raw(raw):
+    """
+    Construye un MultiDiGraph con los mismos atributos básicos que OSMnx.
+
+    :param raw: Diccionario con las listas de nodos (id, x, y) y de arcos
+        (origen, destino, longitud en metros, maxspeed o None).
+    :return: El grafo de NetworkX.
+    """
+    import networkx as nx  # Lazy import, NetworkX is only needed to build graphs
+
+    graph = nx.MultiDiGraph(crs="epsg:4326")
+    for node, x, y in raw["nodes"]:
+        graph.add_node(node, x=x, y=y, street_count=0)
+    for u, v, length, maxspeed in raw["edges"]:
+        data = {"length": length, "oneway": False, "highway": "residential"}
+        if maxspeed is not None:
+            data["maxspeed"] = maxspeed
+        graph.add_edge(u, v, **data)
+    return graph
+
+
+def _stable_random(*parts):
+    """
+    Devuelve un generador de números aleatorios que depende sólo de `parts`.
+
+    Se usa hashlib en lugar de hash() porque hash() cambia entre procesos.
+
+    :param parts: Valores que identifican el generador.
+    :return: Una instancia de random.Random.
+    """
+    digest = hashlib.sha256(repr(parts).encode()).digest()
+    return random.Random(int.from_bytes(digest[:8], "big"))
+
+
+class SyntheticSource:
+    """
+    Fuente local que genera una cuadrícula de calles en lugar de descargarla.
+
+    Los nodos están en una retícula global de coordenadas (separadas por `spacing`
+    grados), y su identificador depende sólo de su posición en la retícula. La
+    existencia y los atributos de cada arco dependen sólo de sus dos nodos. Por lo
+    tanto, dos rectángulos que se traslapan generan exactamente los mismos nodos y
+    arcos en la zona común, igual que OpenStreetMap.
+
+    Cada lugar se convierte en un rectángulo de `size` x `size` nodos cuya posición
+    depende del nombre del lugar.
+    """
+
+    def __init__(self, size=30, spacing=0.001, delay=0.0, drop_rate=0.1):
+        self.size = size  # Nodes per side for a place
+        self.spacing = spacing  # Distance between lattice nodes, in degrees
+        self.delay = delay  # Simulated download time, in seconds
+        self.drop_rate = drop_rate  # Fraction of missing streets
+
+    def place_bbox(self, place):
+        """
+        Calcula el rectángulo (north, south, east, west) que corresponde a un lugar.
+
+        :param place: El nombre del lugar.
+        :return: Tupla (north, south, east, west).
+        """
+        rng = _stable_random("place", place)
+        south = 19.0 + rng.randrange(1000) * self.spacing
+        west = -99.5 + rng.randrange(1000) * self.spacing
+        extent = (self.size - 1) * self.spacing
+        return south + extent, south, west + extent, west
+
+    def fetch(self, place):
+        """
+        Genera los datos crudos de un lugar.
+
+        :param place: El nombre del lugar.
+        :return: Diccionario con las listas de nodos y arcos.
+        """
+        return self.fetch_bbox(*self.place_bbox(place))
+
+    def fetch_bbox(self, north, south, east, west):
+        """
+        Genera los datos crudos de los nodos y arcos dentro de un rectángulo.
+
+        :param north: Latitud máxima.
+        :param south: Latitud mínima.
+        :param east: Longitud máxima.
+        :param west: Longitud mínima.
+        :return: Diccionario con las listas de nodos y arcos.
+        """
+        time.sleep(self.delay)  # Simulate the network latency of a real download
+
+        # Lattice coordinates covered by the rectangle (rounded to avoid floating point drift)
+        rows = range(round(south / self.spacing), round(north / self.spacing) + 1)
+        cols = range(round(west / self.spacing), round(east / self.spacing) + 1)
+
+        nodes = []
+        edges = []
+        for i in rows:
+            for j in cols:
+                nodes.append((self._node_id(i, j), j * self.spacing, i * self.spacing))
+                # Streets to the right and up neighbors, in both directions
+                for a, b in ((i, j + 1), (i + 1, j)):
+                    if a not in rows or b not in cols:
+                        continue
+                    rng = _stable_random("edge", i, j, a, b)
+                    if rng.random() < self.drop_rate:
+                        continue
+                    length = self.spacing * 111_000 * rng.uniform(0.9, 1.3)  # Degrees to meters, plus curvature
+                    maxspeed = rng.choice(["30", "40", "50", "60", ["40", "50"], None])
+                    u, v = self._node_id(i, j), self._node_id(a, b)
+                    edges.append((u, v, length, maxspeed))
+                    edges.append((v, u, length, maxspeed))
+
+        return {"nodes": nodes, "edges": edges}
+
+    @staticmethod
+    def _node_id(i, j):
+        """
+        Devuelve el identificador de un nodo a partir de su posición en la retícula.
+
+        :param i: Fila (latitud / spacing).
+        :param j: Columna (longitud / spacing).
+        :return: El identificador del nodo.
+        """
+        return i * 10_000_000 + j
+
+    def parse(self, raw):
+        """
+        Construye un MultiDiGraph con los mismos atributos básicos que OSMnx.
+
+        :param raw: Diccionario devuelto por fetch o fetch_bbox.
+        :return: El grafo de NetworkX.
+        """
+        return _graph_from_raw(raw)
+
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+
+class CsvSource:
+    """
+    Fuente que lee un grafo de archivos CSV, por defecto el incluido en data/.
+
+    - edges_path: CSV con las columnas Origin, Destination y Weight.
+    - nodes_path: CSV con la columna Node (opcional; incluye los nodos sin arcos).
+
+    El peso de cada arco se usa como su longitud en kilómetros, y como todos los arcos
+    tienen la misma velocidad (40 km/h, ver clean_graph) las rutas más rápidas son las
+    de menor peso. Con directed=False (por defecto) cada arco se agrega en los dos
+    sentidos. Los archivos no tienen coordenadas, así que los nodos se acomodan en un
+    círculo para poder graficarlos. El lugar que se pide se ignora: siempre se carga
+    el mismo grafo.
+    """
+
+    def __init__(self, edges_path=None, nodes_path=None, directed=False, center=(-99.13, 19.43), radius=0.05):
+        self.edges_path = edges_path or os.path.join(DATA_DIR, "edges_with_weights.csv")
+        self.nodes_path = nodes_path or (None if edges_path else os.path.join(DATA_DIR, "nodes.csv"))
+        self.directed = directed
+        self.center = center  # (longitude, latitude) of the layout
+        self.radius = radius  # Radius of the layout, in degrees
+
+    def place_bbox(self, place):
+        """
+        Calcula el rectángulo (north, south, east, west) que contiene al grafo.
+
+        :param place: El lugar (se ignora).
+        :return: Tupla (north, south, east, west).
+        """
+        x, y = self.center
+        return y + self.radius, y - self.radius, x + self.radius, x - self.radius
+
+    def fetch(self, place):
+        """
+        Lee los nodos y arcos de los archivos CSV.
+
+        :param place: El lugar (se ignora).
+        :return: Diccionario con las listas de nodos y arcos.
+        """
+        with open(self.edges_path, newline="", encoding="utf-8") as file:
+            rows = [(row["Origin"], row["Destination"], float(row["Weight"])) for row in csv.DictReader(file)]
+
+        names = []
+        if self.nodes_path and os.path.exists(self.nodes_path):
+            with open(self.nodes_path, newline="", encoding="utf-8") as file:
+                names = [row["Node"] for row in csv.DictReader(file)]
+        for u, v, _ in rows:  # Nodes that only appear in the edges file
+            names.extend(node for node in (u, v) if node not in names)
+
+        x, y = self.center
+        nodes = [(name, x + self.radius * math.cos(2 * math.pi * i / len(names)),
+                  y + self.radius * math.sin(2 * math.pi * i / len(names))) for i, name in enumerate(names)]
+        edges = []
+        for u, v, weight in rows:
+            edges.append((u, v, weight * 1000, None))  # Kilometers to meters, default speed
+            if not self.directed:
+                edges.append((v, u, weight * 1000, None))
+        return {"nodes": nodes, "edges": edges}
+
+    def fetch_bbox(self, north, south, east, west):
+        """
+        Lee el grafo y conserva sólo los nodos dentro de un rectángulo.
+
+        :param north: Latitud máxima.
+        :param south: Latitud mínima.
+        :param east: Longitud máxima.
+        :param west: Longitud mínima.
+        :return: Diccionario con las listas de nodos y arcos.
+        """
+        raw = self.fetch(None)
+        nodes = [node for node in raw["nodes"] if south <= node[2] <= north and west <= node[1] <= east]
+        inside = {node[0] for node in nodes}
+        edges = [edge for edge in raw["edges"] if edge[0] in inside and edge[1] in inside]
+        return {"nodes": nodes, "edges": edges}
+
+    def parse(self, raw):
+        """
+        Construye el grafo a partir de los nodos y arcos leídos.
+
+        :param raw: Diccionario devuelto por fetch o fetch_bbox.
+        :return: El grafo de NetworkX.
+        """
+        if not raw["nodes"]:
+            raise EmptyGraphError("The CSV graph has no nodes.")
+        return _graph_from_raw(raw)
@@ -0,0 +1,130 @@
+"""
+Este módulo mide el tiempo de importación (arranque en frío) de la aplicación.
+
+Los módulos de helpers sólo importan la biblioteca estándar y NumPy; OSMnx,
+Matplotlib, pandas y NetworkX se importan dentro de las funciones que los usan
+(lazy import), la primera vez que se grafica o se descarga un grafo. Este módulo
+permite comprobarlo:
+
+- measure_import: Importa un módulo en un proceso nuevo (en frío) y devuelve el
+  tiempo de importación y las dependencias pesadas que se cargaron con él.
+- import_time_report: Mide varios módulos y arma un reporte en texto.
+
+Se puede ejecutar directamente:
+
+    python -m helpers.startup [--budget SEGUNDOS] [módulo ...]
+
+Con --budget, el comando termina con error si algún módulo de helpers tarda más
+que el presupuesto indicado, para detectar regresiones en el arranque.
+"""
+
+import json  # Import json to read the result of the child process
+import subprocess  # Import subprocess to import every module in a fresh interpreter
+import sys  # Import sys to find the current interpreter
+
+# Modules reported by default: the compute layer and the heavy dependencies of the app
+DEFAULT_MODULES = (
+    "helpers",
+    "helpers.algorithms",
+    "numpy",
+    "networkx",
+    "pandas",
+    "matplotlib.pyplot",
+    "osmnx",
+    "streamlit",
+)
+
+# Dependencies that should only be imported on first use (plot, fetch or chart)
+HEAVY_MODULES = ("networkx", "pandas", "matplotlib", "osmnx", "streamlit", "geopandas", "shapely", "tensorflow")
+
+_CHILD = """
+import json, sys, time
+start = time.perf_counter()
+try:
+    __import__(sys.argv[1])
+except ImportError as e:
+    print(json.dumps({"error": str(e)}))
+else:
+    print(json.dumps({
+        "seconds": time.perf_counter() - start,
+        "heavy": sorted({m.split(".")[0] for m in sys.modules} & set(sys.argv[2:])),
+    }))
+"""
+
+
+def measure_import(module, runs=3):
+    """
+    Mide el tiempo de importación de un módulo en un intérprete nuevo.
+
+    Se toma el mínimo de `runs` ejecuciones para reducir el ruido del sistema.
+
+    :param module: Nombre del módulo (por ejemplo "helpers.algorithms").
+    :param runs: Número de veces que se mide.
+    :return: Diccionario con "seconds" y "heavy" (dependencias pesadas cargadas), o "error".
+    """
+    best = None
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", _CHILD, module, *HEAVY_MODULES],
+                                capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        if "error" in result:
+            return result
+        if best is None or result["seconds"] < best["seconds"]:
+            best = result
+    return best
+
+
+def import_time_report(modules=DEFAULT_MODULES, runs=3):
+    """
+    Mide el tiempo de importación de varios módulos y arma un reporte.
+
+    :param modules: Nombres de los módulos que se van a medir.
+    :param runs: Número de veces que se mide cada módulo.
+    :return: Tupla (resultados por módulo, reporte en texto).
+    """
+    results = {module: measure_import(module, runs) for module in modules}
+    lines = [f"{'module':<24}{'cold import (s)':>16}  heavy dependencies loaded"]
+    for module, result in results.items():
+        if "error" in result:
+            lines.append(f"{module:<24}{'-':>16}  not installed ({result['error']})")
+        else:
+            lines.append(f"{module:<24}{result['seconds']:>16.3f}  {', '.join(result['heavy']) or '-'}")
+    return results, "\n".join(lines)
+
+
+def main(argv=None):
+    """
+    Imprime el reporte de tiempos de importación.
+
+    :param argv: Argumentos de la línea de comandos.
+    :return: Código de salida (1 si algún módulo de helpers excede el presupuesto).
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Measure the cold import time of the app modules.")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--budget", type=float, default=None,
+                        help="Fail if a helpers module takes longer than this many seconds to import.")
+    args = parser.parse_args(argv)
+
+    results, report = import_time_report(args.modules, args.runs)
+    print(report)
+    if args.budget is None:
+        return 0
+
+    status = 0
+    for module, result in results.items():
+        if not module.startswith("helpers") or "error" in result:
+            continue
+        if result["seconds"] > args.budget:
+            print(f"{module} took {result['seconds']:.3f} s, over the {args.budget} s budget.")
+            status = 1
+        if result["heavy"]:
+            print(f"{module} imported heavy dependencies eagerly: {', '.join(result['heavy'])}.")
+            status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,266 @@
+"""
+Este módulo arma grafos de regiones grandes a partir de mosaicos (tiles).
+
+Para una zona metropolitana, una sola llamada a `ox.graph_from_place` es lenta,
+usa mucha memoria y en algunas regiones falla. La `TiledSource` divide el
+rectángulo del lugar en mosaicos de `tile_size` x `tile_size` grados alineados a
+una retícula global, y:
+
+1. Descarga y limpia cada mosaico de forma independiente y en paralelo.
+2. Guarda cada mosaico limpio en un caché LRU, indexado por su posición en la
+   retícula, de modo que al cambiar el área de interés sólo se descargan los
+   mosaicos que faltan. El caché guarda al menos `cache_size` mosaicos, y crece
+   hasta el número de mosaicos de la región más grande que se ha pedido, para que
+   una región nunca desaloje sus propios mosaicos.
+3. Une los mosaicos en un solo grafo. Los nodos de la frontera aparecen en los dos
+   mosaicos que la comparten; como su identificador es el mismo (el id de OSM),
+   se guardan una sola vez, igual que los arcos repetidos.
+4. Simplifica el grafo unido si la fuente lo permite (source.simplify, ver
+   OSMSource): los mosaicos se descargan sin simplificar para que coincidan en la
+   frontera, y sin este paso una zona metropolitana tendría varias veces más nodos
+   que con ox.graph_from_place.
+5. Recorta el grafo unido al lugar pedido (su polígono si la fuente lo tiene, o
+   su rectángulo), ya que los mosaicos alineados a la retícula cubren más que el
+   lugar.
+
+Los mosaicos sin calles (sobre agua o terreno vacío) se guardan en el caché como
+grafos vacíos, para no volver a descargarlos.
+
+La TiledSource implementa la misma interfaz que las fuentes de sources.py, por lo
+que se puede usar directamente con el GraphLoader. Como sus grafos ya están limpios
+(cleaned = True), el GraphLoader no vuelve a limpiar la región completa.
+"""
+
+import math  # Import math to align the tiles to the global grid
+import threading  # Import threading to protect the tile cache
+from collections import OrderedDict  # Import OrderedDict for the LRU cache
+from concurrent.futures import ThreadPoolExecutor  # Import the executor for the parallel downloads
+
+from .helpers import clean_graph  # Import the graph cleaner
+from .sources import EmptyGraphError  # Import the error of the areas without streets
+
+TILE_SIZE = 0.05  # Default tile side, in degrees (roughly 5 km)
+CLIP_TOLERANCE = 1e-9  # Margin in degrees, so nodes exactly on the border are kept
+
+
+def tile_keys(north, south, east, west, tile_size=TILE_SIZE):
+    """
+    Devuelve las posiciones (fila, columna) de los mosaicos que cubren un rectángulo.
+
+    :param north: Latitud máxima.
+    :param south: Latitud mínima.
+    :param east: Longitud máxima.
+    :param west: Longitud mínima.
+    :param tile_size: Lado de los mosaicos en grados.
+    :return: Lista de tuplas (fila, columna).
+    """
+    rows = range(math.floor(south / tile_size), math.ceil(north / tile_size))
+    cols = range(math.floor(west / tile_size), math.ceil(east / tile_size))
+    return [(row, col) for row in rows for col in cols] or [(rows.start, cols.start)]
+
+
+def tile_bbox(key, tile_size=TILE_SIZE):
+    """
+    Devuelve el rectángulo (north, south, east, west) de un mosaico.
+
+    :param key: Posición (fila, columna) del mosaico.
+    :param tile_size: Lado de los mosaicos en grados.
+    :return: Tupla (north, south, east, west).
+    """
+    row, col = key
+    return (row + 1) * tile_size, row * tile_size, (col + 1) * tile_size, col * tile_size
+
+
+def stitch_tiles(tiles):
+    """
+    Une varios mosaicos en un solo grafo sin repetir nodos ni arcos.
+
+    Los mosaicos no se modifican (siguen en el caché); el grafo resultante tiene
+    sus propias copias de los atributos.
+
+    :param tiles: Lista de grafos (MultiDiGraph) de los mosaicos.
+    :return: El grafo unido.
+    """
+    import networkx as nx  # Lazy import, NetworkX is only needed to build graphs
+
+    # Keep the graph-level attributes (crs, ...) but not the per-tile caches
+    attributes = {key: value for key, value in tiles[0].graph.items() if not key.startswith("_")} if tiles else {}
+    graph = nx.MultiDiGraph(**attributes)
+    for tile in tiles:
+        for node, data in tile.nodes(data=True):
+            if node not in graph:  # Boundary nodes appear in both neighboring tiles
+                graph.add_node(node, **data)
+        for u, v, key, data in tile.edges(keys=True, data=True):
+            if not graph.has_edge(u, v, key):  # So do the edges that cross the boundary
+                graph.add_edge(u, v, key, **data)
+    return graph
+
+
+def clip_graph(graph, north, south, east, west, polygon=None):
+    """
+    Recorta un grafo a un rectángulo y, opcionalmente, a un polígono (modifica el grafo).
+
+    :param graph: El grafo unido.
+    :param north: Latitud máxima.
+    :param south: Latitud mínima.
+    :param east: Longitud máxima.
+    :param west: Longitud mínima.
+    :param polygon: Polígono de Shapely del lugar (opcional, requiere OSMnx).
+    :return: El grafo recortado.
+    """
+    eps = CLIP_TOLERANCE
+    outside = [node for node, data in graph.nodes(data=True)
+               if not (south - eps <= data["y"] <= north + eps and west - eps <= data["x"] <= east + eps)]
+    graph.remove_nodes_from(outside)  # Also removes the edges that cross the border
+    if polygon is not None and graph.number_of_nodes():
+        import osmnx as ox  # Lazy import, only sources with polygons (OSMSource) need it
+        graph = ox.truncate.truncate_graph_polygon(graph, polygon)
+    return graph
+
+
+class TiledSource:
+    """
+    Fuente que carga un lugar por mosaicos usando otra fuente para cada mosaico.
+
+    - fetch: Calcula los mosaicos del lugar y descarga y limpia (en paralelo) los
+      que no están en el caché.
+    - parse: Une los mosaicos en un solo grafo, lo simplifica y lo recorta al lugar.
+    """
+
+    cleaned = True  # The tiles are cleaned in parallel, so the GraphLoader skips clean_graph
+
+    def __init__(self, source, tile_size=TILE_SIZE, max_workers=4, cache_size=64, lean=False):
+        self.source = source  # Source used to fetch every tile (OSMSource, SyntheticSource, ...)
+        self.lean = lean  # Drop the unused attributes of the cached tiles (see memory.py)
+        self.tile_size = tile_size
+        self.cache_size = cache_size  # Minimum number of cleaned tiles kept in memory
+        self._capacity = cache_size  # Grows to the tile count of the largest region requested
+        self._cache = OrderedDict()  # key -> cleaned tile graph, least recently used first
+        self._pending = {}  # key -> Future of a tile that is being downloaded
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="graph-tile")
+
+    def place_bbox(self, place):
+        """
+        Calcula el rectángulo del lugar con la fuente de los mosaicos.
+
+        :param place: El lugar.
+        :return: Tupla (north, south, east, west).
+        """
+        return self.source.place_bbox(place)
+
+    def fetch(self, place):
+        """
+        Obtiene los mosaicos limpios que cubren un lugar.
+
+        Si la fuente de los mosaicos conoce el polígono del lugar (place_polygon), el
+        rectángulo se calcula a partir de él y el grafo se recorta al polígono.
+
+        :param place: El lugar.
+        :return: Diccionario con los mosaicos ("tiles"), el rectángulo ("bbox") y el
+            polígono ("polygon", o None) del lugar.
+        """
+        if hasattr(self.source, "place_polygon"):
+            polygon = self.source.place_polygon(place)
+            west, south, east, north = polygon.bounds  # A single geocoding request
+            raw = self.fetch_bbox(north, south, east, west)
+            raw["polygon"] = polygon
+            return raw
+        return self.fetch_bbox(*self.place_bbox(place))
+
+    def fetch_bbox(self, north, south, east, west):
+        """
+        Obtiene los mosaicos limpios que cubren un rectángulo, descargando sólo los que faltan.
+
+        :param north: Latitud máxima.
+        :param south: Latitud mínima.
+        :param east: Longitud máxima.
+        :param west: Longitud mínima.
+        :return: Diccionario con los mosaicos ("tiles"), el rectángulo ("bbox") y el
+            polígono ("polygon", siempre None).
+        """
+        keys = tile_keys(north, south, east, west, self.tile_size)
+        futures = []
+        with self._lock:
+            # A metro area needs more than cache_size tiles; keeping them all lets a shifted
+            # area of interest reuse every tile that it shares with this one
+            self._capacity = max(self._capacity, len(keys))
+            for key in keys:
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                elif key not in self._pending:  # Another load may already be downloading this tile
+                    self._pending[key] = self._executor.submit(self._load_tile, key)
+                futures.append(self._pending.get(key))
+
+        tiles = []
+        for key, future in zip(keys, futures):
+            if future is None:
+                with self._lock:
+                    tile = self._cache.get(key)
+                if tile is None:  # Evicted in the meantime by a concurrent load
+                    tile = self._load_tile(key)
+            else:
+                tile = future.result()
+            if tile.number_of_nodes():  # Tiles over water or empty land have no streets
+                tiles.append(tile)
+        return {"tiles": tiles, "bbox": (north, south, east, west), "polygon": None}
+
+    def parse(self, raw):
+        """
+        Une los mosaicos en un solo grafo, lo simplifica y lo recorta al lugar.
+
+        :param raw: Diccionario devuelto por fetch o fetch_bbox.
+        :return: El grafo unido.
+        """
+        if not raw["tiles"]:
+            raise EmptyGraphError("None of the tiles contains streets.")
+        graph = stitch_tiles(raw["tiles"])
+        if hasattr(self.source, "simplify"):  # The tiles are downloaded unsimplified (see OSMSource)
+            graph = self.source.simplify(graph)
+            if self.lean:
+                from .memory import prune_graph  # Lazy import, only needed in lean mode
+                prune_graph(graph)  # Drop the geometry of the merged edges
+        graph = clip_graph(graph, *raw["bbox"], polygon=raw["polygon"])
+        if graph.number_of_nodes() == 0:
+            raise EmptyGraphError("The place contains no streets.")
+        return graph
+
+    def cached_tiles(self):
+        """
+        Devuelve las posiciones de los mosaicos que están en el caché.
+
+        :return: Lista de tuplas (fila, columna).
+        """
+        with self._lock:
+            return list(self._cache)
+
+    def _load_tile(self, key):
+        """
+        Descarga, construye y limpia un mosaico, y lo guarda en el caché.
+
+        Un mosaico sin calles se guarda como un grafo vacío.
+
+        :param key: Posición (fila, columna) del mosaico.
+        :return: El grafo limpio del mosaico.
+        """
+        import networkx as nx  # Lazy import, NetworkX is only needed to build graphs
+
+        try:
+            try:
+                tile = self.source.parse(self.source.fetch_bbox(*tile_bbox(key, self.tile_size)))
+            except EmptyGraphError:
+                tile = nx.MultiDiGraph()  # Cached too, so the empty tile is not downloaded again
+            if tile.number_of_nodes():
+                clean_graph(tile, lean=self.lean)
+        except Exception:
+            with self._lock:
+                self._pending.pop(key, None)
+            raise
+
+        with self._lock:
+            self._cache[key] = tile
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._capacity:
+                self._cache.popitem(last=False)  # Evict the least recently used tile
+            self._pending.pop(key, None)
+        return tile
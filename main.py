@@ -1,7 +1,10 @@
 from helpers.algorithms import *  # Import all the algorithms from the helpers module
 from helpers import *  # Import all the functions from the helpers module
-import osmnx as ox  # Import the OSMnx library for street network analysis
-import pandas as pd  # Import the pandas library for data manipulation
+from helpers.comparison import compare_algorithms, plot_comparison  # Import the isolated comparison runner
+import os  # Import the os module to read the configuration from the environment
+import datetime  # Import datetime for the default departure time
+import math  # Import math to check the time-dependent travel time
+import uuid  # Import uuid to identify the session in the shared graph loader
 import streamlit as st  # Import the Streamlit library for app creation
 
 # Sidebar for Place Input
@@ -26,15 +29,156 @@ place_name = st.sidebar.text_input("Place Name:", value="Benito Juarez, Mexico",
 # - El valor por defecto es 5.
 limit = st.sidebar.number_input('Depth Limit:', min_value=0, value=5, step=1,
                                 help="Set the maximum depth for depth-limited search.")
+
+# Este campo permite al usuario elegir cómo se grafican los resultados.
+# Consideraciones:
+# - "Matplotlib" dibuja una imagen en el servidor (comportamiento original).
+# - "WebGL" dibuja el mapa en el navegador con pydeck, permite hacer zoom y es mucho
+#   más rápido en grafos grandes, ya que sólo se envían los arcos visitados y la ruta.
+renderer = st.sidebar.radio("Renderer:", ["Matplotlib", "WebGL"],
+                            help="Draw the graph as a server-side image or in the browser with WebGL.")
+
+# Este campo permite al usuario elegir la hora de salida para la ruta dependiente del tiempo.
+# Consideraciones:
+# - La velocidad de cada calle cambia según la hora (perfiles de velocidad, ver time_dependent.py).
+# - El valor por defecto es 8:00, en la hora pico de la mañana.
+departure_time = st.sidebar.time_input("Departure Time:", value=datetime.time(8, 0),
+                                       help="Departure time used by the time-dependent route.")
 # <----------------------------------------------------------------------------->
 
 # Global variables
 metrics = {}  # Dictionary to store the metrics of each algorithm
 
-# Attempt to load the graph for the specified place
+
+@st.cache_resource
+def get_graph_loader():
+    """
+    Crea un único GraphLoader compartido por todas las sesiones y ejecuciones del script.
+
+    Los lugares de la variable de entorno STREETMAP_PREFETCH_PLACES (separados por ";")
+    se precargan en segundo plano.
+    Si STREETMAP_GRAPH_SOURCE es "synthetic", se usa una cuadrícula local en lugar de OpenStreetMap.
+    Si STREETMAP_GRAPH_SOURCE es "csv", se usa el grafo pequeño de data/edges_with_weights.csv, en el
+    que Bellman-Ford y Floyd-Warshall responden con la tabla de todos los pares.
+    Si STREETMAP_TILE_SIZE tiene un valor (en grados), los lugares se cargan por mosaicos.
+    Si STREETMAP_LEAN es "1", se eliminan los atributos que no se usan para ahorrar memoria.
+    """
+    lean = os.environ.get("STREETMAP_LEAN") == "1"
+    sources = {"synthetic": SyntheticSource, "csv": CsvSource}
+    source = sources.get(os.environ.get("STREETMAP_GRAPH_SOURCE"), OSMSource)()
+    if os.environ.get("STREETMAP_TILE_SIZE"):
+        source = TiledSource(source, tile_size=float(os.environ["STREETMAP_TILE_SIZE"]), lean=lean)
+    prefetch_places = os.environ.get("STREETMAP_PREFETCH_PLACES", "").split(";")
+    return GraphLoader(source=source, prefetch_places=prefetch_places, lean=lean)
+
+
+@st.cache_resource
+def get_route_cache():
+    """
+    Crea un único RouteCache compartido por todas las sesiones del proceso.
+
+    La base de datos (STREETMAP_ROUTE_CACHE, por defecto en ~/.cache/streetmap) la comparten
+    todos los procesos de Streamlit de la máquina, por lo que una ruta calculada por
+    cualquier usuario se reutiliza en los demás.
+    """
+    return RouteCache()
+
+
+def cached_route(engine, params=None):
+    """
+    Busca en el caché la ruta del nodo de inicio al nodo de destino seleccionados.
+
+    :param engine: Nombre del algoritmo (ver ALGORITHMS).
+    :param params: Parámetros del algoritmo que cambian el resultado (por ejemplo, el límite de DLS).
+    :return: Tupla (ruta, distancia, velocidad promedio, tiempo total), o None si no está o si
+        el caché está desactivado.
+    """
+    if not use_route_cache:
+        return None
+    return get_route_cache().get(Graph, engine, start_node, target_node, params)
+
+
+def store_route(engine, distance, average_speed, total_time, params=None):
+    """
+    Guarda en el caché la ruta que acaba de calcular un algoritmo (si encontró una).
+
+    :param engine: Nombre del algoritmo (ver ALGORITHMS).
+    :param distance: Distancia en kilómetros.
+    :param average_speed: Velocidad promedio en km/h.
+    :param total_time: Tiempo total en minutos.
+    :param params: Parámetros del algoritmo que cambian el resultado.
+    :return:
+    """
+    path = path_from_graph(Graph, start_node, target_node)  # Only walks the nodes of the route
+    if use_route_cache and path.found:
+        get_route_cache().put(Graph, engine, start_node, target_node, path.nodes,
+                              distance, average_speed, total_time, params=params)
+
+
+def show_query_engine(engine):
+    """
+    Muestra qué motor respondió la consulta de Bellman-Ford o Floyd-Warshall.
+
+    En grafos con más de ALL_PAIRS_MAX_NODES nodos la tabla de todos los pares no se
+    construye y se ejecuta SPFA desde el nodo de origen (ver query_engine).
+
+    :param engine: "bellman_ford" o "floyd_warshall".
+    :return:
+    """
+    if query_engine(Graph, engine) == "spfa":
+        st.warning(f"The graph has {Graph.number_of_nodes()} nodes, more than the {ALL_PAIRS_MAX_NODES[engine]} "
+                   f"of the all-pairs table, so SPFA ran from the start node instead.")
+    else:
+        st.write("Engine: all-pairs table (built on the first query of the place, then reused)")
+
+
+def show_cached_route(name, route):
+    """
+    Muestra una ruta del caché sin ejecutar el algoritmo (no hay nodos visitados que graficar).
+
+    :param name: Nombre del algoritmo en la interfaz.
+    :param route: Tupla (ruta, distancia, velocidad promedio, tiempo total) devuelta por cached_route.
+    :return:
+    """
+    path, distance, average_speed, total_time = route
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.write("Visited Nodes")
+        st.write("This route was loaded from the route cache, so the search did not run.")
+        st.write("Uncheck 'Reuse cached routes' in the sidebar to watch the search.")
+
+    with col2:
+        st.write("Shortest Path")
+        plot_route(Graph, start_node, target_node, path)
+        st.write(f"Distance: {distance} km")
+        st.write(f"Average Speed: {average_speed} km/h")
+        st.write(f"Total Time: {total_time} minutes")
+
+    metrics[name] = {'Execution Time': None, 'Distance': distance,
+                     'Average Speed': average_speed, 'Total Time': total_time}
+
+
+# Load the graph for the specified place in the background, showing the progress of each stage.
+# If the user types a new place name, Streamlit reruns the script and the new load cancels this one.
+# The loader is shared by every session, so each one identifies itself to only cancel its own loads.
+if "session_id" not in st.session_state:
+    st.session_state["session_id"] = uuid.uuid4().hex
+job = get_graph_loader().load(place_name, session=st.session_state["session_id"])
+progress_bar = st.sidebar.progress(job.progress, text="Loading graph...")
+while not job.wait(timeout=0.1):
+    progress_bar.progress(job.progress, text=f"Loading graph: {job.stage}...")
+progress_bar.empty()
+
+# Attempt to get the loaded graph
 try:
-    Graph = ox.graph_from_place(place_name, network_type="drive")  # Load the graph for the specified place
-    clean_graph(Graph)  # Clean the graph to remove unnecessary attributes
+    # The cached graph is shared between sessions and the algorithms modify its attributes,
+    # so every run works on its own copy
+    Graph = job.result().copy()
+    Graph.graph["renderer"] = "deck" if renderer == "WebGL" else "matplotlib"  # Read by plot_graph
+    if "memory_report" in Graph.graph:  # Only measured in lean mode
+        with st.sidebar.expander("Graph Memory"):
+            st.text(format_memory_report(*Graph.graph["memory_report"]))
     nodes_ready = True  # Set the flag to indicate that the nodes are ready
 except Exception as e:
     st.sidebar.error("Could not load graph for the specified place. Please try a different location.")
@@ -46,86 +190,113 @@ if nodes_ready:
     st.sidebar.title("Pathfinding Settings")
     start_node = st.sidebar.selectbox('Start Node:', list(Graph.nodes))
     target_node = st.sidebar.selectbox('Target Node:', list(Graph.nodes))
+    use_route_cache = st.sidebar.checkbox("Reuse cached routes", value=True,
+                                          help="Show routes already computed by any session from the shared "
+                                               "route cache instead of running the search again.")
 
     # Main Interface - Tabs for Each Algorithm
-    tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs(
-        ["Dijkstra", "BFS", "DFS", "DLS", "IDDFS", "Execution Times Chart", "Distance Chart"])
+    tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8, tab9, tab10 = st.tabs(
+        ["Dijkstra", "BFS", "DFS", "DLS", "IDDFS", "Bellman-Ford", "Floyd-Warshall", "Time-Dependent",
+         "Execution Times Chart", "Distance Chart"])
 
     with tab1:
         st.header("Dijkstra's Algorithm")
-        # Create two columns for the plots
-        col1, col2 = st.columns(2)
-
-        with col1:
-            st.write("Visited Nodes")
-            iterations, time_of_function = dijkstra(Graph, start_node, target_node, plot=True)
-            st.write(f"The Dijkstra's algorithm took {time_of_function} seconds.")
-            st.write(f"Number of iterations: {iterations}")
-            metrics['Dijkstra'] = {'Execution Time': time_of_function}
-
-        with col2:
-            st.write("Shortest Path")
-            distance, average_speed, total_time = reconstruct_path(Graph, start_node, target_node, plot=True)
-            st.write(f"Distance: {distance} km")
-            st.write(f"Average Speed: {average_speed} m/s")
-            st.write(f"Total Time: {total_time} minutes")
-            metrics['Dijkstra']['Distance'] = distance
-            metrics['Dijkstra']['Average Speed'] = average_speed
-            metrics['Dijkstra']['Total Time'] = total_time
+        route = cached_route("dijkstra")  # Routes computed by any session or process are reused
+        if route is not None:
+            show_cached_route('Dijkstra', route)
+        else:
+            # Create two columns for the plots
+            col1, col2 = st.columns(2)
+
+            with col1:
+                st.write("Visited Nodes")
+                iterations, time_of_function = dijkstra(Graph, start_node, target_node, plot=True)
+                st.write(f"The Dijkstra's algorithm took {time_of_function} seconds.")
+                st.write(f"Number of iterations: {iterations}")
+                metrics['Dijkstra'] = {'Execution Time': time_of_function}
+
+            with col2:
+                st.write("Shortest Path")
+                distance, average_speed, total_time = reconstruct_path(Graph, start_node, target_node, plot=True)
+                st.write(f"Distance: {distance} km")
+                st.write(f"Average Speed: {average_speed} km/h")
+                st.write(f"Total Time: {total_time} minutes")
+                metrics['Dijkstra']['Distance'] = distance
+                metrics['Dijkstra']['Average Speed'] = average_speed
+                metrics['Dijkstra']['Total Time'] = total_time
+
+            store_route("dijkstra", distance, average_speed, total_time)
 
     with tab2:
         st.header("Breadth-First Search (BFS)")
 
-        # Create two columns for the plots
-        col1, col2 = st.columns(2)
-
-        with col1:
-            st.write("Visited Nodes")
-            iterations, time_of_function = bfs(Graph, start_node, target_node, plot=True)
-            st.write(f"The BFS algorithm took {time_of_function} seconds.")
-            st.write(f"Number of iterations: {iterations}")
-            metrics['BFS'] = {'Execution Time': time_of_function}
-
-        with col2:
-            st.write("Shortest Path")
-            distance, average_speed, total_time = reconstruct_path(Graph, start_node, target_node, plot=True)
-            st.write(f"Distance: {distance} km")
-            st.write(f"Average Speed: {average_speed} m/s")
-            st.write(f"Total Time: {total_time} minutes")
-            metrics['BFS']['Distance'] = distance
-            metrics['BFS']['Average Speed'] = average_speed
-            metrics['BFS']['Total Time'] = total_time
+        route = cached_route("bfs")  # Routes computed by any session or process are reused
+        if route is not None:
+            show_cached_route('BFS', route)
+        else:
+            # Create two columns for the plots
+            col1, col2 = st.columns(2)
+
+            with col1:
+                st.write("Visited Nodes")
+                iterations, time_of_function = bfs(Graph, start_node, target_node, plot=True)
+                st.write(f"The BFS algorithm took {time_of_function} seconds.")
+                st.write(f"Number of iterations: {iterations}")
+                metrics['BFS'] = {'Execution Time': time_of_function}
+
+            with col2:
+                st.write("Shortest Path")
+                distance, average_speed, total_time = reconstruct_path(Graph, start_node, target_node, plot=True)
+                st.write(f"Distance: {distance} km")
+                st.write(f"Average Speed: {average_speed} km/h")
+                st.write(f"Total Time: {total_time} minutes")
+                metrics['BFS']['Distance'] = distance
+                metrics['BFS']['Average Speed'] = average_speed
+                metrics['BFS']['Total Time'] = total_time
+
+            store_route("bfs", distance, average_speed, total_time)
 
     with tab3:
         st.header("Depth-First Search (DFS)")
 
-        # Create two columns for the plots
-        col1, col2 = st.columns(2)
-
-        with col1:
-            st.write("Visited Nodes")
-            iterations, time_of_function = dfs(Graph, start_node, target_node, plot=True)
-            st.write(f"The DFS algorithm took {time_of_function} seconds.")
-            st.write(f"Number of iterations: {iterations}")
-            metrics['DFS'] = {'Execution Time': time_of_function}
-
-        with col2:
-            st.write("Shortest Path")
-            distance, average_speed, total_time = reconstruct_path(Graph, start_node, target_node, plot=True)
-            st.write(f"Distance: {distance} km")
-            st.write(f"Average Speed: {average_speed} m/s")
-            st.write(f"Total Time: {total_time} minutes")
-            metrics['DFS']['Distance'] = distance
-            metrics['DFS']['Average Speed'] = average_speed
-            metrics['DFS']['Total Time'] = total_time
+        route = cached_route("dfs")  # Routes computed by any session or process are reused
+        if route is not None:
+            show_cached_route('DFS', route)
+        else:
+            # Create two columns for the plots
+            col1, col2 = st.columns(2)
+
+            with col1:
+                st.write("Visited Nodes")
+                iterations, time_of_function = dfs(Graph, start_node, target_node, plot=True)
+                st.write(f"The DFS algorithm took {time_of_function} seconds.")
+                st.write(f"Number of iterations: {iterations}")
+                metrics['DFS'] = {'Execution Time': time_of_function}
+
+            with col2:
+                st.write("Shortest Path")
+                distance, average_speed, total_time = reconstruct_path(Graph, start_node, target_node, plot=True)
+                st.write(f"Distance: {distance} km")
+                st.write(f"Average Speed: {average_speed} km/h")
+                st.write(f"Total Time: {total_time} minutes")
+                metrics['DFS']['Distance'] = distance
+                metrics['DFS']['Average Speed'] = average_speed
+                metrics['DFS']['Total Time'] = total_time
+
+            store_route("dfs", distance, average_speed, total_time)
 
     with tab4:
         found = False
         st.header("Depth-Limited Search (DLS)")
 
+        # Routes computed by any session or process are reused
+        route = cached_route("dls", {"limit": limit}) if limit is not None else None
+
         # Indicate if the limit is not set; otherwise, run the DLS
         if limit is None:
             st.write("Please set a depth limit.")
+        elif route is not None:
+            show_cached_route('DLS', route)
         else:
             # Create two columns for the plots
             col1, col2 = st.columns(2)
@@ -143,11 +314,12 @@ if nodes_ready:
                 if found:
                     distance, average_speed, total_time = reconstruct_path(Graph, start_node, target_node, plot=True)
                     st.write(f"Distance: {distance} km")
-                    st.write(f"Average Speed: {average_speed} m/s")
+                    st.write(f"Average Speed: {average_speed} km/h")
                     st.write(f"Total Time: {total_time} minutes")
                     metrics['DLS']['Distance'] = distance
                     metrics['DLS']['Average Speed'] = average_speed
                     metrics['DLS']['Total Time'] = total_time
+                    store_route("dls", distance, average_speed, total_time, {"limit": limit})
                 else:
                     st.write("No path found within the depth limit.")
                     metrics['DLS']['Distance'] = "N/A"
@@ -158,44 +330,177 @@ if nodes_ready:
         found = False
         st.header("Iterative Depth-First Search (Iterative DFS)")
 
-        # Create two columns for the plots
-        col1, col2 = st.columns(2)
-
-        with col1:
-            st.write("Visited Nodes")
-            iterations, time_of_function = iterative_deepening_dfs(Graph, start_node, target_node, plot=True)
-            st.write(f"The IDDFS algorithm took {time_of_function} seconds.")
-            st.write(f"Number of iterations: {iterations}")
-            metrics['IDDFS'] = {'Execution Time': time_of_function}
-
-        with col2:
-            st.write("Shortest Path")
-            distance, average_speed, total_time = reconstruct_path(Graph, start_node, target_node, plot=True)
-            st.write(f"Distance: {distance} km")
-            st.write(f"Average Speed: {average_speed} m/s")
-            st.write(f"Total Time: {total_time} minutes")
-            metrics['IDDFS']['Distance'] = distance
-            metrics['IDDFS']['Average Speed'] = average_speed
-            metrics['IDDFS']['Total Time'] = total_time
+        route = cached_route("iddfs")  # Routes computed by any session or process are reused
+        if route is not None:
+            show_cached_route('IDDFS', route)
+        else:
+            # Create two columns for the plots
+            col1, col2 = st.columns(2)
+
+            with col1:
+                st.write("Visited Nodes")
+                iterations, time_of_function = iterative_deepening_dfs(Graph, start_node, target_node, plot=True)
+                st.write(f"The IDDFS algorithm took {time_of_function} seconds.")
+                st.write(f"Number of iterations: {iterations}")
+                metrics['IDDFS'] = {'Execution Time': time_of_function}
+
+            with col2:
+                st.write("Shortest Path")
+                distance, average_speed, total_time = reconstruct_path(Graph, start_node, target_node, plot=True)
+                st.write(f"Distance: {distance} km")
+                st.write(f"Average Speed: {average_speed} km/h")
+                st.write(f"Total Time: {total_time} minutes")
+                metrics['IDDFS']['Distance'] = distance
+                metrics['IDDFS']['Average Speed'] = average_speed
+                metrics['IDDFS']['Total Time'] = total_time
+
+            store_route("iddfs", distance, average_speed, total_time)
 
     with tab6:
-        st.header("Algorithm Execution Times")
-        speeds = [metrics[key]['Execution Time'] for key in metrics]
-        data = pd.DataFrame({
-            'Algorithm': list(metrics.keys()),
-            'Execution Time (s)': speeds
-        })
-        st.bar_chart(data.set_index('Algorithm'))
+        st.header("Bellman-Ford (SPFA)")
+
+        route = cached_route("bellman_ford")  # Routes computed by any session or process are reused
+        if route is not None:
+            show_cached_route('Bellman-Ford', route)
+        else:
+            # Create two columns for the plots
+            col1, col2 = st.columns(2)
+
+            with col1:
+                st.write("Visited Nodes")
+                iterations, time_of_function = bellman_ford(Graph, start_node, target_node, plot=True)
+                st.write(f"The Bellman-Ford algorithm took {time_of_function} seconds.")
+                st.write(f"Number of iterations: {iterations}")
+                show_query_engine("bellman_ford")  # Large graphs fall back to SPFA from the start node
+                metrics['Bellman-Ford'] = {'Execution Time': time_of_function}
+
+            with col2:
+                st.write("Shortest Path")
+                distance, average_speed, total_time = reconstruct_path(Graph, start_node, target_node, plot=True)
+                st.write(f"Distance: {distance} km")
+                st.write(f"Average Speed: {average_speed} km/h")
+                st.write(f"Total Time: {total_time} minutes")
+                metrics['Bellman-Ford']['Distance'] = distance
+                metrics['Bellman-Ford']['Average Speed'] = average_speed
+                metrics['Bellman-Ford']['Total Time'] = total_time
+
+            store_route("bellman_ford", distance, average_speed, total_time)
 
     with tab7:
+        st.header("Floyd-Warshall")
+
+        route = cached_route("floyd_warshall")  # Routes computed by any session or process are reused
+        if route is not None:
+            show_cached_route('Floyd-Warshall', route)
+        else:
+            # Create two columns for the plots
+            col1, col2 = st.columns(2)
+
+            with col1:
+                st.write("Visited Nodes")
+                # The all-pairs table is built once per graph; later selections only walk the path
+                iterations, time_of_function = floyd_warshall(Graph, start_node, target_node, plot=True)
+                st.write(f"The Floyd-Warshall algorithm took {time_of_function} seconds.")
+                st.write(f"Number of iterations: {iterations}")
+                show_query_engine("floyd_warshall")  # Large graphs fall back to SPFA from the start node
+                metrics['Floyd-Warshall'] = {'Execution Time': time_of_function}
+
+            with col2:
+                st.write("Shortest Path")
+                distance, average_speed, total_time = reconstruct_path(Graph, start_node, target_node, plot=True)
+                st.write(f"Distance: {distance} km")
+                st.write(f"Average Speed: {average_speed} km/h")
+                st.write(f"Total Time: {total_time} minutes")
+                metrics['Floyd-Warshall']['Distance'] = distance
+                metrics['Floyd-Warshall']['Average Speed'] = average_speed
+                metrics['Floyd-Warshall']['Total Time'] = total_time
+
+            store_route("floyd_warshall", distance, average_speed, total_time)
+
+    with tab8:
+        st.header("Time-Dependent A*")
+        # Every edge is timed at the moment the route reaches it, starting at the departure time
+        departure = departure_time.hour * 3600 + departure_time.minute * 60
+        route = cached_route("time_dependent", {"departure": departure})  # Reused across sessions and processes
+        if route is not None:
+            show_cached_route('Time-Dependent', route)
+        else:
+            # Create two columns for the plots
+            col1, col2 = st.columns(2)
+
+            with col1:
+                st.write("Visited Nodes")
+                iterations, time_of_function = time_dependent_astar(Graph, start_node, target_node, departure, plot=True)
+                st.write(f"The time-dependent A* algorithm took {time_of_function} seconds.")
+                st.write(f"Number of iterations: {iterations}")
+                metrics['Time-Dependent'] = {'Execution Time': time_of_function}
+
+            with col2:
+                st.write("Fastest Path")
+                distance, _, _ = reconstruct_path(Graph, start_node, target_node, plot=True)
+                # The node "distance" is the travel time in seconds from the departure, with traffic
+                total_time = Graph.nodes[target_node]["distance"] / 60
+                # Without a route both are infinite (inf / inf is nan), so the speed is 0 as in PathResult
+                average_speed = distance / (total_time / 60) if total_time and math.isfinite(total_time) else 0
+                st.write(f"Departure: {departure_time.strftime('%H:%M')}")
+                st.write(f"Distance: {distance} km")
+                st.write(f"Average Speed: {average_speed} km/h")
+                st.write(f"Total Time: {total_time} minutes")
+                metrics['Time-Dependent']['Distance'] = distance
+                metrics['Time-Dependent']['Average Speed'] = average_speed
+                metrics['Time-Dependent']['Total Time'] = total_time
+
+            store_route("time_dependent", distance, average_speed, total_time, {"departure": departure})
+
+    # The comparison runs every algorithm in its own process, several times and without plotting,
+    # so it only runs on demand; the result is kept while the place and the nodes do not change.
+    comparison_key = (place_name, start_node, target_node, limit, departure)
+    comparison = st.session_state.get("comparison")
+    if comparison is not None and comparison[0] != comparison_key:
+        comparison = None
+
+    with tab9:
+        st.header("Algorithm Execution Times")
+        repeats = st.number_input("Repetitions:", min_value=1, value=5, step=1,
+                                  help="Number of measured runs of every algorithm (after one warm-up run).")
+        if st.button("Run isolated comparison",
+                     help="Run all the algorithms in parallel processes, without plotting, and chart "
+                          "the median time with its interquartile range."):
+            with st.spinner("Running the algorithms..."):
+                results = compare_algorithms(job.result(), start_node, target_node, repeats=repeats,
+                                             params={"dls": {"limit": limit},
+                                                     "time_dependent": {"departure": departure}})
+            comparison = (comparison_key, results)
+            st.session_state["comparison"] = comparison
+
+        if comparison is not None:
+            plot_comparison(comparison[1], "time", ALGORITHM_LABELS)
+            st.subheader("Iterations")
+            plot_comparison(comparison[1], "steps", ALGORITHM_LABELS)
+        else:
+            st.caption("Single run of every tab, including the time to plot the graph. "
+                       "Routes loaded from the route cache have no execution time.")
+            import pandas as pd  # Lazy import, pandas is only needed for the charts
+            speeds = [metrics[key]['Execution Time'] for key in metrics]
+            data = pd.DataFrame({
+                'Algorithm': list(metrics.keys()),
+                'Execution Time (s)': speeds
+            })
+            st.bar_chart(data.set_index('Algorithm'))
+
+    with tab10:
         st.header("Distance Chart")
-        distances = [metrics[key]['Distance'] for key in metrics]
-        data = pd.DataFrame({
-            'Algorithm': list(metrics.keys()),
-            'Distance (km)': distances
-        })
-        st.bar_chart(data.set_index('Algorithm'))
-
-    # Repeat the pattern for A*, Bellman-Ford, Floyd-Warshall, and your custom algorithm
+        if comparison is not None:
+            plot_comparison(comparison[1], "distance", ALGORITHM_LABELS)
+        else:
+            import pandas as pd  # Lazy import, pandas is only needed for the charts
+            distances = [metrics[key]['Distance'] for key in metrics]
+            data = pd.DataFrame({
+                'Algorithm': list(metrics.keys()),
+                'Distance (km)': distances
+            })
+            st.bar_chart(data.set_index('Algorithm'))
+
+    # Repeat the pattern for A* and your custom algorithm
 else:
     st.error("Please specify a valid location to generate the graph.")
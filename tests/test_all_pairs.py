@@ -0,0 +1,147 @@
+"""
+Pruebas de los motores de all_pairs.py contra NetworkX.
+
+Los grafos son multigrafos dirigidos aleatorios con arcos paralelos y pesos
+negativos. Los pesos se construyen con potenciales (w = c + p[u] - p[v], c > 0),
+por lo que no tienen ciclos negativos; el ciclo negativo se prueba aparte.
+
+Se ejecutan con:
+
+    python -m pytest tests
+"""
+
+import math  # Import math to compare the distances
+import random  # Import random to build the graphs
+
+import networkx as nx  # Import NetworkX as the reference implementation
+import pytest  # Import pytest for the parametrized tests
+
+from helpers.algorithms import (ALL_PAIRS_CACHE_KEY, ALL_PAIRS_MAX_NODES, NegativeCycleError, bellman_ford_table,
+                                compile_graph, floyd_warshall_table, path_from_previous, query_engine,
+                                shortest_path_query, spfa)
+
+
+def random_multigraph(seed, num_nodes=25, num_edges=80):
+    """
+    Construye un multigrafo dirigido aleatorio sin ciclos negativos.
+
+    :param seed: Semilla del generador.
+    :param num_nodes: Número de nodos.
+    :param num_edges: Número de arcos (algunos paralelos).
+    :return: El MultiDiGraph.
+    """
+    rng = random.Random(seed)
+    potential = [rng.uniform(0, 50) for _ in range(num_nodes)]
+    graph = nx.MultiDiGraph()
+    graph.add_nodes_from(range(num_nodes))
+    for _ in range(num_edges):
+        u, v = rng.randrange(num_nodes), rng.randrange(num_nodes)
+        if u == v:
+            continue
+        weight = rng.uniform(1, 20) + potential[u] - potential[v]  # Often negative, never a negative cycle
+        graph.add_edge(u, v, weight=weight, length=1.0)
+        if rng.random() < 0.2:  # A parallel edge, sometimes shorter
+            graph.add_edge(u, v, weight=weight + rng.uniform(-0.5, 5), length=1.0)
+    return graph
+
+
+def assert_path(graph, compiled, path, distance):
+    """
+    Verifica que un camino (en posiciones) siga arcos del grafo y mida `distance`.
+
+    :param graph: El grafo.
+    :param compiled: El grafo compilado.
+    :param path: Lista de posiciones del camino.
+    :param distance: Distancia esperada.
+    :return:
+    """
+    nodes = [compiled.nodes[i] for i in path]
+    total = sum(min(data["weight"] for data in graph[u][v].values()) for u, v in zip(nodes, nodes[1:]))
+    assert math.isclose(total, distance, rel_tol=1e-9, abs_tol=1e-9)
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("build_table", [floyd_warshall_table, bellman_ford_table])
+def test_table_matches_networkx(seed, build_table):
+    graph = random_multigraph(seed)
+    compiled = compile_graph(graph)
+    table = build_table(compiled)
+    expected = nx.floyd_warshall(graph)
+
+    for u in graph.nodes:
+        for v in graph.nodes:
+            i, j = compiled.index[u], compiled.index[v]
+            assert math.isclose(table.dist[i, j], expected[u][v], rel_tol=1e-9, abs_tol=1e-9)
+            path = table.path_indices(i, j)
+            if math.isinf(expected[u][v]):
+                assert path == []
+            else:
+                assert path[0] == i and path[-1] == j
+                assert_path(graph, compiled, path, expected[u][v])
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_spfa_matches_networkx(seed):
+    graph = random_multigraph(seed)
+    compiled = compile_graph(graph)
+
+    for source in graph.nodes:
+        dist, previous, _ = spfa(compiled, compiled.index[source])
+        expected = nx.single_source_bellman_ford_path_length(graph, source)
+        for node in graph.nodes:
+            i = compiled.index[node]
+            if node in expected:
+                assert math.isclose(dist[i], expected[node], rel_tol=1e-9, abs_tol=1e-9)
+                assert_path(graph, compiled, path_from_previous(previous, compiled.index[source], i), dist[i])
+            else:
+                assert math.isinf(dist[i])
+
+
+@pytest.mark.parametrize("engine", ["floyd_warshall", "bellman_ford"])
+def test_query_falls_back_to_spfa_on_large_graphs(engine, monkeypatch):
+    graph = random_multigraph(0)
+    compiled = compile_graph(graph)
+    orig = 0
+    expected = nx.single_source_bellman_ford_path_length(graph, orig)
+    dest = max(expected, key=expected.get)  # The farthest reachable node
+
+    assert query_engine(graph, engine) == engine
+    monkeypatch.setitem(ALL_PAIRS_MAX_NODES, engine, graph.number_of_nodes() - 1)
+    assert query_engine(graph, engine) == "spfa"
+
+    dist, path, _ = shortest_path_query(graph, orig, dest, engine)
+    assert ALL_PAIRS_CACHE_KEY not in graph.graph  # No table was built
+    assert math.isclose(dist[compiled.index[dest]], expected[dest], rel_tol=1e-9, abs_tol=1e-9)
+    assert_path(graph, compiled, path, expected[dest])
+
+
+def test_negative_cycle():
+    graph = random_multigraph(1)
+    graph.add_edge(0, 1, weight=-100.0, length=1.0)
+    graph.add_edge(1, 2, weight=1.0, length=1.0)
+    graph.add_edge(2, 0, weight=1.0, length=1.0)
+    assert nx.negative_edge_cycle(graph)
+    compiled = compile_graph(graph)
+
+    with pytest.raises(NegativeCycleError):
+        floyd_warshall_table(compiled)
+    with pytest.raises(NegativeCycleError):
+        bellman_ford_table(compiled)
+    with pytest.raises(NegativeCycleError):
+        spfa(compiled, compiled.index[0])
+
+
+@pytest.mark.parametrize("engine", ["floyd_warshall", "bellman_ford"])
+def test_bundled_csv_graph_uses_the_table(engine):
+    from helpers import CsvSource, clean_graph
+
+    source = CsvSource()
+    graph = clean_graph(source.parse(source.fetch(None)))
+    assert query_engine(graph, engine) == engine
+
+    compiled = compile_graph(graph)
+    expected = dict(nx.all_pairs_dijkstra_path_length(graph))
+    dist, path, _ = shortest_path_query(graph, "Cozumel", "Acapulco", engine)
+    assert ALL_PAIRS_CACHE_KEY in graph.graph
+    assert math.isclose(dist[compiled.index["Acapulco"]], expected["Cozumel"]["Acapulco"])
+    assert_path(graph, compiled, path, expected["Cozumel"]["Acapulco"])
@@ -0,0 +1,106 @@
+"""
+Pruebas del GraphLoader (loader.py): cancelación de cargas compartidas y precarga.
+
+Las descargas se simulan con la SyntheticSource, cuyo retraso (delay) mantiene cada
+carga en la etapa fetch el tiempo suficiente para que las sesiones cambien de lugar.
+
+Se ejecutan con:
+
+    python -m pytest tests
+"""
+
+import threading  # Import threading to count the prefetch workers
+import time  # Import time to wait for the prefetch
+
+import pytest  # Import pytest to check the exceptions
+
+from helpers import GraphLoader, LoadCancelled, SyntheticSource
+
+DELAY = 0.3  # Simulated download time, long enough to switch places during the fetch stage
+
+
+def make_loader(**kwargs):
+    """
+    Construye un GraphLoader con una SyntheticSource pequeña y lenta.
+
+    :param kwargs: Argumentos extra del GraphLoader.
+    :return: El GraphLoader.
+    """
+    return GraphLoader(source=SyntheticSource(size=5, delay=DELAY), **kwargs)
+
+
+def prefetch_workers():
+    """
+    Cuenta los hilos de precarga vivos.
+
+    :return: Número de hilos.
+    """
+    return sum(thread.name == "graph-prefetch" for thread in threading.enumerate())
+
+
+def test_shared_job_survives_when_one_session_moves_on():
+    loader = make_loader()
+    first = loader.load("Place A", session=1)
+    second = loader.load("Place A", session=2)
+    assert first is second  # Both sessions wait for the same load
+
+    other = loader.load("Place B", session=1)  # Session 1 moves on, session 2 still waits
+    assert not first.cancelled
+    assert first.result(timeout=10).number_of_nodes() > 0
+    assert other.result(timeout=10).number_of_nodes() > 0
+    assert loader.cached("Place A") is not None
+
+
+def test_superseded_job_is_cancelled():
+    loader = make_loader()
+    old = loader.load("Place A", session=1)
+    new = loader.load("Place B", session=1)
+
+    assert old.cancelled
+    with pytest.raises(LoadCancelled):
+        old.result(timeout=10)
+    assert new.result(timeout=10).number_of_nodes() > 0
+    assert loader.cached("Place A") is None  # The cancelled load never reaches the cache
+
+    # Asking for the place again starts a new load instead of returning the cancelled one
+    again = loader.load("Place A", session=1)
+    assert again is not old
+    assert again.result(timeout=10).number_of_nodes() > 0
+
+
+def test_a_single_prefetch_worker():
+    loader = make_loader(cache_size=8, prefetch_places=["Place A"])
+    for place in ["Place B", "Place C", "Place A", "Place B"]:
+        loader.prefetch(place)
+        assert prefetch_workers() <= 1
+
+    deadline = time.monotonic() + 10
+    while not all(loader.cached(place) for place in ["Place A", "Place B", "Place C"]):
+        assert prefetch_workers() <= 1
+        assert time.monotonic() < deadline, "The prefetch did not finish in time."
+        time.sleep(0.02)
+
+    # The worker stops once the queue is empty, and a new prefetch starts exactly one again
+    deadline = time.monotonic() + 10
+    while loader._prefetch_running:
+        assert time.monotonic() < deadline, "The prefetch worker did not stop."
+        time.sleep(0.02)
+    loader.prefetch("Place D")
+    assert prefetch_workers() <= 1
+    deadline = time.monotonic() + 10
+    while loader.cached("Place D") is None:
+        assert time.monotonic() < deadline, "The prefetch did not finish in time."
+        time.sleep(0.02)
+
+
+def test_prefetch_is_never_cancelled_by_a_session():
+    loader = make_loader(cache_size=8)
+    loader.prefetch("Place A")
+    time.sleep(DELAY / 3)  # The worker is now fetching Place A
+    loader.load("Place A", session=1)  # The session joins the prefetch ...
+    loader.load("Place B", session=1)  # ... and then moves on
+
+    deadline = time.monotonic() + 10
+    while loader.cached("Place A") is None:
+        assert time.monotonic() < deadline, "The prefetch was cancelled."
+        time.sleep(0.02)
@@ -0,0 +1,102 @@
+"""
+Pruebas de las consultas de varios destinos (multi_target.py) contra NetworkX.
+
+Los grafos son multigrafos dirigidos aleatorios con arcos paralelos, pesos positivos
+y algunos nodos a los que no se puede llegar (o desde los que no se puede salir).
+
+Se ejecutan con:
+
+    python -m pytest tests
+"""
+
+import math  # Import math to compare the distances
+import random  # Import random to build the graphs
+
+import networkx as nx  # Import NetworkX as the reference implementation
+import numpy as np  # Import NumPy to count the reachable nodes
+import pytest  # Import pytest for the parametrized tests
+
+from helpers.algorithms import compile_graph, nearest_targets, voronoi_partition
+
+
+def random_multigraph(seed, num_nodes=40, num_edges=110):
+    """
+    Construye un multigrafo dirigido aleatorio con pesos positivos.
+
+    :param seed: Semilla del generador.
+    :param num_nodes: Número de nodos.
+    :param num_edges: Número de arcos (algunos paralelos).
+    :return: El MultiDiGraph.
+    """
+    rng = random.Random(seed)
+    graph = nx.MultiDiGraph()
+    graph.add_nodes_from(range(num_nodes))
+    for _ in range(num_edges):
+        u, v = rng.randrange(num_nodes), rng.randrange(num_nodes)
+        if u == v:
+            continue
+        weight = rng.uniform(1, 20)
+        graph.add_edge(u, v, weight=weight, length=weight * 10)
+        if rng.random() < 0.2:  # A parallel edge, sometimes shorter
+            graph.add_edge(u, v, weight=weight + rng.uniform(-0.5, 5), length=weight * 10)
+    return graph
+
+
+def path_weight(graph, nodes):
+    """
+    Suma el peso del arco más corto entre cada par de nodos consecutivos.
+
+    :param graph: El grafo.
+    :param nodes: Lista de nodos del camino.
+    :return: El peso total.
+    """
+    return sum(min(data["weight"] for data in graph[u][v].values()) for u, v in zip(nodes, nodes[1:]))
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("k", [None, 1, 4])
+@pytest.mark.parametrize("reverse", [False, True])
+def test_nearest_targets_match_networkx(seed, k, reverse):
+    graph = random_multigraph(seed)
+    rng = random.Random(seed)
+    orig = rng.randrange(graph.number_of_nodes())
+    targets = rng.sample(sorted(graph.nodes), 12)
+    expected = nx.single_source_dijkstra_path_length(graph.reverse() if reverse else graph, orig)
+    reachable = sorted((expected[target] for target in targets if target in expected))
+
+    result = nearest_targets(graph, orig, targets, k=k, reverse=reverse)
+    count = len(reachable) if k is None else min(k, len(reachable))
+    assert len(result.targets) == count
+    assert np.allclose(result.distances, reachable[:count])  # The k nearest, closest first
+    for i, node in enumerate(result.nodes):
+        assert node in targets
+        assert math.isclose(result.distances[i], expected[node])
+        path = result.path(i).nodes
+        assert path[0] == (node if reverse else orig) and path[-1] == (orig if reverse else node)
+        assert math.isclose(path_weight(graph, path), expected[node])
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("reverse", [False, True])
+def test_voronoi_partition_matches_networkx(seed, reverse):
+    graph = random_multigraph(seed)
+    compiled = compile_graph(graph)
+    facilities = random.Random(seed).sample(sorted(graph.nodes), 4)
+    expected = nx.multi_source_dijkstra_path_length(graph.reverse() if reverse else graph, facilities)
+
+    partition = voronoi_partition(graph, facilities, reverse=reverse)
+    assert partition.sizes().sum() == len(expected)  # Every node that reaches a facility, and only those
+    assert list(partition.sizes()) == [sum(partition.facility_of(node) == facility for node in graph.nodes)
+                                       for facility in facilities]
+    for node in graph.nodes:
+        i = compiled.index[node]
+        facility = partition.facility_of(node)
+        if node not in expected:
+            assert facility is None and math.isinf(partition.distances[i])
+            continue
+        assert math.isclose(partition.distances[i], expected[node])
+        # The assigned facility is one of the nearest
+        reference = graph.reverse() if reverse else graph
+        assert math.isclose(nx.dijkstra_path_length(reference, facility, node), expected[node])
+    for facility in facilities:
+        assert partition.facility_of(facility) == facility
@@ -0,0 +1,66 @@
+"""
+Pruebas de la exportación de rutas (paths.py) como GeoJSON y WKB.
+
+Se ejecutan con:
+
+    python -m pytest tests
+"""
+
+import io  # Import io to write the GeoJSON in memory
+import json  # Import json to parse the GeoJSON
+import struct  # Import struct to read the WKB headers
+
+import networkx as nx  # Import NetworkX to build the graph
+import pytest  # Import pytest to check the exceptions
+
+from helpers.algorithms import (WKB_LINESTRING, compile_graph, extract_path, iter_geojson, iter_wkb,
+                                path_from_nodes, write_geojson)
+
+
+def strict_json(text):
+    """
+    Lee un documento JSON rechazando NaN e Infinity, que no son JSON válido.
+
+    :param text: El documento.
+    :return: El objeto leído.
+    """
+    def reject(constant):
+        raise ValueError(f"Invalid JSON constant {constant}")
+    return json.loads(text, parse_constant=reject)
+
+
+@pytest.fixture
+def graph():
+    # A chain 0 -> 1 -> 2 -> 3 where node 3 has no coordinates
+    graph = nx.MultiDiGraph()
+    for node in range(3):
+        graph.add_node(node, x=-99.1 + node * 0.001, y=19.4)
+    graph.add_node(3)
+    for u, v in [(0, 1), (1, 2), (2, 3)]:
+        graph.add_edge(u, v, weight=10.0, length=100.0)
+    return graph
+
+
+def test_geojson_skips_paths_without_coordinates(graph):
+    compiled = compile_graph(graph)
+    complete = path_from_nodes(compiled, [0, 1, 2])
+    partial = path_from_nodes(compiled, [1, 2, 3])
+    missing = extract_path(compiled, [-1, -1, -1, -1], 0, 3)
+    assert complete.has_coordinates and not partial.has_coordinates and not missing.found
+
+    document = strict_json("".join(iter_geojson([partial, complete, missing], chunk_size=2)))
+    assert len(document["features"]) == 1
+    feature = document["features"][0]
+    assert feature["properties"]["orig"] == 0 and feature["properties"]["dest"] == 2
+    assert feature["geometry"]["coordinates"] == [[graph.nodes[i]["x"], graph.nodes[i]["y"]] for i in range(3)]
+
+    file = io.StringIO()
+    write_geojson(file, [partial])
+    assert strict_json(file.getvalue()) == {"type": "FeatureCollection", "features": []}
+
+
+def test_wkb_skips_paths_without_coordinates(graph):
+    compiled = compile_graph(graph)
+    blobs = list(iter_wkb([path_from_nodes(compiled, [1, 2, 3]), path_from_nodes(compiled, [0, 1, 2])]))
+    assert len(blobs) == 1
+    assert struct.unpack_from("<BII", blobs[0]) == (1, WKB_LINESTRING, 3)
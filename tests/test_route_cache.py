@@ -0,0 +1,195 @@
+"""
+Pruebas del caché persistente de rutas (route_cache.py).
+
+Cada prueba usa una base de datos nueva en un directorio temporal. La hora de último
+uso se toma de un reloj falso que avanza un segundo en cada lectura, para que el
+orden LRU no dependa de la resolución del reloj del sistema.
+
+Se ejecutan con:
+
+    python -m pytest tests
+"""
+
+import sqlite3  # Import sqlite3 to inspect the database directly
+
+import pytest  # Import pytest for the fixtures
+
+from helpers import SyntheticSource, clean_graph
+from helpers import route_cache
+from helpers.route_cache import CACHE_VERSION, RouteCache
+
+
+class FakeClock:
+    """
+    Reloj que avanza un segundo cada vez que se consulta (reemplaza al módulo time).
+    """
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        self.now += 1
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(route_cache, "time", fake)
+    return fake
+
+
+def build_graph(speed_profile=None):
+    """
+    Construye un grafo sintético limpio.
+
+    :param speed_profile: Perfil de velocidad que se asigna a todos los arcos (opcional).
+    :return: El grafo.
+    """
+    source = SyntheticSource(size=6)
+    graph = clean_graph(source.parse(source.fetch("Test place")))
+    if speed_profile is not None:
+        for _, _, data in graph.edges(data=True):
+            data["speed_profile"] = speed_profile
+    return graph
+
+
+def put_route(cache, graph, orig, dest, engine="dijkstra", params=None, length=3):
+    """
+    Guarda en el caché una ruta de `length` nodos.
+
+    :param cache: El RouteCache.
+    :param graph: El grafo.
+    :param orig: Nodo de origen.
+    :param dest: Nodo de destino.
+    :param engine: Nombre del algoritmo.
+    :param params: Parámetros del algoritmo.
+    :param length: Número de nodos de la ruta (cada uno ocupa 4 bytes).
+    :return: La ruta guardada.
+    """
+    path = [orig] + list(graph.nodes)[:length - 2] + [dest]
+    cache.put(graph, engine, orig, dest, path, 1.5, 30.0, 3.0, params=params)
+    return path
+
+
+def last_used(path):
+    """
+    Lee la hora de último uso de todas las rutas directamente de la base de datos.
+
+    :param path: Ruta del archivo de la base de datos.
+    :return: Diccionario (origen, destino) -> last_used, con las posiciones compiladas.
+    """
+    with sqlite3.connect(path) as connection:
+        return {(orig, dest): used for orig, dest, used in
+                connection.execute("SELECT orig, dest, last_used FROM routes")}
+
+
+@pytest.fixture
+def database(tmp_path):
+    return str(tmp_path / "routes.sqlite3")
+
+
+@pytest.fixture
+def graph():
+    return build_graph()
+
+
+def test_get_returns_what_put_stored(database, graph):
+    cache = RouteCache(database)
+    nodes = list(graph.nodes)
+    assert cache.get(graph, "dijkstra", nodes[0], nodes[-1]) is None
+
+    path = put_route(cache, graph, nodes[0], nodes[-1])
+    assert cache.get(graph, "dijkstra", nodes[0], nodes[-1]) == (path, 1.5, 30.0, 3.0)
+    # The engine and its parameters are part of the key
+    assert cache.get(graph, "bfs", nodes[0], nodes[-1]) is None
+    assert cache.get(graph, "dijkstra", nodes[0], nodes[-1], {"limit": 5}) is None
+    # So is the process: another RouteCache on the same file sees the route
+    assert RouteCache(database).get(graph, "dijkstra", nodes[0], nodes[-1]) == (path, 1.5, 30.0, 3.0)
+
+
+def test_evicts_the_least_recently_used_entries(database, graph):
+    cache = RouteCache(database, max_entries=2)
+    nodes = list(graph.nodes)
+    put_route(cache, graph, nodes[0], nodes[1])
+    put_route(cache, graph, nodes[0], nodes[2])
+    assert cache.get(graph, "dijkstra", nodes[0], nodes[1]) is not None  # Now the most recently used
+
+    put_route(cache, graph, nodes[0], nodes[3])  # Writes the pending hit, then evicts
+    assert len(cache) == 2
+    assert cache.get(graph, "dijkstra", nodes[0], nodes[1]) is not None
+    assert cache.get(graph, "dijkstra", nodes[0], nodes[2]) is None
+    assert cache.get(graph, "dijkstra", nodes[0], nodes[3]) is not None
+
+
+def test_evicts_by_size(database, graph):
+    cache = RouteCache(database, max_bytes=40)
+    nodes = list(graph.nodes)
+    put_route(cache, graph, nodes[0], nodes[1], length=4)  # 16 bytes
+    put_route(cache, graph, nodes[0], nodes[2], length=4)  # 32 bytes in total
+    put_route(cache, graph, nodes[0], nodes[3], length=4)  # 48 bytes, so the oldest route goes
+
+    assert len(cache) == 2
+    assert cache.get(graph, "dijkstra", nodes[0], nodes[1]) is None
+    with sqlite3.connect(database) as connection:
+        assert connection.execute("SELECT SUM(size) FROM routes").fetchone()[0] <= 40
+
+
+def test_old_versions_are_emptied(database, graph):
+    nodes = list(graph.nodes)
+    put_route(RouteCache(database), graph, nodes[0], nodes[1])
+    with sqlite3.connect(database) as connection:
+        connection.execute(f"PRAGMA user_version = {CACHE_VERSION - 1}")
+
+    cache = RouteCache(database)
+    assert len(cache) == 0
+    assert cache.get(graph, "dijkstra", nodes[0], nodes[1]) is None
+    with sqlite3.connect(database) as connection:
+        assert connection.execute("PRAGMA user_version").fetchone()[0] == CACHE_VERSION
+
+
+def test_changed_weights_miss(database, graph):
+    cache = RouteCache(database)
+    nodes = list(graph.nodes)
+    put_route(cache, graph, nodes[0], nodes[-1])
+
+    assert cache.get(build_graph(), "dijkstra", nodes[0], nodes[-1]) is not None  # Same graph, same key
+    changed = build_graph()
+    u, v, key = next(iter(changed.edges(keys=True)))
+    changed[u][v][key]["weight"] += 1
+    assert cache.get(changed, "dijkstra", nodes[0], nodes[-1]) is None
+
+
+def test_changed_speed_profiles_miss_only_for_time_dependent(database, graph):
+    cache = RouteCache(database)
+    nodes = list(graph.nodes)
+    params = {"departure": 8 * 60 * 60}
+    put_route(cache, graph, nodes[0], nodes[-1], engine="time_dependent", params=params)
+    put_route(cache, graph, nodes[0], nodes[-1])
+
+    congested = build_graph(speed_profile=[0.5] * 24)
+    assert cache.get(congested, "time_dependent", nodes[0], nodes[-1], params) is None
+    assert cache.get(congested, "dijkstra", nodes[0], nodes[-1]) is not None  # Dijkstra ignores the profiles
+    assert cache.get(build_graph(), "time_dependent", nodes[0], nodes[-1], params) is not None
+
+
+def test_hits_are_written_in_batches(database, graph):
+    cache = RouteCache(database, touch_batch=3, touch_interval=float("inf"))
+    nodes = list(graph.nodes)
+    for dest in nodes[1:4]:
+        put_route(cache, graph, nodes[0], dest)
+    stored = last_used(database)
+
+    cache.get(graph, "dijkstra", nodes[0], nodes[1])
+    cache.get(graph, "dijkstra", nodes[0], nodes[2])
+    cache.get(graph, "dijkstra", nodes[0], nodes[1])  # A repeated hit is still one pending write
+    assert last_used(database) == stored  # Reads do not write
+
+    cache.get(graph, "dijkstra", nodes[0], nodes[3])  # The third route hit writes the batch
+    written = last_used(database)
+    assert all(written[key] > stored[key] for key in stored)
+
+    cache.get(graph, "dijkstra", nodes[0], nodes[2])
+    assert last_used(database) == written
+    cache.flush()  # An explicit flush writes the pending hit
+    assert max(last_used(database).values()) > max(written.values())
@@ -0,0 +1,158 @@
+"""
+Pruebas del motor dependiente del tiempo (time_dependent.py).
+
+Los grafos son cuadrículas sintéticas limpias (con coordenadas, longitudes y pesos)
+en las que algunos arcos tienen un perfil de velocidad aleatorio en el atributo
+"speed_profile"; los demás usan el perfil típico de hora pico.
+
+Se ejecutan con:
+
+    python -m pytest tests
+"""
+
+import math  # Import math to compare the arrival times
+import random  # Import random to build the profiles
+
+import numpy as np  # Import NumPy to build the profile tables
+import pytest  # Import pytest for the parametrized tests
+
+from helpers import SyntheticSource, clean_graph
+from helpers.algorithms import (DAY_SECONDS, build_speed_profiles, compile_graph, speed_profiles,
+                                time_dependent_dijkstra, time_dependent_query)
+
+DEPARTURES = (0, 7.5 * 60 * 60, 8 * 60 * 60 + 17, 18 * 60 * 60, DAY_SECONDS - 60)  # Including around midnight
+
+
+def profiled_graph(seed, size=8, buckets=24):
+    """
+    Construye una cuadrícula limpia con perfiles de velocidad aleatorios en la mitad de sus arcos.
+
+    :param seed: Semilla del generador.
+    :param size: Lado de la cuadrícula.
+    :param buckets: Número de intervalos de los perfiles.
+    :return: El grafo.
+    """
+    rng = random.Random(seed)
+    source = SyntheticSource(size=size)
+    graph = clean_graph(source.parse(source.fetch(f"Place {seed}")))
+    for _, _, data in graph.edges(data=True):
+        if rng.random() < 0.5:
+            data["speed_profile"] = [rng.choice([0.2, 0.5, 0.8, 1.0]) for _ in range(buckets)]
+    return graph
+
+
+def label_correcting(compiled, profiles, orig, departure):
+    """
+    Calcula las horas de llegada más tempranas relajando todos los arcos hasta que no
+    cambian (Bellman-Ford sobre las horas de llegada), como referencia de fuerza bruta.
+
+    :param compiled: El grafo compilado.
+    :param profiles: Los SpeedProfiles.
+    :param orig: Posición del nodo de origen.
+    :param departure: Hora de salida en segundos desde la medianoche.
+    :return: Arreglo con la hora de llegada a cada nodo (infinita si no se alcanza).
+    """
+    arrival = np.full(compiled.num_nodes, np.inf)
+    arrival[orig] = departure
+    changed = True
+    while changed:
+        changed = False
+        for e in range(len(compiled.indices)):
+            u, v = compiled.sources[e], compiled.indices[e]
+            if math.isinf(arrival[u]):
+                continue
+            time = arrival[u] + profiles.travel_time(e, compiled.weights[e], arrival[u])
+            if time < arrival[v] - 1e-9:
+                arrival[v] = time
+                changed = True
+    return arrival
+
+
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("buckets", [24, 96])
+def test_dijkstra_matches_label_correcting(seed, buckets):
+    graph = profiled_graph(seed, buckets=buckets)
+    compiled = compile_graph(graph)
+    profiles = speed_profiles(graph, buckets)
+    orig = random.Random(seed).randrange(compiled.num_nodes)
+
+    for departure in DEPARTURES:
+        arrival, previous, _ = time_dependent_dijkstra(compiled, profiles, orig, departure)
+        expected = label_correcting(compiled, profiles, orig, departure)
+        np.testing.assert_allclose(arrival, expected, rtol=1e-9)
+        # Every predecessor edge explains the arrival time of its node
+        for v in np.flatnonzero(previous >= 0):
+            u = previous[v]
+            e = compiled.find_edge(u, v)
+            time = arrival[u] + profiles.travel_time(e, compiled.weights[e], arrival[u])
+            assert time == pytest.approx(arrival[v])
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_astar_matches_dijkstra(seed):
+    graph = profiled_graph(seed)
+    rng = random.Random(seed)
+    nodes = list(graph.nodes)
+
+    for departure in DEPARTURES:
+        orig, dest = rng.choice(nodes), rng.choice(nodes)
+        times, path, astar_steps = time_dependent_query(graph, orig, dest, departure, heuristic=True)
+        expected, expected_path, dijkstra_steps = time_dependent_query(graph, orig, dest, departure,
+                                                                       heuristic=False)
+        j = compile_graph(graph).index[dest]
+        assert times[j] == pytest.approx(expected[j])
+        assert bool(path) == bool(expected_path)
+        assert astar_steps <= dijkstra_steps
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_later_departures_never_arrive_earlier(seed):
+    graph = profiled_graph(seed, buckets=96)
+    compiled = compile_graph(graph)
+    profiles = speed_profiles(graph, 96)
+    orig = random.Random(seed).randrange(compiled.num_nodes)
+
+    departures = np.linspace(0, DAY_SECONDS, 41)
+    arrivals = [time_dependent_dijkstra(compiled, profiles, orig, departure)[0] for departure in departures]
+    for earlier, later in zip(arrivals, arrivals[1:]):
+        reached = np.isfinite(earlier)
+        assert np.all(later[reached] >= earlier[reached] - 1e-9)
+
+    # The FIFO property also holds edge by edge, across bucket boundaries
+    for e in range(0, len(compiled.indices), 7):
+        times = np.linspace(0, DAY_SECONDS, 193)
+        exits = [t + profiles.travel_time(e, compiled.weights[e], t) for t in times]
+        assert all(b >= a - 1e-9 for a, b in zip(exits, exits[1:]))
+
+
+def test_profiles_are_deduplicated():
+    graph = profiled_graph(0)
+    compiled = compile_graph(graph)
+    profiles = speed_profiles(graph)
+
+    assert profiles.edge_profile.dtype == np.uint8
+    assert profiles.edge_profile.shape == (len(compiled.indices),)
+    assert profiles.factors.dtype == np.float32
+    assert profiles.factors.shape[1] == 24
+    assert len(profiles.factors) == len(np.unique(profiles.factors, axis=0))  # No repeated profile
+    assert profiles.edge_profile.max() < len(profiles.factors)
+    assert speed_profiles(graph) is profiles  # Built once per graph
+
+    # Every edge keeps its own profile after the deduplication
+    given = [data.get("speed_profile") for _, _, data in graph.edges(data=True)]
+    for e, position in enumerate(compiled.edge_order):
+        if given[position] is not None:
+            np.testing.assert_allclose(profiles.factors[profiles.edge_profile[e]], given[position], rtol=1e-6)
+
+
+def test_many_profiles_use_two_bytes_per_edge():
+    rng = np.random.default_rng(0)
+    edge_factors = rng.integers(50, 1001, size=(2000, 96)) / 1000  # Almost every edge has its own profile
+    profiles = build_speed_profiles(edge_factors)
+
+    assert profiles.edge_profile.dtype == np.uint16
+    assert profiles.factors.shape == (len(np.unique(np.round(edge_factors, 3), axis=0)), 96)
+    np.testing.assert_allclose(profiles.factors[profiles.edge_profile], edge_factors, atol=5e-4)
+
+    with pytest.raises(ValueError):
+        build_speed_profiles(np.ones((3, 12)))